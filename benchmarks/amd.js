@@ -0,0 +1,339 @@
+/**
+ * AMD.
+ *
+ * Minimal AMD loader following the loading pipeline of RequireJS.
+ *
+ * Libraries are loaded by `requirejs.load`, which creates script nodes (passed
+ * to the `onNodeCreated` hook) served by a simulated network, their shim dependencies
+ * are loaded first, module ids are mapped by the `map` configuration and loader
+ * plugins (`<plugin>!<resource>`) are supported, so that the hooks of the extension
+ * are exercised the same way as in the notebook.
+ *
+ * Modules of the extension and the mocks are loaded synchronously.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements the AMD loader of the benchmark environment.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+'use strict';
+
+const fs = require( 'fs' );
+const path = require( 'path' );
+
+const SPECIAL_DEPENDENCIES = [ 'require', 'exports', 'module' ];
+const REQUIRE_CALL = /[^.]\s*require\s*\(\s*["']([^'"\s]+)["']\s*\)/g;
+
+/**
+ * Create AMD loader in the window
+ *
+ * @param window {Window} - jsdom window
+ * @param static_dir {String} - directory of the extension modules
+ * @param prefix {String} - module id prefix of the extension modules
+ * @param latency {Number} - simulated latency of the network in milliseconds
+ * @returns {Object} - `define`, `requirejs`, registry of defined modules and the network
+ */
+function create_loader( window, { static_dir, prefix, latency = 0 } ) {
+    const document = window.document;
+
+    let defined = {};      // module id -> value
+    let definitions = {};  // module id -> { deps, factory }, defined by name but not instantiated yet
+    let loading = {};      // module id -> Promise of the value
+    let pending;           // anonymous definition of the evaluated script
+
+    let config = { paths: {}, shim: {}, map: { '*': {} } };
+
+    /**
+     * Simulated network serving library scripts and stylesheets
+     */
+    let network = {
+        scripts: {},   // url -> library factory
+        requests: [],  // { url, type, integrity }
+    };
+
+    function define( name, deps, factory ) {
+        if ( typeof name !== 'string' ) {
+            [ name, deps, factory ] = [ undefined, name, deps ];
+        }
+        if ( !Array.isArray( deps ) ) {
+            [ deps, factory ] = [ undefined, deps ];
+
+            // CommonJS sugar, i.e. `define( name, function ( require ) { ... } )`,
+            // dependencies required in the factory are loaded beforehand as by RequireJS
+            deps = typeof factory === 'function' && factory.length > 0 ? [
+                ...SPECIAL_DEPENDENCIES.slice( 0, factory.length ),
+                ...Array.from( factory.toString().matchAll( REQUIRE_CALL ), ( m ) => m[ 1 ] )
+            ] : [];
+        }
+
+        const definition = { deps: deps, factory: factory };
+
+        if ( name === undefined ) pending = definition;
+        else definitions[ name ] = definition;
+    }
+    define.amd = {};
+
+    /**
+     * Apply the `map` configuration to the module id
+     */
+    function map_id( id ) {
+        const map = config.map[ '*' ] || {};
+        const bang = id.indexOf( '!' );
+
+        if ( bang > 0 ) return `${ map_id( id.slice( 0, bang ) ) }!${ id.slice( bang + 1 ) }`;
+
+        return map[ id ] || id;
+    }
+
+    function module_file( id, parent ) {
+        if ( id.startsWith( prefix ) ) return path.join( static_dir, `${ id.slice( prefix.length ) }.js` );
+        if ( id.startsWith( './' ) && parent !== undefined ) return path.join( path.dirname( parent ), `${ id }.js` );
+    }
+
+    function call_factory( id, definition, args, module ) {
+        const value = typeof definition.factory === 'function'
+            ? definition.factory.apply( window, args )
+            : definition.factory;
+
+        requirejs.onResourceLoad( {}, module, definition.deps.map( ( dep ) => ( { id: dep } ) ) );
+
+        return value === undefined ? module.exports : value;
+    }
+
+    function special_dependency( dep, module ) {
+        if ( dep === 'require' ) return requirejs;
+        if ( dep === 'exports' ) return module.exports;
+        if ( dep === 'module' ) return module;
+    }
+
+    /**
+     * Synchronously load module of the extension or a mock
+     */
+    function load_module( id, parent ) {
+        const file = module_file( id, parent );
+        const key = file || id;
+
+        if ( key in defined ) return defined[ key ];
+
+        if ( file === undefined ) throw new Error( `Module '${ id }' is not defined.` );
+
+        pending = undefined;
+        window.eval( `${ fs.readFileSync( file, 'utf-8' ) }\n//# sourceURL=${ file }` );
+
+        const definition = pending;
+        if ( definition === undefined ) throw new Error( `Module '${ file }' does not define anything.` );
+
+        const module = { id: `${ prefix }${ path.basename( file, '.js' ) }`, exports: {} };
+        const args = definition.deps.map(
+            ( dep ) => SPECIAL_DEPENDENCIES.includes( dep ) ? special_dependency( dep, module ) : load_module( dep, file ) );
+
+        return defined[ key ] = call_factory( module.id, definition, args, module );
+    }
+
+    /**
+     * Instantiate module defined by the library, its dependencies are loaded asynchronously
+     */
+    async function instantiate( id, definition ) {
+        const module = { id: id, exports: {} };
+        const args = await Promise.all( definition.deps.map(
+            ( dep ) => SPECIAL_DEPENDENCIES.includes( dep ) ? special_dependency( dep, module ) : load( dep ) ) );
+
+        return call_factory( id, definition, args, module );
+    }
+
+    /**
+     * Load the library script by `requirejs.load`, shim dependencies are loaded first
+     */
+    async function load_script( id ) {
+        // defined by name already, i.e. by another library
+        if ( id in definitions ) {
+            const definition = definitions[ id ];
+            delete definitions[ id ];
+
+            return instantiate( id, definition );
+        }
+
+        const shim = config.shim[ id ];
+        const deps = Array.isArray( shim ) ? shim : ( shim && shim.deps ) || [];
+
+        await Promise.all( deps.map( load ) );
+
+        return new Promise( ( resolve, reject ) => {
+            let settled = false;
+
+            const context = {
+                config: config,
+
+                completeLoad: ( name ) => {
+                    if ( settled ) return;
+                    settled = true;
+
+                    const definition = definitions[ name ] || pending || { deps: [], factory: undefined };
+
+                    delete definitions[ name ];
+                    pending = undefined;
+
+                    instantiate( name, definition ).then( resolve, reject );
+                },
+
+                onError: ( err ) => {
+                    if ( settled ) return;
+                    settled = true;
+
+                    reject( err );
+                },
+            };
+
+            requirejs.load( context, id, requirejs.toUrl( `${ id }.js` ) );
+        } );
+    }
+
+    /**
+     * Load the resource by the loader plugin
+     */
+    async function load_resource( plugin_id, resource ) {
+        const plugin = await load( plugin_id );
+
+        return new Promise( ( resolve, reject ) => {
+            const onload = ( value ) => resolve( value );
+            onload.error = reject;
+
+            plugin.load( resource, requirejs, onload, config );
+        } );
+    }
+
+    /**
+     * Load the module asynchronously
+     *
+     * @returns {Promise<any>} - the module value
+     */
+    function load( dep ) {
+        const id = map_id( dep );
+
+        if ( id in defined ) return Promise.resolve( defined[ id ] );
+        if ( module_file( id ) ) return new Promise( ( resolve ) => resolve( load_module( id ) ) );
+        if ( id in loading ) return loading[ id ];
+
+        const bang = id.indexOf( '!' );
+        const loaded = bang > 0 ? load_resource( id.slice( 0, bang ), id.slice( bang + 1 ) ) : load_script( id );
+
+        return loading[ id ] = loaded.then(
+            ( value ) => {
+                delete loading[ id ];
+
+                return defined[ id ] = value;
+            },
+            ( err ) => {
+                delete loading[ id ];
+
+                throw err;
+            } );
+    }
+
+    function requirejs( deps, callback, errback ) {
+        if ( typeof deps === 'string' ) {
+            const id = map_id( deps );
+
+            return id in defined ? defined[ id ] : load_module( id );
+        }
+
+        Promise.all( deps.map( load ) )
+            .then( ( values ) => callback && callback( ...values ) )
+            .catch( ( err ) => {
+                if ( errback ) return errback( err );
+
+                throw err;
+            } );
+    }
+
+    requirejs.config = ( cfg = {} ) => {
+        Object.assign( config.paths, cfg.paths );
+        Object.assign( config.shim, cfg.shim );
+        Object.assign( config.map[ '*' ], ( cfg.map || {} )[ '*' ] );
+
+        Object.assign( config, _omit( cfg, [ 'paths', 'shim', 'map' ] ) );
+    };
+    requirejs.defined = ( id ) => map_id( id ) in defined;
+    requirejs.specified = ( id ) => map_id( id ) in defined || map_id( id ) in loading;
+    requirejs.undef = ( id ) => {
+        id = map_id( id );
+
+        delete defined[ id ];
+        delete definitions[ id ];
+        delete loading[ id ];
+    };
+    requirejs.toUrl = ( id ) => {
+        const match = /^(.*?)(\.[^./]+)?$/.exec( id );
+        const name = match[ 1 ], ext = match[ 2 ] || '';
+
+        return `${ config.paths[ name ] || name }${ ext }`;
+    };
+    requirejs.onResourceLoad = () => { };
+    requirejs.s = { contexts: { _: { defined: defined } } };
+
+    /**
+     * Load the library script the way RequireJS does, by a script node
+     */
+    requirejs.load = function ( context, name, url ) {
+        const node = document.createElement( 'script' );
+
+        node.type = 'text/javascript';
+        node.charset = 'utf-8';
+        node.async = true;
+
+        if ( typeof context.config.onNodeCreated === 'function' ) {
+            context.config.onNodeCreated( node, context.config, name, url );
+        }
+
+        node.addEventListener( 'load', () => context.completeLoad( name ) );
+        node.addEventListener( 'error', () => context.onError( new Error( `Script error for "${ name }"` ) ) );
+
+        node.src = url;
+        document.head.appendChild( node );
+    };
+
+    /**
+     * Serve scripts and stylesheets appended to the document after the latency
+     */
+    function serve( node ) {
+        const is_script = node.tagName === 'SCRIPT' && node.src;
+        const is_stylesheet = node.tagName === 'LINK' && node.rel === 'stylesheet';
+
+        if ( !is_script && !is_stylesheet ) return;
+
+        const url = is_script ? node.src : node.href;
+
+        network.requests.push( { url: url, type: is_script ? 'script' : 'css', integrity: node.getAttribute( 'integrity' ) } );
+
+        setTimeout( () => {
+            if ( is_script && !( url in network.scripts ) ) {
+                return node.dispatchEvent( new window.Event( 'error' ) );
+            }
+
+            // evaluate the library, it defines an anonymous module
+            if ( is_script ) define( [], network.scripts[ url ] );
+
+            node.dispatchEvent( new window.Event( 'load' ) );
+        }, latency );
+    }
+
+    new window.MutationObserver( ( records ) => records.forEach(
+        ( record ) => record.addedNodes.forEach( serve ) ) ).observe( document.head, { childList: true } );
+
+    return {
+        define: define,
+        requirejs: requirejs,
+        defined: defined,
+        network: network,
+    };
+}
+
+function _omit( obj, keys ) {
+    return Object.fromEntries( Object.entries( obj ).filter( ( [ key ] ) => !keys.includes( key ) ) );
+}
+
+
+module.exports = {
+    create_loader: create_loader,
+};
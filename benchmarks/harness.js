@@ -0,0 +1,143 @@
+/**
+ * Harness.
+ *
+ * Headless notebook environment for the benchmarks.
+ *
+ * The extension modules are loaded from `jupyter_require/static` into a jsdom window
+ * by a minimal AMD loader, notebook modules are replaced by the mocks. Libraries
+ * are served by a simulated network, see `amd.js`.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements the benchmark environment and measurements.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+'use strict';
+
+const fs = require( 'fs' );
+const path = require( 'path' );
+const { performance } = require( 'perf_hooks' );
+
+const { JSDOM } = require( 'jsdom' );
+
+const amd = require( './amd' );
+const mocks = require( './mocks' );
+
+const STATIC_DIR = path.resolve( __dirname, '..', 'jupyter_require', 'static' );
+const NBEXTENSION = 'nbextensions/jupyter-require/';
+
+// globals missing in jsdom which are used by the extension
+const NODE_GLOBALS = [ 'TextEncoder', 'TextDecoder', 'AbortController', 'DecompressionStream', 'Response' ];
+
+/**
+ * Create headless notebook environment
+ *
+ * @param latency {Number} - simulated latency of loading libraries in milliseconds
+ * @returns {Object} - environment with the window, loader, mocks and extension modules
+ */
+function create_environment( { latency = 0 } = {} ) {
+    const dom = new JSDOM(
+        '<!DOCTYPE html><html><head></head><body><div id="notebook-container"></div></body></html>',
+        { url: 'http://localhost:8888/notebooks/benchmark.ipynb', runScripts: 'outside-only', pretendToBeVisual: true }
+    );
+    const window = dom.window;
+
+    NODE_GLOBALS
+        .filter( ( name ) => window[ name ] === undefined && global[ name ] !== undefined )
+        .forEach( ( name ) => window[ name ] = global[ name ] );
+
+    const $ = require( 'jquery' )( window );
+    window.$ = window.jQuery = $;
+
+    const loader = amd.create_loader( window, { static_dir: STATIC_DIR, prefix: NBEXTENSION, latency: latency } );
+    const requirejs = loader.requirejs;
+    const defined = loader.defined;
+
+    window.define = loader.define;
+    window.require = window.requirejs = requirejs;
+
+    const notebook_mocks = mocks.create_mocks( window );
+
+    defined[ 'underscore' ] = window._ = require( 'underscore' );
+    defined[ 'jquery' ] = $;
+    defined[ 'js-logger' ] = require( 'js-logger' );
+    Object.assign( defined, notebook_mocks.modules );
+
+    return {
+        window: window,
+        $: $,
+        mocks: notebook_mocks,
+        requirejs: requirejs,
+        network: loader.network,
+
+        /**
+         * Serve library by the simulated network, the library is loaded once required
+         *
+         * @param name {String} - library name
+         * @param factory {Function} - library factory
+         */
+        library: ( name, factory ) => {
+            const url = `https://cdn.example.org/${ name }`;
+
+            loader.network.scripts[ `${ url }.js` ] = factory;
+            requirejs.config( { paths: { [ name ]: url } } );
+        },
+
+        /**
+         * Load the extension module
+         *
+         * @param name {String} - module name, i.e. 'core'
+         */
+        module: ( name ) => requirejs( `${ NBEXTENSION }${ name }` ),
+    };
+}
+
+/**
+ * Measure duration of the benchmark
+ *
+ * @param name {String} - benchmark name
+ * @param fn {Function} - measured function, receives the state returned by `setup`
+ * @param params {Object} - benchmark parameters recorded with the results
+ * @param iterations {Number} - number of measured iterations
+ * @param warmup {Number} - number of warm-up iterations
+ * @param setup {Function} - function preparing each iteration, not measured
+ * @param operations {Number} - number of operations performed by each iteration
+ * @returns {Promise<Object>} - statistics of the durations in milliseconds
+ */
+async function measure( name, fn, { params = {}, iterations = 20, warmup = 3, setup, operations = 1 } = {} ) {
+    let samples = [];
+
+    for ( let i = 0; i < warmup + iterations; i++ ) {
+        const state = setup ? await setup() : undefined;
+
+        const start = performance.now();
+        await fn( state );
+        const duration = performance.now() - start;
+
+        if ( i >= warmup ) samples.push( duration );
+    }
+
+    samples.sort( ( a, b ) => a - b );
+
+    const mean = samples.reduce( ( a, b ) => a + b, 0 ) / samples.length;
+    const quantile = ( q ) => samples[ Math.min( samples.length - 1, Math.floor( q * samples.length ) ) ];
+
+    return {
+        name: name,
+        params: params,
+        iterations: iterations,
+        mean: mean,
+        median: quantile( 0.5 ),
+        p95: quantile( 0.95 ),
+        min: samples[ 0 ],
+        max: samples[ samples.length - 1 ],
+        ops_per_sec: mean > 0 ? operations * 1000 / mean : null,
+    };
+}
+
+
+module.exports = {
+    create_environment: create_environment,
+    measure: measure,
+};
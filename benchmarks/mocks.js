@@ -0,0 +1,233 @@
+/**
+ * Mocks.
+ *
+ * Stand-ins of the classic notebook modules used by the extension.
+ *
+ * Only the parts of the notebook API the extension relies on are implemented,
+ * DOM operations are performed on the jsdom document as in the notebook.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements mocks of the notebook, cells, outputs, events and comms.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+'use strict';
+
+const MIME_HTML = 'text/html';
+const MIME_TEXT = 'text/plain';
+
+/**
+ * Create mocks of the notebook modules in the window
+ *
+ * @param window {Window} - jsdom window with jQuery
+ * @returns {Object} - mocked modules by their ids and the notebook
+ */
+function create_mocks( window ) {
+    const $ = window.$;
+
+    // 'base/js/events'
+    const events = $( {} );
+
+    let comm_id = 0;
+
+    // 'services/kernels/comm'
+    class Comm {
+        constructor( target_name, id ) {
+            this.target_name = target_name;
+            this.comm_id = id || `comm-${ ++comm_id }`;
+            this.sent = [];
+            this._closed = false;
+        }
+
+        open( data ) { this.sent.push( data ); }
+
+        send( data ) { this.sent.push( data ); }
+
+        close() {
+            this._closed = true;
+
+            if ( this._close_callback ) this._close_callback( { content: { comm_id: this.comm_id } } );
+        }
+
+        on_msg( callback ) { this._msg_callback = callback; }
+
+        on_close( callback ) { this._close_callback = callback; }
+
+        /**
+         * Deliver message sent by the kernel
+         *
+         * @returns {Promise} - resolved once the message has been handled
+         */
+        async deliver( data, buffers = [] ) {
+            return await this._msg_callback( { content: { comm_id: this.comm_id, data: data }, buffers: buffers } );
+        }
+    }
+
+    class CommManager {
+        constructor() {
+            this.targets = {};
+            this.comms = {};
+        }
+
+        register_target( target_name, f ) { this.targets[ target_name ] = f; }
+
+        register_comm( comm ) {
+            this.comms[ comm.comm_id ] = Promise.resolve( comm );
+
+            return comm.comm_id;
+        }
+
+        unregister_comm( comm ) { delete this.comms[ comm.comm_id ]; }
+
+        /**
+         * Open comm from the kernel side
+         *
+         * @returns {Comm}
+         */
+        open( target_name, data = {} ) {
+            const comm = new Comm( target_name );
+
+            this.register_comm( comm );
+            this.targets[ target_name ]( comm, { content: { comm_id: comm.comm_id, data: data } } );
+
+            return comm;
+        }
+    }
+
+    // 'notebook/js/outputarea'
+    class OutputArea {
+        constructor() {
+            this.element = $( '<div class="output"/>' );
+            this.outputs = [];
+            this.events = events;
+            this.keyboard_manager = { register_events: () => { } };
+        }
+
+        create_output_area() { return $( '<div class="output_area"/>' ); }
+
+        create_output_subarea( md, classes, mime ) {
+            return $( '<div/>' ).addClass( 'output_subarea' ).addClass( classes );
+        }
+
+        append_output( json ) {
+            this.outputs.push( json );
+
+            let output = this.create_output_area();
+            let subarea = this.create_output_subarea( {}, 'output_html rendered_html', MIME_HTML );
+
+            if ( json.data && json.data[ MIME_HTML ] ) subarea.html( json.data[ MIME_HTML ] );
+            else if ( json.data && json.data[ MIME_TEXT ] ) subarea.text( json.data[ MIME_TEXT ] );
+
+            output.append( subarea );
+            this.element.append( output );
+
+            json.element = output;
+
+            this.events.trigger( 'output_added.OutputArea', { output_area: this, output: json } );
+        }
+
+        clear_output() {
+            this.element.empty();
+            this.outputs = [];
+        }
+
+        toJSON() { return this.outputs; }
+    }
+
+    // 'notebook/js/codecell'
+    class CodeCell {
+        constructor() {
+            this.cell_type = 'code';
+            this.metadata = {};
+            this.running = false;
+            this.last_msg_id = undefined;
+
+            this.output_area = new OutputArea();
+
+            this.element = $( '<div class="cell code_cell"/>' );
+            this.element.append( this.output_area.element );
+        }
+
+        get_callbacks() {
+            return { iopub: { output: () => { } }, shell: { reply: () => { } } };
+        }
+    }
+
+    // 'base/js/namespace'
+    class Notebook {
+        constructor() {
+            this.metadata = {};
+            this.cells = [];
+            this.selected = 0;
+            this.trusted = true;
+            this._fully_loaded = true;
+            this.kernel = { comm_manager: new CommManager() };
+
+            this.container = $( window.document.getElementById( 'notebook-container' ) );
+        }
+
+        get_cells() { return this.cells; }
+
+        get_selected_cell() { return this.cells[ this.selected ]; }
+
+        get_prev_cell( cell ) { return this.cells[ this.cells.indexOf( cell ) - 1 ] || null; }
+
+        set_dirty() { }
+
+        /**
+         * Replace cells of the notebook
+         *
+         * @param n {Number} - number of new code cells
+         * @returns {Array<CodeCell>}
+         */
+        reset( n ) {
+            this.container.empty();
+            this.cells = Array.from( { length: n }, () => new CodeCell() );
+            this.cells.forEach( ( cell ) => this.container.append( cell.element ) );
+            this.selected = 0;
+
+            return this.cells;
+        }
+
+        save_notebook() {
+            if ( this._resolve_saved ) this._resolve_saved();
+
+            return Promise.resolve();
+        }
+
+        /**
+         * Get promise resolved once the notebook is saved
+         *
+         * @returns {Promise}
+         */
+        wait_saved() { return new Promise( ( resolve ) => this._resolve_saved = resolve ); }
+    }
+
+    const notebook = new Notebook();
+
+    const Jupyter = {
+        Notebook: Notebook,
+        notebook: notebook,
+        actions: { register: ( action, name, prefix ) => `${ prefix }:${ name }` },
+        toolbar: { add_buttons_group: () => $( '<div class="btn-group"/>' ) },
+    };
+
+    return {
+        notebook: notebook,
+        events: events,
+
+        modules: {
+            'base/js/namespace': Jupyter,
+            'base/js/events': events,
+            'notebook/js/codecell': { CodeCell: CodeCell },
+            'notebook/js/outputarea': { OutputArea: OutputArea },
+            'services/kernels/comm': { Comm: Comm, CommManager: CommManager },
+        },
+    };
+}
+
+
+module.exports = {
+    create_mocks: create_mocks,
+};
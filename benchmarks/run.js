@@ -0,0 +1,331 @@
+#!/usr/bin/env node
+/**
+ * Benchmarks.
+ *
+ * Benchmarks of the JavaScript pipeline of the extension in a headless notebook.
+ *
+ * The benchmarks run offline, dependencies are installed by `npm install` in this directory.
+ *
+ * Usage:
+ *
+ *     node run.js [--cells 10,100,1000] [--iterations 20] [--latency 0] [--filter <name>]
+ *                 [--output results.json] [--compare baseline.json] [--threshold 0.1]
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file runs the benchmarks and records their results.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+'use strict';
+
+const fs = require( 'fs' );
+const { execSync } = require( 'child_process' );
+const { parseArgs } = require( 'util' );
+
+const { create_environment, measure } = require( './harness' );
+
+const LIBRARIES = Array.from( { length: 10 }, ( v, i ) => `lib${ i }` );
+
+// linked by the css! plugin
+const STYLESHEET = { style: 'https://cdn.example.org/style.css' };
+
+const SCRIPT = `
+    let html = '<svg width="320" height="120">';
+    for ( let i = 0; i < 50; i++ ) {
+        html += '<circle cx="' + ( i * 6 ) + '" cy="60" r="' + lib0.radius + '"></circle>';
+    }
+    element.html( html + '</svg>' );
+`;
+
+const EXECUTIONS = 100;
+
+// jsdom does not perform layout, the observers are never notified
+class ResizeObserverStub {
+    observe() { }
+
+    unobserve() { }
+
+    disconnect() { }
+}
+
+const OUTPUT_HTML = `<svg width="320" height="120">${ '<circle cx="10" cy="60" r="4"></circle>'.repeat( 50 ) }</svg>`;
+
+const FROZEN_OUTPUT = {
+    output_type: 'display_data',
+    data: {
+        'text/html': OUTPUT_HTML,
+        'text/plain': '<JupyterRequire.display.FrozenOutput object>',
+    },
+    metadata: { frozen: true, finalized: true },
+};
+
+function parse_args() {
+    const { values } = parseArgs( {
+        options: {
+            cells: { type: 'string', default: '10,100,1000' },
+            iterations: { type: 'string', default: '20' },
+            latency: { type: 'string', default: '0' },
+            filter: { type: 'string' },
+            output: { type: 'string' },
+            compare: { type: 'string' },
+            threshold: { type: 'string', default: '0.1' },
+        },
+    } );
+
+    return {
+        cells: values.cells.split( ',' ).map( Number ),
+        iterations: Number( values.iterations ),
+        latency: Number( values.latency ),
+        filter: values.filter,
+        output: values.output,
+        compare: values.compare,
+        threshold: Number( values.threshold ),
+    };
+}
+
+/**
+ * Define benchmarks of the environment
+ *
+ * @returns {Array<Object>} - benchmarks
+ */
+function define_benchmarks( env, { cells, iterations } ) {
+    const notebook = env.mocks.notebook;
+    const events = env.mocks.events;
+
+    const core = env.module( 'core' );
+    const display = env.module( 'display' );
+
+    const undef_libraries = () => [ ...LIBRARIES, ...Object.keys( STYLESHEET ) ]
+        .forEach( ( lib ) => env.requirejs.undef( lib ) );
+
+    /**
+     * Replace notebook cells by cells with live outputs
+     */
+    const live_outputs = ( n ) => notebook.reset( n ).forEach( ( cell ) => {
+        const element = display.create_output_subarea( cell.output_area ).html( OUTPUT_HTML );
+        const execute = ( output_area, target ) => Promise.resolve( target || element );
+
+        const display_data = display.append_display_data( execute, element, cell.output_area );
+        display.append_output( display.mime_types.MIME_JAVASCRIPT, display_data, element, cell.output_area );
+    } );
+
+    /**
+     * Replace notebook cells by cells with frozen outputs as stored in the notebook file
+     */
+    const frozen_outputs = ( n ) => notebook.reset( n ).forEach( ( cell ) => {
+        cell.metadata.require = LIBRARIES.slice( 0, 2 );
+        cell.output_area.append_output( JSON.parse( JSON.stringify( FROZEN_OUTPUT ) ) );
+    } );
+
+    // outputs are kept live for the freezing and finalization benchmarks
+    const keep_live_outputs = () => core.set_notebook_options( { retention_max_outputs: Number.MAX_SAFE_INTEGER } );
+
+    let benchmarks = [];
+
+    [ 1, 10 ].forEach( ( n ) => {
+        const required = LIBRARIES.slice( 0, n );
+
+        benchmarks.push( {
+            name: 'check_requirements',
+            params: { libraries: n, loaded: true },
+            fn: () => Promise.all( core.check_requirements( required ) ),
+        } );
+        benchmarks.push( {
+            name: 'check_requirements',
+            params: { libraries: n, loaded: false },
+            setup: undef_libraries,
+            fn: () => Promise.all( core.check_requirements( required ) ),
+        } );
+    } );
+
+    benchmarks.push( {
+        name: 'execute_script',
+        params: {},
+        setup: () => {
+            let cell = notebook.reset( 1 )[ 0 ];
+            cell.running = true;
+
+            return cell;
+        },
+        fn: ( cell ) => core.execute_script.call( cell, SCRIPT, [ 'lib0' ], [ 'lib0' ] ),
+    } );
+
+    let comm;
+    let seq = 0;
+
+    const execute_message = () => ( {
+        seq: seq++,
+        session: 'benchmark',
+        script: SCRIPT,
+        require: [ 'lib0' ],
+        parameters: [ 'lib0' ],
+        silent: false,
+        barrier: false,
+        worker: false,
+    } );
+
+    benchmarks.push( {
+        name: 'execute_comm',
+        params: {},
+        setup: () => {
+            comm = comm || notebook.kernel.comm_manager.open( 'execute' );
+
+            let cell = notebook.reset( 1 )[ 0 ];
+            cell.running = true;
+        },
+        fn: () => comm.deliver( execute_message() ),
+    } );
+
+    // executions per second, without ResizeObserver the output width
+    // is measured on every execution as it used to be
+    [ false, true ].forEach( ( resize_observer ) => benchmarks.push( {
+        name: 'execute_throughput',
+        params: { executions: EXECUTIONS, resize_observer: resize_observer },
+        operations: EXECUTIONS,
+        setup: () => {
+            env.window.ResizeObserver = resize_observer ? ResizeObserverStub : undefined;
+            comm = comm || notebook.kernel.comm_manager.open( 'execute' );
+
+            let cell = notebook.reset( 1 )[ 0 ];
+            cell.running = true;
+        },
+        fn: () => Promise.all( Array.from( { length: EXECUTIONS }, () => comm.deliver( execute_message() ) ) ),
+    } ) );
+
+    cells.forEach( ( n ) => {
+        [ 'eager', 'prefetch', 'lazy' ].forEach( ( policy ) => benchmarks.push( {
+            name: 'load_extension',
+            params: { cells: n, load_policy: policy },
+            setup: () => {
+                frozen_outputs( n );
+                undef_libraries();
+                core.set_notebook_options( { load_policy: policy } );
+            },
+            fn: () => env.module( 'loader' )( { reload: true } ),
+        } ) );
+
+        benchmarks.push( {
+            name: 'freeze_cells',
+            params: { cells: n },
+            setup: () => {
+                keep_live_outputs();
+                live_outputs( n );
+            },
+            fn: () => events.trigger( 'before_save.Notebook' ),
+        } );
+
+        benchmarks.push( {
+            name: 'finalize_cells',
+            params: { cells: n },
+            setup: () => {
+                keep_live_outputs();
+                live_outputs( n );
+
+                return notebook.wait_saved();
+            },
+            fn: ( saved ) => {
+                events.trigger( 'kernel_dead.Session' );
+
+                return saved;
+            },
+        } );
+    } );
+
+    return benchmarks.map( ( b ) => Object.assign( { iterations: iterations }, b ) );
+}
+
+/**
+ * Compare results with the baseline
+ *
+ * @returns {boolean} - whether any of the benchmarks regressed beyond the threshold
+ */
+function compare( results, baseline, threshold ) {
+    const key = ( r ) => `${ r.name } ${ JSON.stringify( r.params ) }`;
+    const previous = new Map( baseline.results.map( ( r ) => [ key( r ), r ] ) );
+
+    let regressed = false;
+
+    console.log( `\nComparison with baseline ${ baseline.commit || '' } (median):\n` );
+    results.forEach( ( r ) => {
+        const b = previous.get( key( r ) );
+        if ( b === undefined ) return console.log( `  ${ key( r ).padEnd( 56 ) } new` );
+
+        const change = ( r.median - b.median ) / b.median;
+        const flag = change > threshold ? 'REGRESSION' : change < -threshold ? 'improvement' : '';
+
+        regressed = regressed || change > threshold;
+
+        console.log( `  ${ key( r ).padEnd( 56 ) } ${ b.median.toFixed( 3 ).padStart( 10 ) } ms ` +
+            `-> ${ r.median.toFixed( 3 ).padStart( 10 ) } ms ${ ( change * 100 ).toFixed( 1 ).padStart( 7 ) } % ${ flag }` );
+    } );
+
+    return regressed;
+}
+
+function git_commit() {
+    try {
+        return execSync( 'git rev-parse --short HEAD', { cwd: __dirname, stdio: [ 'ignore', 'pipe', 'ignore' ] } )
+            .toString().trim();
+    } catch ( err ) {
+        return null;
+    }
+}
+
+async function main() {
+    const args = parse_args();
+
+    const env = create_environment( { latency: args.latency } );
+    const notebook = env.mocks.notebook;
+
+    LIBRARIES.forEach( ( lib, i ) => env.library( lib, () => ( { name: lib, radius: 4 + i } ) ) );
+
+    // libraries are loaded through the shim, the css! mapping and the integrity hook
+    notebook.metadata.require = {
+        paths: Object.assign(
+            Object.fromEntries( LIBRARIES.map( ( lib ) => [ lib, env.requirejs.toUrl( lib ) ] ) ), STYLESHEET ),
+        shim: { lib1: [ 'lib0' ] },
+        integrity: { lib0: 'sha384-benchmark' },
+    };
+    notebook.reset( 1 );
+
+    // register event handlers and comm targets
+    await env.module( 'loader' )();
+
+    let results = [];
+    for ( const b of define_benchmarks( env, args ) ) {
+        if ( args.filter && !b.name.includes( args.filter ) ) continue;
+
+        const r = await measure( b.name, b.fn,
+            { params: b.params, iterations: b.iterations, setup: b.setup, operations: b.operations } );
+        results.push( r );
+
+        console.log( `${ `${ r.name } ${ JSON.stringify( r.params ) }`.padEnd( 56 ) } ` +
+            `median ${ r.median.toFixed( 3 ).padStart( 10 ) } ms  p95 ${ r.p95.toFixed( 3 ).padStart( 10 ) } ms` +
+            ( b.operations ? `  ${ r.ops_per_sec.toFixed( 0 ).padStart( 8 ) } ops/s` : '' ) );
+    }
+
+    const report = {
+        created: new Date().toISOString(),
+        commit: git_commit(),
+        node: process.version,
+        jsdom: require( 'jsdom/package.json' ).version,
+        latency: args.latency,
+        results: results,
+    };
+
+    if ( args.output ) fs.writeFileSync( args.output, JSON.stringify( report, null, 2 ) + '\n' );
+
+    let regressed = false;
+    if ( args.compare ) {
+        regressed = compare( results, JSON.parse( fs.readFileSync( args.compare, 'utf-8' ) ), args.threshold );
+    }
+
+    env.window.close();
+    process.exit( regressed ? 1 : 0 );
+}
+
+main().catch( ( err ) => {
+    console.error( err );
+    process.exit( 2 );
+} );
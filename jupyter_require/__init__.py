@@ -23,14 +23,14 @@
 
 """Jupyter library and magic extension for managing linked JavaScript and CSS scripts and styles."""
 
-import logging
 import time
 
 import daiquiri
-import daiquiri.formatter
 
 from .__about__ import __version__
 
+from .log import setup_logging
+
 from .notebook import link_css
 from .notebook import link_js
 from .notebook import load_js
@@ -45,31 +45,22 @@ from .core import require
 
 from IPython import get_ipython
 
-daiquiri.setup(
-    level=logging.DEBUG,
-    outputs=[
-        daiquiri.output.File(
-            level=logging.DEBUG,
-            filename='.log',
-            formatter=daiquiri.formatter.ColorFormatter(
-                fmt="%(asctime)s [%(process)d] %(color)s%(levelname)-8.8s %(name)s:"
-                    "%(lineno)d: [JupyterRequire] %(message)s%(color_stop)s"
-            )),
-        daiquiri.output.Stream(
-            level=logging.WARN,
-            formatter=daiquiri.formatter.ColorFormatter(
-                fmt="%(asctime)s [%(process)d] %(color)s%(levelname)-8.8s %(name)s:"
-                    "%(lineno)d: [JupyterRequire] %(message)s%(color_stop)s"
-            )
-        ),
-    ],
-)
+setup_logging()
 
 logger = daiquiri.getLogger()
 
+wait_for_frontend = True
+"""Whether to wait for the frontend to register the comm targets, unset by the frontend on kernel restart."""
+
+
+def load_ipython_extension(ipython, wait: bool = None):
+    """Load the IPython Jupyter Require extension.
 
-def load_ipython_extension(ipython):
-    """Load the IPython Jupyter Require extension."""
+    :param wait: bool, whether to wait for the frontend to handle the opened comms [default: `wait_for_frontend`]
+
+        The frontend unsets `wait_for_frontend` and loads the extension by the extension
+        manager on kernel restart, since the comm targets are registered already.
+    """
     from .magic import RequireJSMagic
 
     logger.debug("Loading Jupyter Require extension.")
@@ -79,7 +70,12 @@ def load_ipython_extension(ipython):
         return
 
     register_comm_targets(ipython.kernel)
-    time.sleep(0.5)  # let the JS register the targets
+
+    if wait is None:
+        wait = wait_for_frontend
+
+    if wait:
+        time.sleep(0.5)  # let the JS register the targets
 
     # magic: %require
     ipython.register_magics(RequireJSMagic)
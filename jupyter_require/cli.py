@@ -0,0 +1,121 @@
+# jupyter-require
+# Copyright 2019 Marek Cermak <macermak@redhat.com>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Command line interface of jupyter-require.
+
+The command is available as `jupyter-require` or `jupyter require`.
+"""
+
+import argparse
+import sys
+
+from typing import List
+
+from .__about__ import __version__
+from .compact import compact_files
+
+
+def _format_size(size: int) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{size:.1f} GiB"
+
+
+def compact(args: argparse.Namespace) -> int:
+    """Compact notebooks and report before/after sizes."""
+    size_before = size_after = 0
+    failed = 0
+
+    for result in compact_files(
+            args.paths,
+            jobs=args.jobs,
+            clear_notebook_metadata=args.clear_notebook_metadata,
+            dry_run=args.dry_run):
+
+        if result.error is not None:
+            failed += 1
+            print(f"{result.path}: error: {result.error}", file=sys.stderr)
+
+            continue
+
+        size_before += result.size_before
+        size_after += result.size_after
+
+        if not args.quiet:
+            print(f"{result.path}: "
+                  f"{_format_size(result.size_before)} -> {_format_size(result.size_after)} "
+                  f"(finalized: {result.finalized}, "
+                  f"deduplicated: {result.deduplicated}, "
+                  f"pruned: {result.pruned})")
+
+    saved = size_before - size_after
+    print(f"Total: {_format_size(size_before)} -> {_format_size(size_after)}, "
+          f"saved {_format_size(saved)}"
+          f"{' (dry run)' if args.dry_run else ''}")
+
+    return 1 if failed else 0
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='jupyter-require',
+        description="Manage notebooks created with jupyter-require.")
+    parser.add_argument('--version', action='version', version=__version__)
+
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    compact_parser = subparsers.add_parser(
+        'compact',
+        help="Finalize live outputs, deduplicate safe scripts and prune requirement metadata.")
+    compact_parser.add_argument(
+        'paths', nargs='+', metavar='PATH',
+        help="Notebook files or directories which are searched for notebooks recursively.")
+    compact_parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help="Number of worker processes [default: number of CPUs].")
+    compact_parser.add_argument(
+        '--clear-notebook-metadata', action='store_true',
+        help="Clear notebook requirement metadata as well.")
+    compact_parser.add_argument(
+        '-n', '--dry-run', action='store_true',
+        help="Only report the changes, do not write the notebooks.")
+    compact_parser.add_argument(
+        '-q', '--quiet', action='store_true',
+        help="Only report the total sizes.")
+    compact_parser.set_defaults(func=compact)
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = get_parser().parse_args(argv)
+
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# jupyter-require
+# Copyright 2019 Marek Cermak <macermak@redhat.com>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Compaction of stored notebooks.
+
+Notebooks are processed offline, without the frontend, the same way
+the frontend finalizes outputs and clears requirement metadata.
+"""
+
+import json
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from typing import Iterable, Iterator, List, NamedTuple, Union
+
+# mime types
+MIME_JAVASCRIPT = 'application/javascript'
+MIME_TEXT = 'text/plain'
+
+SAFE_SCRIPT_REPR = "<JupyterRequire.display.SafeScript object>"
+
+
+class CompactionResult(NamedTuple):
+    """Result of notebook compaction."""
+
+    path: str
+    size_before: int
+    size_after: int
+    finalized: int = 0
+    """Number of finalized live outputs."""
+    deduplicated: int = 0
+    """Number of removed consecutive duplicate safe scripts."""
+    pruned: int = 0
+    """Number of cells with pruned requirement metadata."""
+    error: str = None
+
+    @property
+    def saved(self) -> int:
+        """Number of bytes saved."""
+        return self.size_before - self.size_after
+
+
+def is_safe_script(output: dict) -> bool:
+    """Return whether the output is a safe script."""
+    data = output.get('data', {})
+
+    return MIME_JAVASCRIPT in data and data.get(MIME_TEXT) == SAFE_SCRIPT_REPR
+
+
+def finalize_output(output: dict) -> Union[dict, None]:
+    """Finalize live display data output to its frozen form.
+
+    :returns: finalized output or None if there is nothing to be kept
+    """
+    metadata = output.get('metadata', {})
+
+    frozen_output = metadata.get('frozen_output', None) or {}
+    if not frozen_output:
+        return None
+
+    return {
+        'output_type': output['output_type'],
+        'data': frozen_output,
+        'metadata': {
+            'frozen': True,
+            'finalized': True,
+        },
+    }
+
+
+def compact(nb: dict, clear_notebook_metadata: bool = False) -> dict:
+    """Compact the notebook in place.
+
+    Live outputs are finalized, consecutive duplicate safe scripts within the outputs
+    of a cell are removed (scripts repeated later or in other cells are kept, since their
+    order and their output elements matter) and requirement metadata of the cells is pruned,
+    since finalized outputs no longer require anything.
+
+    :param nb: dict, notebook
+    :param clear_notebook_metadata: bool, whether to clear notebook requirement metadata as well
+    :returns: dict, counts of the changes
+    """
+    stats = {'finalized': 0, 'deduplicated': 0, 'pruned': 0}
+
+    for cell in nb.get('cells', []):
+        if cell.get('cell_type') != 'code':
+            continue
+
+        previous_script = None
+
+        outputs = []
+        for output in cell.get('outputs', []):
+            if output.get('output_type') == 'display_data' and output.get('metadata', {}).get('finalized') is False:
+                output = finalize_output(output)
+                stats['finalized'] += 1
+
+                if output is None:
+                    continue
+
+            if is_safe_script(output):
+                script = output['data'][MIME_JAVASCRIPT]
+                script = script if isinstance(script, str) else ''.join(script)
+
+                if script == previous_script:
+                    stats['deduplicated'] += 1
+                    continue
+
+                previous_script = script
+            else:
+                previous_script = None
+
+            outputs.append(output)
+
+        cell['outputs'] = outputs
+
+        if cell.get('metadata', {}).pop('require', None) is not None:
+            stats['pruned'] += 1
+
+    if clear_notebook_metadata:
+        nb.get('metadata', {}).pop('require', None)
+
+    return stats
+
+
+def compact_file(path: Union[str, Path],
+                 clear_notebook_metadata: bool = False,
+                 dry_run: bool = False) -> CompactionResult:
+    """Compact the notebook file in place.
+
+    :param path: path to the notebook
+    :param clear_notebook_metadata: bool, whether to clear notebook requirement metadata as well
+    :param dry_run: bool, whether to only report the changes
+    """
+    path = Path(path)
+
+    try:
+        content = path.read_text(encoding='utf-8')
+        nb = json.loads(content)
+
+        stats = compact(nb, clear_notebook_metadata=clear_notebook_metadata)
+
+        # the same format as nbformat writes
+        compacted = json.dumps(nb, indent=1, sort_keys=True, ensure_ascii=False) + '\n'
+    except Exception as exc:  # report and continue with the other notebooks
+        return CompactionResult(str(path), path.stat().st_size if path.exists() else 0, 0, error=str(exc))
+
+    size_before = len(content.encode('utf-8'))
+    size_after = len(compacted.encode('utf-8'))
+
+    if not dry_run and any(stats.values()):
+        path.write_text(compacted, encoding='utf-8')
+
+    return CompactionResult(str(path), size_before, size_after, **stats)
+
+
+def find_notebooks(paths: Iterable[Union[str, Path]]) -> Iterator[Path]:
+    """Find notebooks in the paths, directories are searched recursively."""
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(
+                p for p in path.rglob('*.ipynb') if '.ipynb_checkpoints' not in p.parts)
+        else:
+            yield path
+
+
+def compact_files(paths: Iterable[Union[str, Path]],
+                  jobs: int = None,
+                  **kwargs) -> Iterator[CompactionResult]:
+    """Compact the notebooks in parallel using a process pool.
+
+    :param paths: notebook files or directories containing notebooks
+    :param jobs: int, number of worker processes [default: number of CPUs]
+    :param kwargs: keyword arguments passed to `compact_file()`
+    :returns: results in order of the notebooks
+    """
+    notebooks: List[Path] = list(find_notebooks(paths))
+
+    if jobs == 1 or len(notebooks) <= 1:
+        yield from (compact_file(nb, **kwargs) for nb in notebooks)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(compact_file, nb, **kwargs) for nb in notebooks]
+
+        for future in futures:
+            yield future.result()
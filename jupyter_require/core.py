@@ -23,8 +23,15 @@
 
 """Module for managing linked JavaScript scripts and CSS styles."""
 
+import gzip
+import hashlib
+import json
 import logging
+import math
+import re
 import string
+import threading
+import zlib
 
 import daiquiri
 
@@ -33,13 +40,18 @@ from datetime import datetime
 from collections import OrderedDict
 from pathlib import Path
 
-from typing import List, Union
+from typing import Any, List, Tuple, Union
 
 from IPython import get_ipython
 from IPython.core.display import display, Javascript
 
 from ipykernel.comm import Comm
 
+from . import lockfile
+
+from .transfer import DataTransfer
+from .watch import FileWatcher
+
 logger = daiquiri.getLogger()
 
 
@@ -48,6 +60,23 @@ Jupyter = get_ipython()
 
 _is_notebook = Jupyter and Jupyter.has_trait('kernel')
 
+NBEXTENSION = 'nbextensions/jupyter-require'
+"""RequireJS path to the jupyter-require nbextension modules."""
+
+COMM_TARGETS = ('config', 'execute', 'safe_execute', 'data', 'communicate')
+"""Targets of the comms used by jupyter-require."""
+
+COMPRESSION_METHODS = OrderedDict([
+    ('deflate', zlib.compress),
+    ('gzip', gzip.compress),
+])
+"""Supported compression methods of comm payloads."""
+
+FRONTEND_STATS = ('cache_info', 'retention_info')
+"""Types of events reporting frontend statistics."""
+
+_frontend_stats = {}
+
 class CommError(Exception):
     """Base class for Comm related exceptions."""
 
@@ -69,12 +98,35 @@ class RequireJS(object):
     """Required libraries."""
     __SHIM = OrderedDict()
     """Shim for required libraries."""
+    __INTEGRITY = OrderedDict()
+    """Subresource integrity hashes of required libraries."""
+    __ESM = OrderedDict()
+    """ES modules loaded by native `import()`."""
+    __DEFINED = OrderedDict()
+    """Modules defined from local files."""
+
+    __watcher = None
+
+    __session = None
+    """Session of the comms, messages are numbered within the session."""
+    __seq = 0
+    __seq_lock = threading.Lock()
+
+    __compression = None
+    """Compression method negotiated with the frontend."""
+    __compression_stats = {'messages': 0, 'raw_bytes': 0, 'compressed_bytes': 0}
+
+    compression_threshold = 1024
+    """Minimum size of comm payload in bytes to be compressed."""
 
     # Comms strictly require to be shared between instances
     __config_comm = None
     __execution_comm = None
     __safe_execution_comm = None
 
+    __comm_session = None
+    """Session of the frontend client which handles the comms."""
+
     __is_initialized = False
 
     def __new__(cls, required: dict = None, shim: dict = None):
@@ -108,7 +160,13 @@ class RequireJS(object):
 
         :param library: str, key to the library
         :param path: str, path (url) to the library without .js suffix
+        :param esm: bool, whether the library is an ES module [optional]
+
+            ES modules are loaded by native `import()`, the path is the full URL of the module.
         """
+        if kwargs.pop('esm', False):
+            return self.config({}, esm={library: path})
+
         self.config({library: path}, shim=kwargs.pop('shim', {}))
 
     @property
@@ -148,6 +206,16 @@ class RequireJS(object):
         """Get shim defined in requireJS config."""
         return dict(RequireJS.__SHIM)
 
+    @property
+    def esm(self) -> dict:
+        """Get ES modules loaded by native `import()`."""
+        return dict(RequireJS.__ESM)
+
+    @property
+    def integrity(self) -> dict:
+        """Get subresource integrity hashes of required libraries."""
+        return dict(RequireJS.__INTEGRITY)
+
     @property
     def execution_comm(self) -> Comm:
         """Return execution Comm."""
@@ -158,6 +226,18 @@ class RequireJS(object):
         """Return execution Comm."""
         return RequireJS.__safe_execution_comm
 
+    @property
+    def compression_info(self) -> dict:
+        """Get negotiated compression method and statistics of compressed payloads."""
+        stats = dict(RequireJS.__compression_stats)
+        stats['ratio'] = stats['raw_bytes'] / stats['compressed_bytes'] if stats['compressed_bytes'] else None
+
+        return {
+            'method': RequireJS.__compression,
+            'threshold': RequireJS.compression_threshold,
+            **stats
+        }
+
     def display_context(self):
         """Print defined libraries."""
         _ = self  # ignore
@@ -170,7 +250,7 @@ class RequireJS(object):
                 .replace(/,/g, '<br>'));
         """))
 
-    def config(self, paths: dict, shim: dict = None):
+    def config(self, paths: dict, shim: dict = None, esm: dict = None):
         """Links JavaScript libraries to Jupyter Notebook.
 
         This is Python binding for JS RequireJS `require.config` call.
@@ -191,10 +271,18 @@ class RequireJS(object):
         ```
 
         Please note that <path> does __NOT__ contain `.js` suffix.
+
+        Paths ending with `.css` are loaded as stylesheets by the `css!` plugin,
+        so that the stylesheets can be required the same way as scripts.
+
+        ES modules (`esm`) are given by their full URLs, they are added to the page
+        import map and loaded by native `import()` in parallel with requireJS modules.
+        Scripts receive the module namespace objects, i.e. `<module>.default`.
         """
         logger.debug("Configuration requested: %s", {
             "paths": paths,
-            "shim": shim
+            "shim": shim,
+            "esm": esm
         })
 
         if not self.is_initialized:
@@ -202,26 +290,251 @@ class RequireJS(object):
 
         RequireJS.__LIBS.update(paths)
         RequireJS.__SHIM.update(shim or {})
+        RequireJS.__ESM.update(esm or {})
+
+        self._send_config()
+
+    def config_from(self, path: str, esm: bool = False):
+        """Link JavaScript libraries described by a lockfile or an import map.
+
+        All the libraries are configured by a single message, the frontend
+        loads them in the precomputed dependency order and verifies their
+        subresource integrity hashes, if any.
+
+        See `jupyter_require.lockfile` for the lockfile format.
+
+        :param path: str, path to jupyter-require lockfile or import map JSON
+        :param esm: bool, whether the import map entries are ES modules
+        """
+        libraries = lockfile.load(path, esm=esm)
+
+        logger.debug("Configuration requested from '%s': %s", path, libraries)
+
+        if not self.is_initialized:
+            raise CommError("Comms haven't been initialized properly.")
+
+        order = lockfile.dependency_order(libraries.paths, libraries.shim)
+
+        RequireJS.__LIBS.update((lib, libraries.paths[lib]) for lib in order)
+        RequireJS.__SHIM.update(libraries.shim)
+        RequireJS.__INTEGRITY.update(libraries.integrity)
+        RequireJS.__ESM.update(libraries.esm)
+
+        self._send_config()
+
+    def lock(self, path: str = None, integrity: bool = False) -> dict:
+        """Generate lockfile of the linked libraries.
+
+        :param path: str, path to write the lockfile to [optional]
+        :param integrity: bool, whether to fetch the libraries and compute
+            integrity hashes of those which do not have any
+        :returns: dict, the lockfile
+        """
+        hashes = dict(RequireJS.__INTEGRITY)
+
+        if integrity:
+            for lib, url in RequireJS.__LIBS.items():
+                if lib in hashes or url.endswith('.css'):
+                    continue
+
+                if '://' in url or url.startswith('//'):
+                    hashes[lib] = lockfile.fetch_integrity(url)
+                else:
+                    hashes[lib] = lockfile.compute_integrity(self._get_local_path(lib).read_bytes())
+
+            RequireJS.__INTEGRITY.update(hashes)
+
+        data = lockfile.dump(lockfile.Libraries(
+            dict(RequireJS.__LIBS), dict(RequireJS.__SHIM), hashes, dict(RequireJS.__ESM)))
+
+        if path is not None:
+            Path(path).write_text(json.dumps(data, indent=2) + '\n', encoding='utf-8')
+
+        return data
+
+    def _send_config(self):
+        """Send the current configuration to the frontend."""
+        try:
+            order = lockfile.dependency_order(RequireJS.__LIBS, RequireJS.__SHIM)
+        except ValueError as exc:
+            logger.warning("%s Libraries are loaded in the order they were configured.", exc)
+
+            order = list(RequireJS.__LIBS)
 
         # data to be passed to require.config()
-        data = {'paths': RequireJS.__LIBS, 'shim': RequireJS.__SHIM}
+        data = {
+            'paths': RequireJS.__LIBS,
+            'shim': RequireJS.__SHIM,
+            'esm': RequireJS.__ESM,
+            'integrity': RequireJS.__INTEGRITY,
+            'order': order,
+        }
 
         if RequireJS.__config_comm is None:
             raise CommError("Comm 'config' is not open.")
 
-        RequireJS.__config_comm.send(data=data)
+        # configuration has to be applied before any following message
+        self._send(RequireJS.__config_comm, data, barrier=True)
+
+    def send_data(self, name: str, data, chunk_size: int = 1000, window: int = 8) -> DataTransfer:
+        """Stream data to the frontend in chunks.
+
+        The data is exposed to the executed scripts by the name, either
+        as a whole once the transfer is complete by `await context.data(<name>)`
+        or incrementally by `for await (const items of context.stream(<name>))`.
+
+        :param name: str, name of the data
+        :param data: iterable or array-like (list, numpy array, pandas DataFrame, generator, ...)
+        :param chunk_size: int, number of items per chunk
+        :param window: int, number of chunks which can be sent without acknowledgement
+        :returns: DataTransfer, the transfer can be resumed if interrupted
+        """
+        if not self.is_initialized:
+            raise CommError("Comms haven't been initialized properly.")
+
+        return DataTransfer(name, data, comm_factory=create_comm, chunk_size=chunk_size, window=window)
+
+    @property
+    def config_hash(self) -> str:
+        """Get hash of the current configuration.
+
+        The frontend computes the same hash of the notebook configuration,
+        the hashes are compared when the comms are initialized.
+        """
+        return config_hash({'paths': RequireJS.__LIBS, 'shim': RequireJS.__SHIM, 'esm': RequireJS.__ESM})
+
+    def _send(self, comm: Comm, data: dict, barrier: bool = False):
+        """Send data over the comm, compress the payload if negotiated and worth it.
+
+        Messages of all the comms are numbered by a sequence number
+        so that the frontend can apply them in order. Barrier messages
+        are applied by the frontend only after all preceding messages have
+        been applied and before any following message is prepared.
+
+        Compressed payload is sent as a binary buffer and the message data
+        only carries the compression method.
+        """
+        _ = self  # ignore
+
+        with RequireJS.__seq_lock:
+            data = {**data, 'seq': RequireJS.__seq, 'session': RequireJS.__session, 'barrier': barrier}
+            RequireJS.__seq += 1
+
+        method = RequireJS.__compression
+        if method is None:
+            return comm.send(data=data)
+
+        payload = json.dumps(data).encode('utf-8')
+        if len(payload) < RequireJS.compression_threshold:
+            return comm.send(data=data)
+
+        compressed = COMPRESSION_METHODS[method](payload)
+        if len(compressed) >= len(payload):
+            return comm.send(data=data)
+
+        stats = RequireJS.__compression_stats
+        stats['messages'] += 1
+        stats['raw_bytes'] += len(payload)
+        stats['compressed_bytes'] += len(compressed)
+
+        logger.debug("Payload compressed by '%s': %d -> %d bytes (%.1fx).",
+                     method, len(payload), len(compressed), len(payload) / len(compressed))
+
+        return comm.send(data={'compressed': method}, buffers=[compressed])
 
     def pop(self, lib: str):
         """Remove JavaScript library from requirements.
 
         :param lib: key as passed to `config()`
         """
+        RequireJS.__INTEGRITY.pop(lib, None)
+
+        if RequireJS.__ESM.pop(lib, None) is not None:
+            return
+
         RequireJS.__LIBS.pop(lib)
         RequireJS.__SHIM.pop(lib)
 
+    def define(self, module: str, path: str):
+        """Define new module from a local JS file.
+
+        The module can be hot reloaded on file changes, see `watch()`.
+
+        :param module: str, module name
+        :param path: str, path to the file containing the module factory body
+        """
+        path = Path(path).resolve()
+
+        RequireJS.__DEFINED[module] = path
+
+        return define_module(module, path.read_text())
+
+    def watch(self, library: str, path: str = None, interval: float = 1.0):
+        """Watch local file of the library and hot reload it on changes.
+
+        When the file changes, the library and all the modules depending on it
+        are reloaded in the frontend and the outputs requiring them are re-executed.
+
+        :param library: str, key to the library or name of the module defined by `define()`
+        :param path: str, path to the local file [optional]
+
+            If not provided, the path is resolved from the module definition
+            or from the library path relative to the notebook directory.
+
+        :param interval: float, polling interval in seconds
+        """
+        if path is None:
+            path = RequireJS.__DEFINED.get(library) or self._get_local_path(library)
+
+        if RequireJS.__watcher is None:
+            RequireJS.__watcher = FileWatcher(callback=RequireJS._hot_reload)
+
+        RequireJS.__watcher.interval = interval
+        RequireJS.__watcher.watch(library, path)
+
+    def unwatch(self, library: str):
+        """Stop watching local file of the library."""
+        if RequireJS.__watcher is not None:
+            RequireJS.__watcher.unwatch(library)
+
+    @property
+    def watched(self) -> dict:
+        """Get watched files."""
+        return RequireJS.__watcher.files if RequireJS.__watcher is not None else {}
+
+    def _get_local_path(self, library: str) -> Path:
+        """Get local file of the library from its configured path."""
+        try:
+            path: str = RequireJS.__LIBS[library]
+        except KeyError:
+            raise ValueError(f"Library '{library}' has not been configured.")
+
+        if '://' in path or path.startswith('//'):
+            raise ValueError(f"Library '{library}' is not a local file: '{path}'.")
+
+        # files are served relatively to the notebook directory by `/files` handler
+        path = path.lstrip('/')
+        if path.startswith('files/'):
+            path = path[len('files/'):]
+
+        return Path(path if path.endswith('.js') else f'{path}.js')
+
+    @classmethod
+    def _hot_reload(cls, modules: List[str]):
+        """Hot reload modules, define modules defined from files again."""
+        for module in filter(lambda m: m in cls.__DEFINED, modules):
+            define_module(module, cls.__DEFINED[module].read_text())
+
+        libs = [m for m in modules if m not in cls.__DEFINED]
+        if libs:
+            hot_reload(libs)
+
     @classmethod
     def reload(cls, clear=False):
-        """Reload and create new require object."""
+        """Reload and create new require object.
+
+        The comms are reused if they are healthy, see `_initialize_comms()`.
+        """
         logger.info("Reloading.")
 
         libs = cls.__LIBS if not clear else []
@@ -230,28 +543,127 @@ class RequireJS(object):
         if clear:
             cls.__LIBS.clear()
             cls.__SHIM.clear()
+            cls.__INTEGRITY.clear()
+            cls.__ESM.clear()
+
+        self = cls(required=libs, shim=shim)
+
+        if _is_notebook:
+            self._initialize_comms()
+
+    @classmethod
+    def close_comms(cls):
+        """Close the comms, the frontend disposes of their handlers."""
+        for comm in (cls.__config_comm, cls.__execution_comm, cls.__safe_execution_comm):
+            if comm is not None and not comm._closed:  # pylint: disable=protected-access
+                comm.close()
 
         cls.__config_comm = None
         cls.__execution_comm = None
         cls.__safe_execution_comm = None
 
+        cls.__comm_session = None
+        cls.__compression = None  # negotiated again with new comms
         cls.__is_initialized = False
 
-        self = cls(required=libs, shim=shim)
+        logger.debug("Comms have been closed.")
 
-        if _is_notebook:
-            self._initialize_comms()
+    @classmethod
+    def _comms_alive(cls) -> bool:
+        """Return whether all the comms are open and registered by the kernel."""
+        comms = Jupyter.kernel.comm_manager.comms
+
+        return all(
+            comm is not None and not comm._closed and comm.comm_id in comms  # pylint: disable=protected-access
+            for comm in (cls.__config_comm, cls.__execution_comm, cls.__safe_execution_comm)
+        )
+
+    def comm_info(self) -> dict:
+        """Get counts of open comms and registered comm targets for monitoring.
+
+        Comms opened by other extensions are not counted.
+        """
+        _ = self  # ignore
+
+        comm_manager = Jupyter.kernel.comm_manager
+
+        comms = OrderedDict((target, 0) for target in COMM_TARGETS)
+        for comm in comm_manager.comms.values():
+            target = getattr(comm, 'target_name', None)
+
+            if target in comms:
+                comms[target] += 1
+
+        return {
+            'comms': dict(comms),
+            'open': sum(comms.values()),
+            'targets': [target for target in comm_manager.targets if target in COMM_TARGETS],
+            'session': RequireJS.__comm_session,
+        }
+
+    def cache_info(self) -> dict:
+        """Get statistics of the frontend render cache.
+
+        The statistics are reported by the frontend after each cached execution,
+        the render cache is enabled by `set_notebook_options(render_cache=True)`.
+        """
+        _ = self  # ignore
+
+        return {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'entries': 0,
+            'bytes': 0,
+            'max_bytes': None,
+            **_frontend_stats.get('cache_info', {})
+        }
+
+    def retention_info(self) -> dict:
+        """Get number and estimated size in bytes of live outputs retained by the frontend.
+
+        Live outputs exceeding the `retention_max_outputs` notebook option are finalized.
+        """
+        _ = self  # ignore
+
+        return {
+            'outputs': 0,
+            'bytes': 0,
+            **_frontend_stats.get('retention_info', {})
+        }
 
     def _initialize_comms(self):
-        """Initialize Python-JavaScript comms."""
+        """Initialize Python-JavaScript comms.
+
+        The comms are reused if they are alive and handled by the frontend client
+        which requested the initialization, otherwise the superseded comms are closed
+        and new ones are created (i.e. the notebook page has been reloaded).
+        """
+        session = Jupyter.parent_header.get('header', {}).get('session', None)
+
+        if RequireJS.__is_initialized and self._comms_alive() and session == RequireJS.__comm_session:
+            logger.info("Reusing comms.")
+
+            if RequireJS.__LIBS or RequireJS.__ESM:
+                self.config(paths={})
+
+            return
+
+        self.close_comms()
+
         logger.info("Initializing comms.")
 
         now = datetime.now()
 
+        with RequireJS.__seq_lock:
+            RequireJS.__session = str(datetime.timestamp(now))
+            RequireJS.__seq = 0
+
         RequireJS.__config_comm = create_comm(
             target='config',
+            data={'config_hash': self.config_hash},
             comm_id=f'config.JupyterRequire#{datetime.timestamp(now)}',
-            callback=RequireJS.log_callback)
+            callback=RequireJS.config_callback)
 
         RequireJS.__execution_comm = create_comm(
             target='execute',
@@ -263,21 +675,75 @@ class RequireJS(object):
             comm_id=f'safe_execute.JupyterRequire#{datetime.timestamp(now)}',
             callback=RequireJS.log_callback)
 
+        for comm in (RequireJS.__config_comm, RequireJS.__execution_comm, RequireJS.__safe_execution_comm):
+            comm.on_close(RequireJS.close_callback)
+
         self.is_initialized = True
 
-        # initial configuration
-        self.config(paths={})
+        # initial configuration, the frontend keeps the libraries loaded
+        # so there is nothing to send if there are none (i.e. after kernel restart)
+        if RequireJS.__LIBS or RequireJS.__ESM:
+            self.config(paths={})
 
         logger.info("Comms have been successfully initialized.")
 
+    @classmethod
+    def config_callback(cls, msg):
+        """Handle message from the config comm.
+
+        The frontend advertises its capabilities, in order of preference,
+        once the comm is opened. If the hash of the notebook configuration
+        differs, the frontend sends the configuration as well and the kernel
+        adopts the libraries it does not know about (i.e. on kernel restart)
+        without sending them back to the frontend.
+        """
+        cls.log_callback(msg)
+
+        # the client which handles the comms
+        cls.__comm_session = msg.get('header', {}).get('session', None)
+
+        data = msg['content']['data']
+
+        config = data.get('config', None)
+        if config is not None:
+            for lib, path in config.get('paths', {}).items():
+                cls.__LIBS.setdefault(lib, path)
+            for lib, shim in config.get('shim', {}).items():
+                cls.__SHIM.setdefault(lib, shim)
+            for lib, url in config.get('esm', {}).items():
+                cls.__ESM.setdefault(lib, url)
+            for lib, integrity in config.get('integrity', {}).items():
+                cls.__INTEGRITY.setdefault(lib, integrity)
+
+            logger.info("Configuration reconciled with the notebook: %s", config_hash(config))
+
+        capabilities = data.get('capabilities', None)
+        if capabilities is None:
+            return
+
+        cls.__compression = next(
+            (m for m in capabilities.get('compression', []) if m in COMPRESSION_METHODS), None)
+
+        logger.info("Negotiated compression: %s", cls.__compression)
+
+    @classmethod
+    def close_callback(cls, msg):
+        """Handle comm closed by the frontend, the comms are created again on next initialization."""
+        logger.warning("Comm '%s' closed by the frontend.", msg['content']['comm_id'])
+
+        cls.__comm_session = None
+
     @classmethod
     def log_callback(cls, msg):
         """Store callback from comm."""
         logger.debug("Callback received: %s", msg)
 
 
-require = RequireJS()
-require.__doc__ = RequireJS.__call__.__doc__
+# the package can be imported outside of Jupyter as well (i.e. by the command line interface),
+# RequireJS itself refuses to be instantiated there
+require = RequireJS() if _is_notebook else None
+if require is not None:
+    require.__doc__ = RequireJS.__call__.__doc__
 
 
 class JSTemplate(string.Template):
@@ -314,6 +780,53 @@ class JSTemplate(string.Template):
         self.safe_substitute = safe_substitute
         self.substitute = substitute
 
+    def get_identifiers(self) -> List[str]:
+        """Get names of the template placeholders in order of their first occurrence."""
+        identifiers = []
+
+        for match in self.pattern.finditer(self.template):
+            name = match.group('named') or match.group('braced')
+
+            if name is not None and name not in identifiers:
+                identifiers.append(name)
+
+        return identifiers
+
+
+def _js_numbers(obj: Any) -> Any:
+    """Convert numbers the way JavaScript serializes them.
+
+    JavaScript does not distinguish integers and floats (`1.0` is serialized as `1`)
+    and serializes non-finite numbers as `null`.
+    """
+    if isinstance(obj, dict):
+        return {k: _js_numbers(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_js_numbers(v) for v in obj]
+    if isinstance(obj, float):
+        if not math.isfinite(obj):
+            return None
+        if obj.is_integer():
+            return int(obj)
+
+    return obj
+
+
+def config_hash(config: dict) -> str:
+    """Compute hash (FNV-1a) of the requireJS config serialized with sorted keys."""
+    canonical_config = {'paths': config.get('paths', {}), 'shim': config.get('shim', {})}
+    # ES modules are hashed only if there are any, so that hashes of existing configs do not change
+    if config.get('esm'):
+        canonical_config['esm'] = config['esm']
+
+    canonical = json.dumps(_js_numbers(canonical_config), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+    digest = 0x811c9dc5
+    for byte in canonical.encode('utf-8'):
+        digest = ((digest ^ byte) * 0x01000193) & 0xffffffff
+
+    return f'{digest:08x}'
+
 
 def create_comm(target: str,
                 data: dict = None,
@@ -327,11 +840,21 @@ def create_comm(target: str,
     return comm
 
 
-def execute_with_requirements(script: str, required: Union[list, dict], silent=False, configured=True, **kwargs):
+def execute_with_requirements(script: str,
+                              required: Union[list, dict],
+                              silent=False,
+                              configured=True,
+                              barrier=False,
+                              worker=False,
+                              **kwargs):
     """Link required libraries and execute JS script.
 
     :param script: JS script to be executed
     :param required: list or dict (for requireJS config) of requirements
+
+        Stylesheets can be required as `css!<url>`, the script is executed
+        once the stylesheets have been applied.
+
     :param silent: whether the script should be executed in the silent mode
 
         If the script is executed as "silent", it does not run in a cell context
@@ -345,6 +868,23 @@ def execute_with_requirements(script: str, required: Union[list, dict], silent=F
         Assume True, as user is expected to run `require.config()`
         at the initialization time.
 
+    :param barrier: bool, whether the script should be executed as a barrier
+
+        The frontend executes barrier scripts only after all preceding scripts
+        have been executed and the requirements of following scripts are not
+        resolved before the barrier script has been executed.
+
+    :param worker: bool, whether to run the compute part of the script in a Web Worker
+
+        The part of the script before the `// @render` marker line is executed
+        in a pooled Web Worker without access to the DOM and the requirements,
+        its returned value is available to the rest of the script as `result`.
+        Typed arrays in the result are transferred without copying.
+
+    The script can release its resources (charts, timers, listeners, ...) once
+    the output is cleared, replaced or its cell is deleted by registering a hook
+    by `context.on_dispose(fn)` or by listening to the `context.signal` AbortSignal.
+
     :param kwargs: optional keyword arguments for template substitution
     """
     requirejs = RequireJS()
@@ -359,7 +899,10 @@ def execute_with_requirements(script: str, required: Union[list, dict], silent=F
     required: list = required if isinstance(
         required, list) else list(required.keys())
 
-    params = kwargs.pop('params', []) or required
+    # stylesheets (css!<url>) are bound to placeholder parameters
+    params = kwargs.pop('params', []) or [
+        f'_css{i}' if lib.startswith('css!') else lib for i, lib in enumerate(required)
+    ]
     params = list(map(lambda s: s.rsplit('/')[-1], params))
 
     script = JSTemplate(script).safe_substitute(**kwargs)
@@ -369,28 +912,96 @@ def execute_with_requirements(script: str, required: Union[list, dict], silent=F
         'silent': silent,
         'require': required,
         'parameters': params,
+        'worker': worker,
     }
 
     if requirejs.safe_execution_comm is None:
         raise CommError("Comm 'execute' is not open.")
 
     # noinspection PyProtectedAccess
-    return requirejs.execution_comm.send(data)  # pylint: disable=protected-access
+    return requirejs._send(requirejs.execution_comm, data, barrier=barrier)  # pylint: disable=protected-access
+
+
+def _parameter_name(library: str) -> str:
+    """Get name of the script parameter the library is bound to in the frontend."""
+    return re.sub(r'[|&$%@"<>()+\-.,;]', '', library.rsplit('/')[-1])
+
+
+_INFERENCE_CACHE_SIZE = 256
+
+_inference_cache = OrderedDict()
+_inference_lock = threading.Lock()
+
+
+def infer_requirements(script: str, libraries: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Infer which of the libraries are referenced by the script.
+
+    Libraries are bound to the script parameters by their names, hence a library
+    is required if the script references its parameter name (property access
+    like `obj.<name>` is not a reference). Libraries which are loaded only for
+    their side effects (i.e. jQuery plugins) are not referenced and therefore
+    not inferred, pass them in `required` explicitly.
+
+    The result is cached by the SHA-256 digest of the script and the libraries,
+    so that the scripts themselves are not kept alive by the cache.
+
+    :param script: str, JS script
+    :param libraries: tuple of configured library names
+    :returns: tuple of required library names
+    """
+    key = (hashlib.sha256(script.encode('utf-8')).digest(), libraries)
+
+    with _inference_lock:
+        if key in _inference_cache:
+            _inference_cache.move_to_end(key)
+
+            return _inference_cache[key]
+
+    required = _infer_requirements(script, libraries)
+
+    with _inference_lock:
+        _inference_cache[key] = required
+
+        if len(_inference_cache) > _INFERENCE_CACHE_SIZE:
+            _inference_cache.popitem(last=False)
+
+    return required
+
+
+def _infer_requirements(script: str, libraries: Tuple[str, ...]) -> Tuple[str, ...]:
+    required = []
+
+    for library in libraries:
+        name = _parameter_name(library)
+        if not name:
+            continue
+
+        if re.search(r'(?<![\w$.])' + re.escape(name) + r'(?![\w$])', script):
+            required.append(library)
 
+    return tuple(required)
 
-def execute(script: str, **kwargs):
+
+def execute(script: str, required: List[str] = None, **kwargs):
     """Execute JS script.
 
-    This function implicitly loads libraries defined in requireJS config.
+    This function implicitly loads libraries defined in requireJS config
+    which are referenced by the script, see `infer_requirements()`.
+
+    :param script: JS script to be executed
+    :param required: list of requirements [optional]
+
+        If provided, the requirements are not inferred. Libraries loaded only
+        for their side effects are not inferred, they have to be listed here.
+
+    :param kwargs: optional keyword arguments passed to `execute_with_requirements()`
     """
     requirejs = RequireJS()
 
-    required = []
+    if required is None:
+        required = list(infer_requirements(script, (*requirejs.libs, *requirejs.esm)))
 
-    try:
-        required = list(requirejs.libs.keys())
-    except NameError:  # require has not been defined yet, allowed
-        pass
+        logger.debug("Inferred requirements: %s", required)
 
     return execute_with_requirements(script, required=required, **kwargs)
 
@@ -415,11 +1026,47 @@ def safe_execute(script: str, **kwargs):
         raise CommError("Comm 'execute' is not open.")
 
     # noinspection PyProtectedAccess
-    return requirejs.safe_execution_comm.send(data={'script': script})  # pylint: disable=protected-access
+    return requirejs._send(requirejs.safe_execution_comm, {'script': script})  # pylint: disable=protected-access
+
+
+def define_module(module: str, script: str):
+    """Define new module from the script.
+
+    The module is stored in the notebook module registry (notebook metadata)
+    and materialised lazily on its first require. Defining an unchanged module
+    again is a no-op, a changed module is hot reloaded if it has been already required.
+
+    :param module: str, module name
+    :param script: str, module factory body, the factory is provided `require` function
+    """
+    digest = hashlib.sha256(script.encode('utf-8')).hexdigest()
+
+    return execute_with_requirements(
+        "return core.define_module('$$module', $$source, '$$digest');",
+        required=[f'{NBEXTENSION}/core'], silent=True, barrier=True,
+        module=module, source=json.dumps(script), digest=digest)
+
+
+def hot_reload(modules: List[str]):
+    """Hot reload modules in the frontend.
+
+    The modules and all the modules which depend on them are undefined
+    and required again, outputs which require any of them are re-executed.
+
+    :param modules: list of module names
+    """
+    return execute_with_requirements(
+        "return core.hot_reload($$modules);",
+        required=[f'{NBEXTENSION}/core'], silent=True, barrier=True, modules=json.dumps(modules))
 
 
 def communicate(comm, open_msg):
-    """Handle messages from Jupyter frontend."""
+    """Handle messages from Jupyter frontend.
+
+    The comm is a long-lived channel multiplexing events communicated
+    by the frontend. Each message carries a batch of events, events with
+    an `id` expect a response, the others are fire-and-forget.
+    """
     _ = open_msg  # ignored
 
     logger.debug("Comm 'communicate' opened.")
@@ -427,30 +1074,42 @@ def communicate(comm, open_msg):
     @comm.on_msg
     def handle_msg(msg):
         """Handle message."""
-        logger.debug(
-            "Message received: %r", msg)
-
         data = msg['content']['data']
-        event = data.get('event', None)
+        messages = data.get('events', [data])
 
-        logger.debug(
-            "Requested message handler.\n\tData: %r\n\tEvent: %r", data, event)
+        responses = []
+        for message in messages:
+            response = handle_event(message.get('event', None), message.get('event_data', None))
 
-        response = {'resolved': True, 'value': None, 'success': False}
-        try:
-            _, namespace = event['type'], event['namespace']
+            if message.get('id', None) is not None:
+                response['id'] = message['id']
+                responses.append(response)
+
+        RequireJS.log_callback(msg)
+
+        if responses:
+            comm.send({'responses': responses})
+
+
+def handle_event(event: dict, event_data=None) -> dict:
+    """Handle event communicated by Jupyter frontend."""
+    logger.debug("Requested message handler for event: %r", event)
+
+    response = {'resolved': True, 'value': None, 'success': False}
+    try:
+        event_type, namespace = event['type'], event['namespace']
 
-            if namespace == 'JupyterRequire':
-                response['success'] = True
+        if namespace == 'JupyterRequire':
+            if event_type in FRONTEND_STATS:
+                _frontend_stats[event_type] = event_data or {}
 
-            logger.debug("Success.")
+            response['success'] = True
 
-        except Exception as err:
-            logger.error(
-                "Error: '%s': %s", event, err)
-            response['value'] = err
+        logger.debug("Success.")
 
-        finally:
-            RequireJS.log_callback(msg)
+    except Exception as err:
+        logger.error(
+            "Error: '%s': %s", event, err)
+        response['value'] = str(err)
 
-        comm.send(response)
+    return response
@@ -0,0 +1,222 @@
+# jupyter-require
+# Copyright 2019 Marek Cermak <macermak@redhat.com>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Lockfiles and import maps describing JavaScript libraries of a notebook.
+
+The jupyter-require lockfile has the following format:
+
+```
+{
+    "version": 1,
+    "libraries": {
+        <name>: {
+            "path": <path without .js suffix>,
+            "shim": <shim> [optional],
+            "integrity": <subresource integrity hash> [optional],
+            "esm": <whether the library is an ES module given by its full URL> [optional]
+        }
+    },
+    "order": [<names in dependency order>]
+}
+```
+
+Import maps (`{"imports": {<name>: <url>}, "integrity": {<url>: <hash>}}`)
+are accepted as well, the `.js` suffix of the URLs is stripped
+unless the entries are loaded as ES modules.
+"""
+
+import base64
+import hashlib
+import json
+import urllib.request
+
+from collections import OrderedDict
+from pathlib import Path
+
+from typing import Dict, List, NamedTuple, Union
+
+LOCKFILE_VERSION = 1
+
+INTEGRITY_ALGORITHM = 'sha384'
+
+
+class Libraries(NamedTuple):
+    """Libraries described by a lockfile or an import map."""
+
+    paths: Dict[str, str]
+    shim: Dict[str, Union[list, dict]]
+    integrity: Dict[str, str]
+    esm: Dict[str, str] = {}
+
+
+def get_dependencies(shim: Union[list, dict, None]) -> List[str]:
+    """Get dependencies of the library from its shim."""
+    if isinstance(shim, dict):
+        return list(shim.get('deps', []))
+
+    return list(shim or [])
+
+
+def dependency_order(paths: Dict[str, str], shim: Dict[str, Union[list, dict]]) -> List[str]:
+    """Get library names ordered so that libraries follow their dependencies.
+
+    Only dependencies among the given libraries are taken into account,
+    the order of independent libraries is preserved.
+
+    :raises ValueError: if the dependencies are cyclic
+    """
+    pending = OrderedDict(
+        (lib, [dep for dep in get_dependencies(shim.get(lib)) if dep in paths and dep != lib])
+        for lib in paths
+    )
+
+    order = []
+    while pending:
+        ready = [lib for lib, deps in pending.items() if all(dep not in pending for dep in deps)]
+
+        if not ready:
+            raise ValueError(f"Cyclic dependencies of libraries: {list(pending)}.")
+
+        for lib in ready:
+            pending.pop(lib)
+
+        order.extend(ready)
+
+    return order
+
+
+def _strip_suffix(url: str) -> str:
+    """Strip the `.js` suffix, requireJS paths do not contain it."""
+    return url[:-len('.js')] if url.endswith('.js') else url
+
+
+def from_import_map(import_map: dict, esm: bool = False) -> Libraries:
+    """Get libraries from the import map.
+
+    Package prefixes (names ending with `/`) are mapped as requireJS path prefixes.
+
+    :param esm: bool, whether the entries are ES modules, their URLs are kept as they are
+    """
+    paths, integrity = OrderedDict(), OrderedDict()
+    hashes = import_map.get('integrity', {})
+
+    if esm:
+        modules = OrderedDict(import_map.get('imports', {}))
+        integrity.update((name, hashes[url]) for name, url in modules.items() if url in hashes)
+
+        return Libraries(paths, OrderedDict(), integrity, modules)
+
+    for name, url in import_map.get('imports', {}).items():
+        lib = name.rstrip('/')
+        paths[lib] = _strip_suffix(url).rstrip('/') if name.endswith('/') else _strip_suffix(url)
+
+        if url in hashes:
+            integrity[lib] = hashes[url]
+
+    return Libraries(paths, OrderedDict(import_map.get('shim', {})), integrity)
+
+
+def from_lockfile(lockfile: dict) -> Libraries:
+    """Get libraries from the lockfile."""
+    version = lockfile.get('version', LOCKFILE_VERSION)
+    if version > LOCKFILE_VERSION:
+        raise ValueError(f"Unsupported lockfile version: {version}.")
+
+    paths, shim, integrity, esm = OrderedDict(), OrderedDict(), OrderedDict(), OrderedDict()
+
+    libraries = lockfile['libraries']
+    for lib in lockfile.get('order', []) + [lib for lib in libraries if lib not in lockfile.get('order', [])]:
+        entry = libraries[lib]
+
+        if entry.get('esm'):
+            esm[lib] = entry['path']
+        else:
+            paths[lib] = entry['path']
+
+        if entry.get('shim'):
+            shim[lib] = entry['shim']
+        if entry.get('integrity'):
+            integrity[lib] = entry['integrity']
+
+    return Libraries(paths, shim, integrity, esm)
+
+
+def load(path: Union[str, Path], esm: bool = False) -> Libraries:
+    """Load libraries from the lockfile or the import map.
+
+    :param esm: bool, whether the import map entries are ES modules
+    :raises ValueError: if the file is neither lockfile nor import map
+    """
+    data = json.loads(Path(path).read_text(encoding='utf-8'))
+
+    if 'libraries' in data:
+        return from_lockfile(data)
+    if 'imports' in data:
+        return from_import_map(data, esm=esm)
+
+    raise ValueError(f"File '{path}' is neither jupyter-require lockfile nor import map.")
+
+
+def dump(libraries: Libraries) -> dict:
+    """Get lockfile of the libraries."""
+    order = dependency_order(libraries.paths, libraries.shim)
+
+    entries = OrderedDict()
+    for lib in order:
+        entry = OrderedDict(path=libraries.paths[lib])
+
+        if libraries.shim.get(lib):
+            entry['shim'] = libraries.shim[lib]
+        if libraries.integrity.get(lib):
+            entry['integrity'] = libraries.integrity[lib]
+
+        entries[lib] = entry
+
+    for lib, url in libraries.esm.items():
+        entry = OrderedDict(path=url, esm=True)
+
+        if libraries.integrity.get(lib):
+            entry['integrity'] = libraries.integrity[lib]
+
+        entries[lib] = entry
+
+    return OrderedDict(version=LOCKFILE_VERSION, libraries=entries, order=order)
+
+
+def compute_integrity(content: bytes) -> str:
+    """Compute subresource integrity hash of the content."""
+    digest = hashlib.new(INTEGRITY_ALGORITHM, content).digest()
+
+    return f"{INTEGRITY_ALGORITHM}-{base64.b64encode(digest).decode('ascii')}"
+
+
+def fetch_integrity(url: str, timeout: float = 10.0) -> str:
+    """Fetch the library and compute its subresource integrity hash.
+
+    :param url: str, URL of the library without the `.js` suffix
+    """
+    url = url if url.endswith('.js') else f'{url}.js'
+    url = f'https:{url}' if url.startswith('//') else url
+
+    with urllib.request.urlopen(url, timeout=timeout) as response:  # nosec
+        return compute_integrity(response.read())
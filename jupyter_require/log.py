@@ -0,0 +1,167 @@
+# jupyter-require
+# Copyright 2019 Marek Cermak <macermak@redhat.com>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Logging configuration.
+
+Records are handed over to a queue and written by a background listener thread,
+so logging never blocks the kernel on disk I/O. The log file is rotated by size.
+
+The configuration can be adjusted by the following environment variables:
+
+    JUPYTER_REQUIRE_LOG_LEVEL: log level of the log file [default: WARNING]
+    JUPYTER_REQUIRE_LOG_FILE: path to the log file [default: .log]
+    JUPYTER_REQUIRE_LOG_MAX_BYTES: size of the log file before rotation [default: 1 MiB]
+    JUPYTER_REQUIRE_LOG_BACKUP_COUNT: number of rotated log files to keep [default: 3]
+"""
+
+import atexit
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+
+from typing import Union
+
+import daiquiri
+import daiquiri.formatter
+
+
+LOG_FORMAT = "%(asctime)s [%(process)d] %(color)s%(levelname)-8.8s %(name)s:" \
+             "%(lineno)d: [JupyterRequire] %(message)s%(color_stop)s"
+
+DEFAULT_LOG_LEVEL = 'WARNING'
+DEFAULT_LOG_FILE = '.log'
+DEFAULT_LOG_MAX_BYTES = 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 3
+
+_listener: logging.handlers.QueueListener = None
+_queue_handler: logging.Handler = None
+
+# formats exceptions of the records before they are queued
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler which leaves formatting of the records to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Snapshot the message of the record, it is formatted by the listener handlers.
+
+        The message arguments (and the exception) are rendered right away, since
+        mutable arguments may change before the listener thread gets to the record.
+        """
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+
+        return record
+
+
+def get_level(level: Union[int, str] = None) -> int:
+    """Get numeric log level from the argument or the environment."""
+    if level is None:
+        level = os.getenv('JUPYTER_REQUIRE_LOG_LEVEL', DEFAULT_LOG_LEVEL)
+
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+
+    if not isinstance(level, int):
+        raise ValueError(f"Invalid log level: {level!r}")
+
+    return level
+
+
+def set_level(level: Union[int, str]):
+    """Set log level of JupyterRequire loggers.
+
+    Records below the level are discarded before they are created,
+    hence disabled levels do not pay for message formatting.
+    """
+    level = get_level(level)
+
+    if _queue_handler is not None:
+        _queue_handler.setLevel(level)
+
+    # warnings and errors always reach the stream output
+    logging.getLogger().setLevel(min(level, logging.WARNING))
+
+
+def setup_logging(level: Union[int, str] = None,
+                  filename: str = None,
+                  max_bytes: int = None,
+                  backup_count: int = None):
+    """Set up asynchronous logging with size-based rotation of the log file."""
+    global _listener, _queue_handler
+
+    level = get_level(level)
+
+    filename = filename or os.getenv('JUPYTER_REQUIRE_LOG_FILE', DEFAULT_LOG_FILE)
+    max_bytes = max_bytes or int(os.getenv('JUPYTER_REQUIRE_LOG_MAX_BYTES', DEFAULT_LOG_MAX_BYTES))
+    backup_count = backup_count or int(os.getenv('JUPYTER_REQUIRE_LOG_BACKUP_COUNT', DEFAULT_LOG_BACKUP_COUNT))
+
+    _stop_listener()
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename,
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        delay=True,  # do not touch the file system until something is logged
+    )
+    file_handler.setFormatter(daiquiri.formatter.ColorFormatter(fmt=LOG_FORMAT))
+
+    records = queue.Queue(-1)
+
+    _queue_handler = DeferredQueueHandler(records)
+    _listener = logging.handlers.QueueListener(records, file_handler)
+    _listener.start()
+
+    daiquiri.setup(
+        level=level,
+        outputs=[
+            daiquiri.output.Output(_queue_handler, level=level),
+            daiquiri.output.Stream(
+                level=logging.WARN,
+                formatter=daiquiri.formatter.ColorFormatter(fmt=LOG_FORMAT)
+            ),
+        ],
+    )
+
+    set_level(level)
+
+
+@atexit.register
+def _stop_listener():
+    """Flush pending records and stop the listener thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
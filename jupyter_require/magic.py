@@ -23,8 +23,12 @@
 
 """Jupyter magic for managing linked JavaScript scripts and CSS styles."""
 
+import hashlib
+import json
 import re
 
+from typing import Any, Dict, Hashable, List, Tuple
+
 from IPython.core.magic import cell_magic
 from IPython.core.magic import line_magic
 from IPython.core.magic import line_cell_magic
@@ -34,18 +38,123 @@ from IPython.core.magic import needs_local_scope
 
 from jupyter_nbutils.utils import sanitize_namespace
 
+from traitlets import CaselessStrEnum
+from traitlets import observe
+
+from .core import define_module
 from .core import execute_with_requirements
+from .core import hot_reload
 from .core import require
 from .core import safe_execute
 
 from .core import JSTemplate
 
+from .log import set_level
+
 from .notebook import link_css as _link_css
 from .notebook import load_css as _load_css
 from .notebook import link_js as _link_js
 from .notebook import load_js as _load_js
 
 
+_SERIALIZED: Dict[str, Tuple[int, Hashable, str]] = dict()
+"""Cache of serialized namespace variables, name -> (object id, version token, value)."""
+
+
+_IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, type(None))
+
+
+def _is_immutable(obj: Any) -> bool:
+    """Return whether the object is a builtin immutable value, its hash is based on its content."""
+    if type(obj) in _IMMUTABLE_TYPES:
+        return True
+
+    if type(obj) in (tuple, frozenset):
+        return all(_is_immutable(o) for o in obj)
+
+    return False
+
+
+def _content_hash(obj: Any) -> str:
+    """Get hash of the content of the DataFrame, Series or array.
+
+    Hashing the raw content is considerably cheaper than serializing the object.
+
+    :returns: str, the hash or None if the content can not be hashed cheaply
+    """
+    if hasattr(obj, 'iloc'):  # pandas DataFrame or Series
+        try:
+            from pandas.util import hash_pandas_object
+
+            content = hash_pandas_object(obj, index=True).values.tobytes()
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+        if hasattr(obj, 'columns'):
+            content += repr(list(obj.columns)).encode('utf-8')
+
+    elif hasattr(obj, 'tobytes') and hasattr(obj, 'dtype'):  # numpy arrays
+        if obj.dtype.hasobject:  # only references to the objects would be hashed
+            return None
+
+        content = obj.tobytes() + str(obj.dtype).encode('utf-8')
+
+    else:
+        return None
+
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _version_token(obj: Any) -> Hashable:
+    """Get cheap version token of the object.
+
+    Builtin immutable values are identified by their hash, DataFrames and arrays
+    by their shape and the hash of their content. Other objects (lists, dicts,
+    instances of user classes, ...) have no content-based version which would be
+    cheaper than their serialization, None is returned and they are serialized again.
+    """
+    if _is_immutable(obj):
+        return type(obj), hash(obj)
+
+    content_hash = _content_hash(obj)
+    if content_hash is None:
+        return None
+
+    return type(obj), obj.shape, content_hash
+
+
+def serialize_namespace(ns: dict, names: List[str]) -> dict:
+    """Serialize only the given names from the namespace.
+
+    Serialized values are cached by object identity and version token,
+    so that unchanged variables are not serialized again on re-run.
+    """
+    namespace = dict()
+
+    for name in filter(lambda n: n in ns, names):
+        obj = ns[name]
+
+        token = _version_token(obj)
+        cached = _SERIALIZED.get(name)
+
+        if token is not None and cached is not None and cached[:2] == (id(obj), token):
+            namespace[name] = cached[2]
+            continue
+
+        value = sanitize_namespace({name: obj}, options={'warnings': False}).get(name)
+        if value is None:
+            continue
+
+        if token is not None:
+            _SERIALIZED[name] = (id(obj), token, value)
+        else:
+            _SERIALIZED.pop(name, None)
+
+        namespace[name] = value
+
+    return namespace
+
+
 def activate_js_syntax_highlight(regex: str = 'requirejs'):
     """Activates syntax highlighting for the `%%require` cells."""
     script = """
@@ -85,11 +194,24 @@ class RequireJSMagic(Magics):
     Links JavaScript libraries to Jupyter Notebook.
     """
 
+    log_level = CaselessStrEnum(
+        ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
+        default_value=None,
+        allow_none=True,
+        help="Log level of JupyterRequire, overrides JUPYTER_REQUIRE_LOG_LEVEL environment variable."
+    ).tag(config=True)
+
     def __init__(self, *args, **kwargs):
         super(RequireJSMagic, self).__init__(*args, **kwargs)
 
         activate_js_syntax_highlight()
 
+    @observe('log_level')
+    def _log_level_changed(self, change):
+        """Propagate log level to JupyterRequire loggers."""
+        if change['new'] is not None:
+            set_level(change['new'])
+
     @needs_local_scope
     @line_cell_magic
     def requirejs(self, line: str, cell: str = None, local_ns=None):
@@ -97,7 +219,11 @@ class RequireJSMagic(Magics):
 
         Line magic: Link required JS library.
 
-        :param line: string in form '<key> <path>'
+        :param line: string in form '<key> <path> [--esm]'
+
+            With the `--esm` flag, the library is an ES module loaded by native `import()`
+            and the path is the full URL of the module.
+
         :param local_ns: current cell namespace [optional]
 
         Cell magic: Execute current JS cell with requirements 
@@ -105,6 +231,9 @@ class RequireJSMagic(Magics):
         The required libraries specified in parameters have to be defined and loaded in advance,
         `require` line magic can be used for that purpose.
 
+        With the `--worker` flag, the part of the cell before the `// @render` marker line
+        is executed in a Web Worker and its returned value is available as `result`.
+
         :param line: str, requirements separated by spaces
         :param cell: str, script to be executed
         :param local_ns: current cell namespace [optional]
@@ -116,30 +245,46 @@ class RequireJSMagic(Magics):
             if not line:
                 return require.display_context()
 
-            lib, path = line \
+            args = line \
                 .strip() \
                 .split(sep=' ')
 
+            esm = '--esm' in args
+            lib, path = [a for a in args if a and a != '--esm']
+
             if not path:
                 raise ValueError(
                     "Path to the library was not defined correctly.")
 
-            return require(lib, path)
+            return require(lib, path, esm=esm)
+
+        template = JSTemplate(cell)
 
-        ns = sanitize_namespace(user_ns, options={'warnings': False})
+        # serialize only the variables referenced by the template
+        ns = serialize_namespace(user_ns, template.get_identifiers())
 
         # do not use safe substitution here
-        script = JSTemplate(cell).substitute(**ns)
+        script = template.substitute(**ns)
 
         required = line \
             .strip() \
             .split(sep=' ')
 
-        return execute_with_requirements(script, required)
+        # run the compute part of the script in a Web Worker
+        worker = '--worker' in required
+        required = [r for r in required if r and r != '--worker']
 
-    @cell_magic
-    def define(self, line: str, cell: str):
-        """Define new module from the current cell content.
+        return execute_with_requirements(script, required, worker=worker)
+
+    @line_cell_magic
+    def define(self, line: str, cell: str = None):
+        """Define new module from the current cell content or from a local file.
+
+        Line magic: Define new module from a local JS file.
+
+        :param line: string in form '<module> <path>'
+
+        Cell magic: Define new module from the current cell content.
 
         :param line: module name
         :param cell: script to be defined as module by the module name
@@ -147,18 +292,14 @@ class RequireJSMagic(Magics):
         if not line:
             raise ValueError("Module name required but not provided.")
 
-        script = """
-        const module = '$$module';
-
-        // overwrite any previously defined modules with the same name
-        requirejs.undef(module);
+        if cell is None:
+            module, path = line \
+                .strip() \
+                .split(sep=' ')
 
-        define(module, function(require) {
-            $$cell
-        });
-        """
+            return require.define(module, path)
 
-        return safe_execute(script, cell=cell, module=line)
+        return define_module(line.strip(), cell)
 
     @line_magic
     def undef(self, line: str):
@@ -173,9 +314,16 @@ class RequireJSMagic(Magics):
         script = """
             const libs = $$to_undefine;
 
-            libs.forEach((lib) => {
-                requirejs.undef(lib);
-            });
+            libs.forEach((lib) => requirejs.undef(lib));
+        """
+
+        # not persisted, modules defined by %%define again later must be kept
+        unregister = """
+            const libs = $$to_undefine;
+            const modules = Jupyter.notebook.metadata.require_modules || {};
+
+            // drop modules defined by %%define from the registry
+            libs.forEach((lib) => delete modules[lib]);
         """
 
         for lib in libs:
@@ -184,6 +332,8 @@ class RequireJSMagic(Magics):
             except KeyError:
                 pass
 
+        execute_with_requirements(unregister, required=[], silent=True, to_undefine=json.dumps(libs))
+
         return safe_execute(script, to_undefine=libs)
 
     @line_magic
@@ -193,24 +343,68 @@ class RequireJSMagic(Magics):
         This is especially useful when needed to reload
         script after making changes to it.
 
+        Modules which depend on the reloaded libraries are reloaded as well
+        and outputs which require any of them are re-executed.
+
         :param line: str, libs to reload separated by spaces
         """
         libs = line \
             .strip() \
             .split(sep=' ')
 
-        script = """
-            const libs = $$to_reload;
-
-            libs.forEach((lib) => {
-                requirejs.undef(lib);
-            });
-            requirejs(libs, () => {
-                console.debug(`Libraries ${libs} reloaded.`);
-            });
+        return hot_reload(libs)
+
+    @line_magic
+    def watchjs(self, line: str):
+        """Watch local JS file and hot reload the library on changes.
+
+        :param line: string in form '<lib> [<path>]'
+
+            The path can be omitted for libraries linked by relative paths
+            and for modules defined by `%define <module> <path>`.
         """
+        lib, *path = line \
+            .strip() \
+            .split(sep=' ')
+
+        return require.watch(lib, *path)
+
+    @line_magic
+    def unwatchjs(self, line: str):
+        """Stop watching local JS files.
+
+        :param line: str, libs to stop watching separated by spaces
+        """
+        libs = line \
+            .strip() \
+            .split(sep=' ')
+
+        for lib in libs:
+            require.unwatch(lib)
+
+    @line_magic
+    def lockjs(self, line: str):
+        """Generate lockfile of the linked JS libraries.
+
+        The libraries can be linked from the lockfile by `require.config_from(<path>)`.
+
+        :param line: string in form '[<path>] [--integrity]'
+
+            With the `--integrity` flag, the libraries are fetched and their
+            subresource integrity hashes are stored in the lockfile.
+            The lockfile is printed if the path is not provided.
+        """
+        args = line \
+            .strip() \
+            .split(sep=' ')
+
+        integrity = '--integrity' in args
+        path, *_ = [a for a in args if a and a != '--integrity'] or [None]
+
+        data = require.lock(path, integrity=integrity)
 
-        return safe_execute(script, to_reload=libs)
+        if path is None:
+            print(json.dumps(data, indent=2))
 
     @line_magic
     def link_css(self, line: str):
@@ -23,11 +23,14 @@
 
 """Common notebook utilities."""
 
+import json
+
 import csscompressor
 
 from IPython import get_ipython
 
 from .core import execute_with_requirements
+from .core import NBEXTENSION
 from .core import safe_execute
 
 
@@ -35,52 +38,25 @@ Jupyter = get_ipython()
 """Current InteractiveShell instance."""
 
 
-def link_css(href: str, attrs: dict = None):
-    """Link CSS stylesheet."""
-    script = """
-        'use strict';
-        
-        const href = "$$href";
-        const attributes = $$attrs || {};
+def _register_asset(asset: dict):
+    """Register the asset in the notebook asset manifest and link it.
 
-        if ( !$(`link[href*="${href}"]`).length ) {
-            let link = document.createElement("link");
-
-            link.rel = "stylesheet";
-            link.type = "text/css";
-            try {
-                link.href = requirejs.toUrl(href, 'css');
-            } catch (error) {
-                link.href = href;
-            }
-            
-            Object.entries(attributes)
-                .forEach( ([attr, val]) => $(link).attr(attr, val) );
-            
-            document.head.appendChild(link);
-        }
+    The manifest is stored in the notebook metadata and all the assets
+    are linked at once when the notebook is loaded.
     """
+    return execute_with_requirements(
+        "return assets.register($$asset);",
+        required=[f'{NBEXTENSION}/assets'], silent=True, barrier=True, asset=json.dumps(asset))
+
 
-    return safe_execute(script, href=href, attrs=attrs)
+def link_css(href: str, attrs: dict = None):
+    """Link CSS stylesheet."""
+    return _register_asset({'type': 'css', 'url': href, 'attrs': attrs or {}})
 
 
 def link_js(src: str):
     """Link JavaScript library."""
-    script = """
-        'use strict';
-
-        const src = "$$src";
-
-        if ( $("script").filter((i, e) => e.src.includes(src)).length <= 0 ) {
-            let script = document.createElement("script");
-            script.src = src;
-            script.type = "text/javascript";
-
-            document.head.appendChild(script);
-        }
-    """
-
-    return safe_execute(script, src=src)
+    return _register_asset({'type': 'js', 'url': src})
 
 
 def load_css(style: str, attrs: dict = None, compress=True, **compressor_options):
@@ -206,12 +182,48 @@ def clear_cell_metadata(index: int = None):
     return safe_execute(script, index=index)
 
 
+def set_notebook_options(**options):
+    """Set notebook JupyterRequire options.
+
+    The options are stored in the notebook metadata and persist
+    through notebook reloads.
+
+    Supported options:
+
+        lazy_render: bool, defer re-execution of outputs and requirement checks
+                     until the cell is scrolled near the viewport [default: True]
+        lazy_render_margin: str, margin around the viewport used by the lazy rendering,
+                            CSS margin syntax [default: '200px']
+        render_cache: bool, serve outputs of repeated executions of the same script
+                      with the same inputs and libraries from cache [default: False]
+        render_cache_max_bytes: int, size limit of the render cache,
+                                least recently used outputs are evicted [default: 16 MiB]
+        retention_max_outputs: int, number of live outputs kept for re-rendering,
+                               least recently used outputs are finalized [default: 100]
+        load_policy: str, how the libraries are loaded when the notebook is opened [default: 'eager']
+
+            'eager': all the libraries are loaded before the cells are initialized
+            'prefetch': the libraries are fetched with low priority, nothing waits for them
+            'lazy': a library is loaded once a cell which requires it is executed or rendered
+    """
+    script = """
+    const options = $$options;
+
+    let md = Jupyter.notebook.metadata;
+
+    md.require_options = Object.assign({}, md.require_options, options);
+    """
+
+    return execute_with_requirements(script, required=[], silent=True, options=json.dumps(options))
+
+
 def clear_notebook_metadata():
     """Clear notebook requirement metadata."""
     script = """
     let nb = Jupyter.notebook;
     
     if (nb.metadata.hasOwnProperty('require')) delete nb.metadata.require;
+    if (nb.metadata.hasOwnProperty('require_modules')) delete nb.metadata.require_modules;
     """
 
     return safe_execute(script)
@@ -0,0 +1,165 @@
+/**
+ * Assets.
+ *
+ * Notebook-level manifest of linked stylesheets and scripts.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements linking of stylesheets and scripts stored in the notebook manifest.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [ 'underscore', 'base/js/namespace', './logger' ], function ( _, Jupyter, Logger ) {
+    'use strict';
+
+    const log = Logger()
+
+    let registry = {};  // key -> { asset, element, loaded }
+
+    /**
+     * Get key of the asset
+     *
+     * @param asset {Object} - asset of type 'css' or 'js' and its url
+     * @returns {String}
+     */
+    function get_key( asset ) { return `${ asset.type }:${ asset.url }`; }
+
+    function resolve_url( url, type ) {
+        try {
+            return requirejs.toUrl( url, type );
+        } catch ( error ) {
+            return url;
+        }
+    }
+
+    /**
+     * Get notebook asset manifest
+     *
+     * @returns {Array} - assets in the order they were linked
+     */
+    function get_manifest() { return Jupyter.notebook.metadata.require_assets || []; }
+
+    /**
+     * Set notebook asset manifest
+     *
+     * @param manifest {Array} - assets
+     */
+    function set_manifest( manifest ) { Jupyter.notebook.metadata.require_assets = manifest; }
+
+    /**
+     * Add preload hint for the asset
+     *
+     * Assets of type 'module' (ES modules) are preloaded as modules.
+     * The hint is worth it only if it runs ahead of the load of the asset itself.
+     *
+     * @param asset {Object}
+     */
+    function preload( asset ) {
+        let link = document.createElement( 'link' );
+        let attrs = asset.attrs || {};
+
+        link.rel = asset.type === 'module' ? 'modulepreload' : 'preload';
+        link.as = asset.type === 'css' ? 'style' : 'script';
+        link.href = asset.type === 'module' ? asset.url : resolve_url( asset.url, asset.type );
+
+        if ( attrs.crossorigin ) link.crossOrigin = attrs.crossorigin;
+        if ( attrs.integrity ) link.integrity = attrs.integrity;
+        if ( attrs.fetchpriority ) link.setAttribute( 'fetchpriority', attrs.fetchpriority );
+
+        document.head.appendChild( link );
+    }
+
+    /**
+     * Link the asset to the page, if it has not been linked yet
+     *
+     * @param asset {Object} - asset of type 'css' or 'js', its url and attributes
+     * @returns {Promise} - resolved once the asset has been loaded
+     */
+    function link( asset ) {
+        const key = get_key( asset );
+
+        if ( !_.isUndefined( registry[ key ] ) ) return registry[ key ].loaded;
+
+        // the same URL as preloaded, if any
+        const url = resolve_url( asset.url, asset.type );
+
+        let element;
+        if ( asset.type === 'css' ) {
+            element = document.createElement( 'link' );
+
+            element.rel = 'stylesheet';
+            element.type = 'text/css';
+            element.href = url;
+        } else {
+            element = document.createElement( 'script' );
+
+            element.type = 'text/javascript';
+            element.async = false;  // loaded in parallel, executed in order
+            element.src = url;
+        }
+
+        Object.entries( asset.attrs || {} )
+            .forEach( ( [ attr, val ] ) => element.setAttribute( attr, val ) );
+
+        const loaded = new Promise( ( resolve, reject ) => {
+            element.onload = () => resolve( key );
+            element.onerror = () => reject( new Error( `Asset '${ key }' could not be loaded.` ) );
+        } );
+
+        registry[ key ] = { asset: asset, element: element, loaded: loaded };
+
+        document.head.appendChild( element );
+
+        return loaded;
+    }
+
+    /**
+     * Register the asset in the notebook manifest and link it
+     *
+     * @param asset {Object} - asset of type 'css' or 'js', its url and attributes
+     * @returns {Promise}
+     */
+    function register( asset ) {
+        const key = get_key( asset );
+
+        let manifest = get_manifest().filter( ( a ) => get_key( a ) !== key );
+        manifest.push( asset );
+
+        set_manifest( manifest );
+        Jupyter.notebook.set_dirty( true );
+
+        return link( asset );
+    }
+
+    /**
+     * Link all the assets from the notebook manifest
+     *
+     * Assets are linked at once and loaded in parallel, the promise is resolved
+     * once all of them have been loaded (or failed to load).
+     *
+     * @returns {Promise<Array>}
+     */
+    function load_manifest() {
+        const manifest = get_manifest().filter( ( a ) => _.isUndefined( registry[ get_key( a ) ] ) );
+
+        if ( manifest.length <= 0 ) return Promise.resolve( [] );
+
+        log.debug( "Linking assets:", manifest );
+
+        return Promise.all(
+            manifest.map( ( asset ) => link( asset ).catch( ( err ) => log.error( err ) ) ) );
+    }
+
+
+    return {
+        get_manifest  : get_manifest,
+        set_manifest  : set_manifest,
+
+        link          : link,
+        preload       : preload,
+        register      : register,
+        load_manifest : load_manifest,
+
+        registry      : () => _.keys( registry ),
+    };
+} );
@@ -0,0 +1,128 @@
+/**
+ * Cache.
+ *
+ * Size-bounded LRU cache of rendered outputs.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements caching of rendered output HTML.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [ 'underscore', './logger' ], function ( _, Logger ) {
+    'use strict';
+
+    const log = Logger()
+
+    /**
+     * Compute hash of the values
+     *
+     * Two FNV-1a hashes with different offset bases are combined into a 64-bit hex digest.
+     *
+     * @param values {...any} - JSON serializable values
+     * @returns {String}
+     */
+    function hash( ...values ) {
+        const text = JSON.stringify( values );
+
+        let h1 = 0x811c9dc5, h2 = 0x01000193 ^ 0x5bd1e995;
+        for ( let i = 0; i < text.length; i++ ) {
+            const c = text.charCodeAt( i );
+
+            h1 = Math.imul( h1 ^ c, 0x01000193 ) >>> 0;
+            h2 = Math.imul( h2 ^ c, 0x01000193 ) >>> 0;
+        }
+
+        return h1.toString( 16 ).padStart( 8, '0' ) + h2.toString( 16 ).padStart( 8, '0' );
+    }
+
+    /**
+     * LRU cache of rendered output HTML bounded by its estimated size in bytes
+     *
+     * @param max_bytes {Number} - maximum estimated size of the cached HTML
+     */
+    function RenderCache( max_bytes ) {
+        this.max_bytes = max_bytes;
+
+        this.clear();
+    }
+
+    RenderCache.prototype.clear = function () {
+        this.entries = new Map();  // key -> html, in order of use
+        this.bytes = 0;
+
+        this.hits = 0;
+        this.misses = 0;
+        this.evictions = 0;
+    };
+
+    RenderCache.prototype.get = function ( key ) {
+        const html = this.entries.get( key );
+
+        if ( _.isUndefined( html ) ) {
+            this.misses++;
+
+            return;
+        }
+
+        // mark as recently used
+        this.entries.delete( key );
+        this.entries.set( key, html );
+
+        this.hits++;
+
+        return html;
+    };
+
+    RenderCache.prototype.set = function ( key, html ) {
+        const size = html.length * 2;  // UTF-16
+
+        if ( this.entries.has( key ) ) {
+            this.bytes -= this.entries.get( key ).length * 2;
+            this.entries.delete( key );
+        }
+
+        if ( size > this.max_bytes ) return;
+
+        this.entries.set( key, html );
+        this.bytes += size;
+
+        this.evict();
+    };
+
+    RenderCache.prototype.evict = function () {
+        for ( const [ key, html ] of this.entries ) {
+            if ( this.bytes <= this.max_bytes ) break;
+
+            log.debug( `Evicting cached output '${ key }'.` );
+
+            this.entries.delete( key );
+            this.bytes -= html.length * 2;
+            this.evictions++;
+        }
+    };
+
+    RenderCache.prototype.resize = function ( max_bytes ) {
+        this.max_bytes = max_bytes;
+
+        this.evict();
+    };
+
+    RenderCache.prototype.info = function () {
+        return {
+            hits: this.hits,
+            misses: this.misses,
+            evictions: this.evictions,
+            entries: this.entries.size,
+            bytes: this.bytes,
+            max_bytes: this.max_bytes,
+        };
+    };
+
+
+    return {
+        RenderCache : RenderCache,
+
+        hash        : hash,
+    };
+} );
@@ -26,10 +26,20 @@ define( [
     'base/js/namespace',
     'base/js/events',
     'notebook/js/codecell',
+    'notebook/js/outputarea',
     'services/kernels/comm',
     './logger',
-    './display'
-], function ( _, Jupyter, events, codecell, comms, Logger, display ) {
+    './display',
+    './data',
+    './inflate',
+    './scheduler',
+    './css',
+    './worker',
+    './cache',
+    './disposal',
+    './esm',
+    './assets'
+], function ( _, Jupyter, events, codecell, outputarea, comms, Logger, display, data, inflate, scheduler, css, worker, cache, disposal, esm, assets ) {
     'use strict';
 
     const log = Logger()
@@ -38,17 +48,14 @@ define( [
     let Notebook = Jupyter.Notebook;
 
     let comm_manager;
-    let comm;
 
     const get_callbacks = CodeCell.prototype.get_callbacks
+    const clear_output = outputarea.OutputArea.prototype.clear_output
 
 
     let _init_comm_manager = function ( kernel ) {
         // define in the outer scope
         comm_manager = kernel.comm_manager;
-        comm = new comms.Comm( 'communicate', `communicate.JupyterRequire#${ _.now() }` );
-
-        comm_manager.register_comm( comm );
     };
 
     if ( Jupyter.notebook.kernel ) {
@@ -92,6 +99,16 @@ define( [
         return callbacks;
     }
 
+    outputarea.OutputArea.prototype.clear_output = function () {
+        const r = clear_output.apply( this, arguments );
+
+        // release resources held by the cleared outputs
+        disposal.sweep();
+        data.clear( this );
+
+        return r;
+    }
+
     /**
      * Get running cells
      */
@@ -144,6 +161,38 @@ define( [
      */
     function set_notebook_config( config ) { Jupyter.notebook.metadata.require = config; }
 
+    /**
+     * Default notebook options
+     */
+    const DEFAULT_OPTIONS = {
+        lazy_render: true,                         // defer outputs until scrolled near the viewport
+        lazy_render_margin: '200px',               // margin around the viewport for the lazy rendering
+        render_cache: false,                       // serve outputs of repeated executions from cache
+        render_cache_max_bytes: 16 * 1024 * 1024,  // size limit of the render cache
+        retention_max_outputs: 100,                // number of live outputs kept for re-rendering
+        load_policy: 'eager',                      // load libraries on open: 'eager', 'prefetch' or 'lazy'
+    };
+
+    /**
+     * Get notebook JupyterRequire options
+     *
+     * @returns {Object} - options merged with defaults
+     */
+    function get_notebook_options() {
+        return Object.assign( {}, DEFAULT_OPTIONS, Jupyter.notebook.metadata.require_options );
+    }
+
+    /**
+     * Set notebook JupyterRequire options
+     *
+     * @param options {Object} - options to update
+     */
+    function set_notebook_options( options ) {
+        let md = Jupyter.notebook.metadata;
+
+        md.require_options = Object.assign( {}, md.require_options, options );
+    }
+
 
     /**
      * Get cell requirement metadata
@@ -164,41 +213,33 @@ define( [
 
     /**
      *  Check cell requirements
+     *
+     *  Each library is required once, the promise is rejected
+     *  if the library fails to load.
+     *
      * @param required {Array} - array of requirements
      * @returns {Array}
      */
     function check_requirements( required ) {
         log.debug( "Checking required libraries: ", required );
 
-        let defined = [];  // array of promises
-
-        required.forEach( ( lib ) => {
-
-            let p = new Promise( ( resolve, reject ) => {
-
-                let iid, tid;
-
-                let callback = function () {
-                    clearTimeout( tid );
-                    clearInterval( iid );
-
-                    resolve( `${ lib }: Success.` );
-                };
-                let errback = function () {
-                    clearInterval( iid );
-
-                    reject( new Error( `${ lib }: Timeout. Library '${ lib }' is not loaded.` ) );
-                };
-
-                tid = setTimeout( errback, 10000 );
-                iid = setInterval( () => require( [ lib ], callback ), 250 );
-
-            } );
+        return required.map( ( lib ) => new Promise( ( resolve, reject ) => {
+            if ( esm.is_module( lib ) ) {
+                return esm.load( lib )
+                    .then( () => resolve( `${ lib }: Success.` ) )
+                    .catch( ( err ) => reject(
+                        new Error( `${ lib }: Module '${ lib }' could not be imported: ${ err.message }` ) ) );
+            }
 
-            defined.push( p );
-        } );
+            require( [ lib ],
+                () => resolve( `${ lib }: Success.` ),
+                ( err ) => {
+                    // allow the library to be required again, i.e. once it is configured
+                    requirejs.undef( lib );
 
-        return defined;
+                    reject( new Error( `${ lib }: Library '${ lib }' could not be loaded: ${ err.message }` ) );
+                } );
+        } ) );
     }
 
     /**
@@ -226,38 +267,345 @@ define( [
         cell.output_area.append_output( output_error );
     }
 
+    /**
+     * Libraries loaded by the frontend
+     *
+     * The registry survives kernel restarts, so that only missing or changed
+     * libraries are loaded again when the kernel reconnects.
+     */
+    let loaded_libraries = {};  // library -> path
+
+    /**
+     * Compute hash of requireJS config
+     *
+     * The hash is computed (FNV-1a) from the config serialized with sorted keys,
+     * the kernel computes the same hash of its config.
+     *
+     * @param config {Object} - requirejs configuration object
+     * @returns {String} - hex digest
+     */
+    function config_hash( config ) {
+        const canonical = ( obj ) => {
+            if ( _.isArray( obj ) ) return `[${ obj.map( canonical ).join( ',' ) }]`;
+            if ( _.isObject( obj ) ) {
+                return `{${ _.keys( obj ).sort().map( ( k ) => `${ JSON.stringify( k ) }:${ canonical( obj[ k ] ) }` ).join( ',' ) }}`;
+            }
+
+            return JSON.stringify( obj );
+        };
+
+        let canonical_config = { paths: config.paths || {}, shim: config.shim || {} };
+        // ES modules are hashed only if there are any, so that hashes of existing configs do not change
+        if ( !_.isEmpty( config.esm ) ) canonical_config.esm = config.esm;
+
+        const bytes = new TextEncoder().encode( canonical( canonical_config ) );
+
+        let hash = 0x811c9dc5;
+        for ( const b of bytes ) hash = Math.imul( hash ^ b, 0x01000193 ) >>> 0;
+
+        return hash.toString( 16 ).padStart( 8, '0' );
+    }
+
+    /**
+     * Map libraries configured with stylesheet paths to the css! plugin
+     *
+     * @param config {Object} - requirejs configuration object
+     * @returns {Object} - requirejs configuration object
+     */
+    function map_stylesheets( config ) {
+        let paths = {}, stylesheets = {};
+
+        _.each( config.paths, ( path, lib ) => {
+            if ( css.is_stylesheet( path ) ) stylesheets[ lib ] = `css!${ path }`;
+            else paths[ lib ] = path;
+        } );
+
+        if ( _.isEmpty( stylesheets ) ) return config;
+
+        let map = Object.assign( {}, config.map );
+        map[ '*' ] = Object.assign( {}, map[ '*' ], stylesheets );
+
+        return Object.assign( {}, config, { paths: paths, map: map } );
+    }
+
+    /**
+     * Subresource integrity hashes of the libraries
+     *
+     * The hashes are set on the script elements created by RequireJS,
+     * so that the browser refuses libraries which do not match.
+     */
+    let library_integrity = {};  // library -> integrity hash
+
+    requirejs.config( {
+        onNodeCreated: function ( node, config, name, url ) {
+            const integrity = library_integrity[ name ];
+
+            if ( _.isUndefined( integrity ) ) return;
+
+            node.setAttribute( 'integrity', integrity );
+            node.setAttribute( 'crossorigin', 'anonymous' );
+        }
+    } );
+
+    /**
+     * Add low priority preload hints of the libraries
+     *
+     * The hints do not block anything, the libraries are evaluated
+     * once they are required and fetched from the cache.
+     *
+     * @param libs {Array} - library names
+     * @param paths {Object} - library paths by their names
+     */
+    function prefetch_libraries( libs, paths ) {
+        libs.forEach( ( lib ) => {
+            let type, url;
+            if ( esm.is_module( lib ) ) {
+                [ type, url ] = [ 'module', esm.url( lib ) ];
+            } else if ( css.is_stylesheet( paths[ lib ] ) ) {
+                [ type, url ] = [ 'css', paths[ lib ] ];
+            } else {
+                // the extension goes before the query string (`urlArgs`), as RequireJS loads it
+                [ type, url ] = [ 'js', requirejs.toUrl( `${ lib }.js` ) ];
+            }
+
+            let attrs = { fetchpriority: 'low' };
+            if ( !_.isUndefined( library_integrity[ lib ] ) ) {
+                Object.assign( attrs, { integrity: library_integrity[ lib ], crossorigin: 'anonymous' } );
+            }
+
+            assets.preload( { type: type, url: url, attrs: attrs } );
+        } );
+    }
+
     /**
      * Load required libraries
      *
      * This function pauses execution of Jupyter kernel
      * until require libraries are loaded
      *
+     * Only libraries which have not been loaded yet or whose path
+     * has changed are loaded, the others are kept.
+     *
+     * With the 'prefetch' and 'lazy' load policies, the libraries are only configured
+     * and they are loaded once a cell requires them, the 'prefetch' policy
+     * issues low priority fetches of the libraries beforehand.
+     *
      * @param config {Object}  - requirejs configuration object
+     * @param policy {String} - load policy, one of 'eager', 'prefetch' or 'lazy'
      */
-    async function load_required_libraries( config ) {
+    async function load_required_libraries( config, { policy = 'eager' } = {} ) {
         log.debug( 'Require config: ', config );
 
-        let libs = config.paths;
+        // ES modules are loaded by native import()
+        esm.register( config.esm, config.integrity );
+
+        let libs = Object.assign( {}, config.paths, config.esm );
 
         if ( $.isEmptyObject( libs ) ) {
             return Promise.resolve( "No libraries to load." );
         }
 
-        log.log( "Loading required libraries:", libs );
+        // libraries are loaded in the dependency order precomputed by the kernel, if any
+        const order = _.union( _.intersection( config.order || [], _.keys( libs ) ), _.keys( libs ) );
+        const changed = order.filter(
+            ( lib ) => loaded_libraries[ lib ] !== libs[ lib ] || !( esm.is_module( lib ) || requirejs.defined( lib ) ) );
+
+        Object.assign( library_integrity, config.integrity );
 
-        require.config( config );
+        // changed libraries have to be undefined to be loaded from the new path
+        changed
+            .filter( ( lib ) => !_.isUndefined( loaded_libraries[ lib ] ) && loaded_libraries[ lib ] !== libs[ lib ] )
+            .filter( ( lib ) => !esm.is_module( lib ) )
+            .forEach( ( lib ) => requirejs.undef( lib ) );
 
-        log.log( "Linking required libraries:", libs );
+        log.log( "Loading required libraries:", changed );
 
-        let defined = check_requirements( Object.keys( libs ) );
+        require.config( map_stylesheets( _.omit( config, 'esm', 'integrity', 'order' ) ) );
+
+        if ( policy !== 'eager' ) {
+            // the libraries are loaded from the configured paths once required
+            changed.forEach( ( lib ) => loaded_libraries[ lib ] = libs[ lib ] );
+
+            if ( policy === 'prefetch' ) prefetch_libraries( changed, libs );
+
+            log.log( `Libraries are loaded once required (${ policy }):`, changed );
+            events.trigger( 'config.JupyterRequire', { config: config } );
+
+            return Promise.resolve( changed );
+        }
+
+        log.log( "Linking required libraries:", changed );
+
+        let defined = check_requirements( changed );
 
         return await Promise.all( defined ).then(
             ( values ) => {
+                changed.forEach( ( lib ) => loaded_libraries[ lib ] = libs[ lib ] );
+
                 log.log( 'Success: ', values );
                 events.trigger( 'config.JupyterRequire', { config: config } );
             } ).catch( handle_error );
     }
 
+    /**
+     * Module dependency graph
+     *
+     * Dependents of each loaded module are recorded by RequireJS `onResourceLoad` hook,
+     * so that modules depending on a reloaded module can be invalidated as well.
+     */
+    let module_dependents = {};  // module -> Set of modules which depend on it
+
+    const on_resource_load = requirejs.onResourceLoad;
+
+    requirejs.onResourceLoad = function ( context, map, deps ) {
+        ( deps || [] ).forEach( ( dep ) => {
+            if ( !dep || dep.id === map.id ) return;
+
+            let dependents = module_dependents[ dep.id ] || new Set();
+            dependents.add( map.id );
+
+            module_dependents[ dep.id ] = dependents;
+        } );
+
+        if ( _.isFunction( on_resource_load ) ) on_resource_load.apply( this, arguments );
+    };
+
+    /**
+     * Get modules transitively depending on the given modules (including them)
+     *
+     * @param modules {Array} - module names
+     * @returns {Array}
+     */
+    function get_dependents( modules ) {
+        let closure = new Set( modules );
+        let queue = [ ...modules ];
+
+        while ( queue.length > 0 ) {
+            const dependents = module_dependents[ queue.shift() ] || [];
+
+            dependents.forEach( ( d ) => {
+                if ( closure.has( d ) ) return;
+
+                closure.add( d );
+                queue.push( d );
+            } );
+        }
+
+        return Array.from( closure );
+    }
+
+    /**
+     * Get registry of modules defined by the `%%define` magic
+     *
+     * The registry is stored in the notebook metadata and persists through notebook reloads.
+     *
+     * @returns {Object} - module name -> { source, hash }
+     */
+    function get_notebook_modules() { return Jupyter.notebook.metadata.require_modules || {}; }
+
+    /**
+     * Materialise module from the registry on its first require
+     *
+     * Modules in the registry are not defined until something requires them,
+     * so that unused modules cost nothing at the notebook startup.
+     */
+    const load = requirejs.load;
+
+    requirejs.load = function ( context, name, url ) {
+        const module = get_notebook_modules()[ name ];
+
+        if ( _.isUndefined( module ) ) return load.apply( this, arguments );
+
+        log.debug( "Materialising module: ", name );
+
+        try {
+            define( name, new Function( 'require', module.source ) );
+        } catch ( err ) {
+            return context.onError( err );
+        }
+
+        // complete asynchronously, the same way a loaded script would
+        setTimeout( () => context.completeLoad( name ), 0 );
+    };
+
+    /**
+     * Register module in the notebook module registry
+     *
+     * The module is materialised lazily on its first require. If the module
+     * has already been materialised and its source changed, it is hot reloaded.
+     *
+     * @param name {String} - module name
+     * @param source {String} - module factory body
+     * @param hash {String} - hash of the source
+     * @returns {Promise<any>}
+     */
+    function define_module( name, source, hash ) {
+        let modules = get_notebook_modules();
+        let module = modules[ name ];
+
+        if ( !_.isUndefined( module ) && !_.isUndefined( hash ) && module.hash === hash ) {
+            log.debug( `Module '${ name }' has not changed.` );
+
+            return Promise.resolve( [] );
+        }
+
+        modules[ name ] = { source: source, hash: hash };
+
+        Jupyter.notebook.metadata.require_modules = modules;
+        Jupyter.notebook.set_dirty( true );
+
+        if ( requirejs.specified( name ) ) return hot_reload( [ name ] );
+
+        return Promise.resolve( [] );
+    }
+
+    /**
+     * Re-execute live outputs of cells requiring any of the modules
+     *
+     * @param modules {Array} - module names
+     * @returns {Promise<any>}
+     */
+    function rerender_outputs( modules ) {
+        let cells = Jupyter.notebook.get_cells().filter(
+            ( c ) => c.cell_type === 'code' && _.intersection( get_cell_requirements( c ), modules ).length > 0 );
+
+        return Promise.all( cells.map( ( cell ) => {
+            let outputs = cell.output_area.outputs.filter(
+                ( d ) => d instanceof display.DisplayData && _.isFunction( d.metadata.execute ) );
+
+            return Promise.all( outputs.map( ( d ) => display.rerender_output( d, cell.output_area ) ) );
+        } ) );
+    }
+
+    /**
+     * Hot reload modules
+     *
+     * Undefine the modules and all the modules which (transitively) depend on them,
+     * require them again and re-execute the outputs which require any of them.
+     *
+     * Modules from the notebook module registry are materialised again
+     * from their current source.
+     *
+     * @param modules {Array} - names of the changed modules
+     * @returns {Promise<Array>} - reloaded modules
+     */
+    async function hot_reload( modules ) {
+        const defined = requirejs.s.contexts._.defined;
+        const reloaded = get_dependents( modules ).filter(
+            ( m ) => _.includes( modules, m ) || _.has( defined, m ) );
+
+        log.debug( "Hot reloading modules: ", reloaded );
+
+        reloaded.forEach( ( m ) => requirejs.undef( m ) );
+
+        await new Promise( ( resolve, reject ) => requirejs( reloaded, resolve, reject ) );
+        await rerender_outputs( reloaded );
+
+        events.trigger( 'hot_reload.JupyterRequire', { modules: reloaded } );
+
+        return reloaded;
+    }
+
     /**
      * Asynchronous Function constructor
      */
@@ -299,6 +647,27 @@ define( [
         } );
     };
 
+    /**
+     * Require the libraries, AMD modules by RequireJS and ES modules by native `import()`
+     *
+     * Both kinds of modules are loaded in parallel.
+     *
+     * @param required {Array} - library names
+     * @returns {Promise<Array>} - the libraries in the order of their names
+     */
+    function require_libraries( required ) {
+        const [ modules, amd ] = _.partition( required, esm.is_module );
+
+        // any exception thrown by RequireJS (like "Mismatched anonymous define() module")
+        // rejects the promise to avoid deadlocking the interpreter
+        const amd_values = new Promise(
+            ( resolve, reject ) => requirejs( amd, ( ...args ) => resolve( args ), reject ) );
+        const esm_values = Promise.all( modules.map( esm.load ) );
+
+        return Promise.all( [ amd_values, esm_values ] ).then( ( [ a, e ] ) => required.map(
+            ( lib ) => esm.is_module( lib ) ? e[ modules.indexOf( lib ) ] : a[ amd.indexOf( lib ) ] ) );
+    }
+
     /**
      * Execute function with requirements in an output_area context
      *
@@ -306,28 +675,130 @@ define( [
      * @param required {Array} - required libraries
      * @param silent {boolean} - whether the script should be executed in the silent mode
      * @param output_area {OutputArea} - current code cell's output area
+     * @param target {jQuery} - existing output element to render into [optional]
      * @returns {Promise<any>}
      */
-    let execute_with_requirements = function ( func, required, silent, context, output_area ) {
+    let execute_with_requirements = function ( func, required, silent, context, output_area, target ) {
         return new Promise( async ( resolve, reject ) => {
-            let element = silent ? undefined : display.create_output_subarea( output_area );
-
-            try {
-                requirejs( required, ( ...args ) => {
-                    func.apply( output_area, [ ...args, element, context ] )
-                        .then( () => {
-                            resolve( element );
-                        } ).catch( reject );
+            if ( target ) disposal.dispose( target );
+
+            let element = silent ? undefined :
+                target ? target.empty() : display.create_output_subarea( output_area );
+
+            if ( !silent ) {
+                // each render has its own disposal scope
+                const scope = disposal.create( element );
+
+                context = Object.create( context, {
+                    on_dispose: { value: ( fn ) => scope.on_dispose( fn ) },
+                    signal: { get: () => scope.signal },
                 } );
-            } catch ( err ) {
-                // catch any exception thrown by RequireJS (like "Mismatched anonymous define() module")
-                // to avoid deadlocking the interpreter
-                reject( err );
             }
-            setTimeout( reject, 5000, new Error( "Script execution timeout." ) );
+
+            // the timeout applies to resolving of the requirements only,
+            // the script itself may run for long (i.e. in a worker)
+            const timeout = setTimeout( reject, 5000, new Error( "Script execution timeout." ) );
+
+            require_libraries( required )
+                .then( ( args ) => {
+                    clearTimeout( timeout );
+
+                    return func.apply( output_area, [ ...args, element, context ] );
+                } )
+                .then( () => {
+                    // re-rendered into an existing output, new outputs are attached by `display.append_output`
+                    if ( element ) disposal.attach( element );
+
+                    resolve( element );
+                } ).catch( reject );
         } );
     };
 
+    /**
+     * Marker line splitting worker script into the compute and the render part
+     */
+    const RENDER_MARKER = /^[ \t]*\/\/[ \t]*@render[ \t]*$/m;
+
+    /**
+     * Wrap script to run its compute part in a Web Worker
+     *
+     * The part before the `// @render` marker line is executed in a pooled worker,
+     * its returned value is available to the render part as `result`.
+     * If there is no marker, the whole script is executed in the worker
+     * and the result is stored in `context.result`.
+     *
+     * @param script {String} - script to be executed
+     * @returns {String} - script to be executed on the main thread
+     */
+    function wrap_worker_script( script ) {
+        const match = RENDER_MARKER.exec( script );
+
+        const compute = match ? script.slice( 0, match.index ) : script;
+        const render = match ? script.slice( match.index + match[ 0 ].length ) : 'context.result = result;';
+
+        return `const result = await context.worker.run( ${ JSON.stringify( compute ) } );\n${ render }`;
+    }
+
+    /**
+     * Cache of rendered outputs
+     *
+     * Outputs are keyed by the script (with substituted inputs), its parameters
+     * and the paths and versions of the required libraries.
+     */
+    let render_cache = new cache.RenderCache( DEFAULT_OPTIONS.render_cache_max_bytes );
+
+    /**
+     * Get render cache key of the script
+     *
+     * @param script {String} - script to be executed
+     * @param required {Array} - required libraries
+     * @param params {Array} - parameter names
+     * @returns {String|undefined} - the key or undefined if caching is disabled
+     */
+    function get_render_cache_key( script, required, params ) {
+        const options = get_notebook_options();
+
+        if ( !options.render_cache ) return;
+
+        if ( render_cache.max_bytes !== options.render_cache_max_bytes )
+            render_cache.resize( options.render_cache_max_bytes );
+
+        const modules = get_notebook_modules();
+        const libraries = required.map(
+            ( lib ) => [ lib, esm.url( lib ) || requirejs.toUrl( lib ), ( modules[ lib ] || {} ).hash ] );
+
+        return cache.hash( script.toString(), params, libraries );
+    }
+
+    /**
+     * Report render cache statistics to the kernel
+     */
+    function report_cache_info() {
+        communicate(
+            { type: 'cache_info', namespace: 'JupyterRequire' }, render_cache.info(), { reply: false } );
+    }
+
+    /**
+     * Create context of the script executed in the cell
+     *
+     * @param cell {CodeCell} - current code cell
+     * @param silent {boolean} - whether the script is executed in the silent mode
+     * @returns {Object}
+     */
+    function create_context( cell, silent ) {
+        const context = silent ? {} : {
+            cell: cell,  // current CodeCell
+            output_area: cell.output_area
+        }
+        // data streamed from the kernel by `require.send_data`
+        context.data = data.get;
+        context.stream = data.stream;
+        // pool of Web Workers for compute-heavy scripts
+        context.worker = worker;
+
+        return context;
+    }
+
     /**
      * Wrap and Execute JS script in output_area context
      *
@@ -336,7 +807,9 @@ define( [
      *
      * @returns {Function} - wrapped execution partial function
      */
-    let execute_script = async function ( script, required, params, silent = false ) {
+    let execute_script = async function ( script, required, params, silent = false, in_worker = false ) {
+
+        const key = silent ? undefined : get_render_cache_key( script, required, params );
 
         // get rid of invalid characters
         params = params
@@ -345,22 +818,34 @@ define( [
         // expose element to the user script
         params.push( 'element' );
 
-        const context = silent ? {} : {
-            cell: this,  // current CodeCell
-            output_area: this.output_area
-        }
+        const context = create_context( this, silent );
         params.push( 'context' )
 
+        if ( in_worker ) script = wrap_worker_script( script.toString() );
+
         try {
             let wrapped = new AsyncFunction( ...params, script.toString() );
             let execute = _.partial( execute_with_requirements, wrapped, required, silent, context );
+            // serialized with the output, see `restore_execute()`
+            execute.source = wrapped.toString();
 
             await Promise.all( check_requirements( required ) )
                 .then( async ( r ) => {
                     log.debug( r );
                     if ( !silent ) {
-                        await display.append_javascript( execute, context.output_area, context ).then(
-                            ( r ) => log.debug( "Output appended.", r )
+                        const html = _.isUndefined( key ) ? undefined : render_cache.get( key );
+
+                        await display.append_javascript( execute, context.output_area, context, html ).then(
+                            ( r ) => {
+                                log.debug( "Output appended.", r );
+
+                                if ( _.isUndefined( key ) ) return;
+                                if ( _.isUndefined( html ) ) {
+                                    render_cache.set( key, r.output.metadata.display.element.html() );
+                                }
+
+                                report_cache_info();
+                            }
                         );
                         events.trigger( 'require.JupyterRequire', { cell: this, require: required, context: context } );
                     } else {
@@ -375,6 +860,142 @@ define( [
         }
     };
 
+    /**
+     * Restore execution partial function of the output loaded from the notebook JSON
+     *
+     * Outputs are serialized with the source of their wrapped script,
+     * the script requires the libraries of its cell.
+     *
+     * @param source {String} - source of the wrapped script
+     * @param cell {CodeCell} - cell of the output
+     * @returns {Function} - wrapped execution partial function
+     */
+    function restore_execute( source, cell ) {
+        // evaluated in the global scope, the same as by the AsyncFunction constructor
+        const wrapped = ( 0, eval )( `(${ source })` );
+
+        let execute = _.partial(
+            execute_with_requirements, wrapped, get_cell_requirements( cell ), false, create_context( cell, false ) );
+        execute.source = source;
+
+        return execute;
+    }
+
+    /**
+     * Compression methods of comm payloads supported by the frontend in order of preference
+     *
+     * The bundled inflater is used if `DecompressionStream` is not available.
+     */
+    const COMPRESSION = _.isUndefined( window.DecompressionStream ) ? [ 'deflate' ] : [ 'deflate', 'gzip' ];
+
+    /**
+     * Messages of all the channels are applied in the order they were sent by the kernel
+     */
+    let message_scheduler = new scheduler.Scheduler();
+
+    /**
+     * Decompress the buffer
+     *
+     * @param buffer {DataView|ArrayBuffer} - compressed buffer
+     * @param method {String} - compression method
+     * @returns {Promise<String>} - decompressed text
+     */
+    async function decompress( buffer, method ) {
+        const bytes = ArrayBuffer.isView( buffer )
+            ? new Uint8Array( buffer.buffer, buffer.byteOffset, buffer.byteLength )
+            : new Uint8Array( buffer );
+
+        if ( _.isUndefined( window.DecompressionStream ) ) {
+            if ( method !== 'deflate' ) throw new Error( `Unsupported compression method: '${ method }'.` );
+
+            return new TextDecoder().decode( inflate.inflate( bytes ) );
+        }
+
+        const stream = new Blob( [ bytes ] ).stream().pipeThrough( new DecompressionStream( method ) );
+
+        return await new Response( stream ).text();
+    }
+
+    /**
+     * Get data of the comm message, decompress the payload if compressed
+     *
+     * @param msg {Object} - comm message
+     * @returns {Promise<Object>} - message data
+     */
+    async function decode_message( msg ) {
+        const d = msg.content.data;
+
+        if ( !d.compressed ) return d;
+
+        const text = await decompress( msg.buffers[ 0 ], d.compressed );
+        log.debug( `Decompressed '${ d.compressed }' payload: ${ msg.buffers[ 0 ].byteLength } -> ${ text.length } chars.` );
+
+        return JSON.parse( text );
+    }
+
+    /**
+     * Registry of open Jupyter Require comms
+     *
+     * Comms superseded by a new comm of the same target (i.e. after
+     * the kernel extension has been reloaded) and comms of a dead kernel
+     * are disposed of, so that neither they nor their handlers accumulate.
+     */
+    const COMM_TARGETS = [ 'config', 'execute', 'safe_execute', 'data' ];
+    const SINGLE_COMM_TARGETS = [ 'config', 'execute', 'safe_execute', 'communicate' ];
+
+    let open_comms = {};  // target -> { comm_id -> comm }
+
+    let dispose_comm = function ( comm ) {
+        log.debug( `Disposing of comm '${ comm.comm_id }'.` );
+
+        comm_manager.unregister_comm( comm );
+        delete ( open_comms[ comm.target_name ] || {} )[ comm.comm_id ];
+    };
+
+    let track_comm = function ( comm ) {
+        const target = comm.target_name;
+        let comms = open_comms[ target ] = open_comms[ target ] || {};
+
+        if ( SINGLE_COMM_TARGETS.includes( target ) ) {
+            _.values( comms )
+                .filter( ( c ) => c.comm_id !== comm.comm_id )
+                .forEach( dispose_comm );
+        }
+
+        comms[ comm.comm_id ] = comm;
+
+        // comms closed by the frontend are not unregistered by the comm manager
+        const close = comm.close;
+        comm.close = function () {
+            dispose_comm( comm );
+
+            return close.apply( comm, arguments );
+        };
+
+        // comms closed by the kernel
+        comm.on_close( () => delete comms[ comm.comm_id ] );
+    };
+
+    events.on( 'kernel_restarting.Kernel kernel_dead.Kernel',
+        () => _.each( open_comms, ( comms ) => _.values( comms ).forEach( dispose_comm ) ) );
+
+    /**
+     * Get counts of open comms and registered comm targets for monitoring
+     *
+     * @returns {Object}
+     */
+    let comm_info = function () {
+        const comms = _.mapObject( open_comms, ( c ) => _.size( c ) );
+
+        return {
+            comms: comms,
+            open: _.reduce( comms, ( total, n ) => total + n, 0 ),
+            targets: _.keys( comm_manager.targets ).filter( ( t ) => COMM_TARGETS.includes( t ) ),
+            registered: _.size( comm_manager.comms ),  // all comms registered by the comm manager
+            requests: _.size( channel_requests ),      // requests waiting for the kernel response
+        };
+    };
+
     /**
      * Register comms for messages from Python kernel
      *
@@ -385,14 +1006,21 @@ define( [
                 ( comm, msg ) => {
                     log.debug( 'Comm: ', comm, 'initial message: ', msg );
 
+                    track_comm( comm );
+
                     comm.on_msg( async ( msg ) => {
                         log.debug( 'Comm: ', comm, 'message: ', msg );
 
                         // get running cell or fall back to current cell
                         let cell = Jupyter.notebook.get_executed_cell();
 
-                        const d = msg.content.data;
-                        return await execute_script.call( cell, d.script, d.require, d.parameters, d.silent );
+                        const d = await decode_message( msg );
+                        return await message_scheduler.schedule( d, {
+                            barrier: d.barrier,
+                            prepare: () => Promise.all( check_requirements( d.require ) ),
+                            apply: () => execute_script.call(
+                                cell, d.script, d.require, d.parameters, d.silent, d.worker ),
+                        } ).catch( ( err ) => handle_error( err, d.silent ) );
                     } );
                 }
             );
@@ -405,6 +1033,8 @@ define( [
                 ( comm, msg ) => {
                     log.debug( 'Comm: ', comm, 'initial message: ', msg );
 
+                    track_comm( comm );
+
                     comm.on_msg( async ( msg ) => {
                         log.debug( 'Comm: ', comm, 'message: ', msg );
 
@@ -412,11 +1042,14 @@ define( [
                         let cell = Jupyter.notebook.get_executed_cell();
                         let output_area = cell.output_area;
 
-                        const script = msg.content.data.script;
+                        const d = await decode_message( msg );
 
-                        log.debug( "Executing safe script: ", script );
+                        log.debug( "Executing safe script: ", d.script );
 
-                        return await safe_execute( script, output_area )
+                        return await message_scheduler.schedule( d, {
+                            barrier: d.barrier,
+                            apply: () => safe_execute( d.script, output_area ),
+                        } )
                             .then( () => log.debug( "Success." ) )
                             .catch( handle_error );
                     } );
@@ -432,9 +1065,28 @@ define( [
                 ( comm, msg ) => {
                     log.debug( 'Comm: ', comm, 'initial message: ', msg );
 
+                    track_comm( comm );
+
+                    const config = _.pick( get_notebook_config(), 'paths', 'shim', 'esm', 'integrity' );
+                    const hash = config_hash( config );
+
+                    // advertise capabilities and reconcile config with the kernel,
+                    // the kernel adopts the notebook config if it differs (i.e. on kernel restart)
+                    comm.send( {
+                        capabilities: { compression: COMPRESSION },
+                        config_hash: hash,
+                        config: hash !== msg.content.data.config_hash ? config : undefined,
+                    } );
+
                     comm.on_msg( async ( msg ) => {
                         log.debug( 'Comm: ', comm, 'message: ', msg );
-                        return await load_required_libraries( msg.content.data )
+                        const d = await decode_message( msg );
+
+                        // configuration is always a barrier
+                        return await message_scheduler.schedule( d, {
+                            barrier: true,
+                            apply: () => load_required_libraries( _.omit( d, 'seq', 'session', 'barrier' ) ),
+                        } )
                             .then( ( values ) => log.debug( values ) )
                             .catch( log.error );
                     } );
@@ -444,7 +1096,23 @@ define( [
             resolve( `Comm 'config' registered.` );
         } );
 
-        return Promise.all( [ _execute, _safe_execute, _config ] )
+        let _data = new Promise( ( resolve ) => {
+            comm_manager.register_target( 'data',
+                ( comm, msg ) => {
+                    log.debug( 'Comm: ', comm, 'initial message: ', msg );
+
+                    track_comm( comm );
+
+                    // display progress in the running cell, if any
+                    let cell = Jupyter.notebook.get_running_cells()[ 0 ];
+
+                    data.open( comm, msg, cell ? cell.output_area : undefined );
+                } );
+
+            resolve( `Comm 'data' registered.` );
+        } );
+
+        return Promise.all( [ _execute, _safe_execute, _config, _data ] )
             .then( ( r ) => {
                 events.trigger(
                     'comms_registered.JupyterRequire', { timestamp: _.now() } );
@@ -453,39 +1121,137 @@ define( [
             } );
     };
 
+    /**
+     * Long-lived channel multiplexing events sent to Jupyter Require kernel
+     *
+     * Events emitted in the same animation frame are sent in a single message,
+     * responses are matched to the requests by their ids.
+     */
+    let channel;
+    let channel_requests = {};  // request id -> { resolve, reject, timeout }
+    let channel_batch = [];     // messages waiting for the next animation frame
+    let channel_request_id = 0;
+
+    const FRAME_TIMEOUT = 100;  // ms, animation frames are paused in background tabs
+
+    /**
+     * Run the callback in the next animation frame
+     *
+     * Falls back to a timer if the document is hidden, since animation frames are not fired
+     * in background tabs, or if the frame does not come within the frame timeout.
+     */
+    const request_frame = function ( callback ) {
+        if ( !window.requestAnimationFrame || document.hidden ) return setTimeout( callback, 0 );
+
+        let frame, timer;
+        const run = () => {
+            window.cancelAnimationFrame( frame );
+            clearTimeout( timer );
+
+            callback();
+        };
+
+        frame = window.requestAnimationFrame( run );
+        timer = setTimeout( run, FRAME_TIMEOUT );
+    };
+
+    /**
+     * Reject pending requests and drop the channel
+     *
+     * The channel is opened again with the next communicated event.
+     */
+    let close_channel = function ( reason = "Communication channel closed." ) {
+        _.each( channel_requests, ( request ) => {
+            clearTimeout( request.timeout );
+            request.reject( new Error( reason ) );
+        } );
+
+        if ( !_.isUndefined( channel ) ) dispose_comm( channel );
+
+        channel = undefined;
+        channel_requests = {};
+    };
+
+    let open_channel = function () {
+        if ( !_.isUndefined( channel ) ) return channel;
+
+        channel = new comms.Comm( 'communicate', `communicate.JupyterRequire#${ _.now() }` );
+        comm_manager.register_comm( channel );
+        track_comm( channel );
+
+        channel.open( {} );
+        channel.on_msg( ( msg ) => {
+            const responses = msg.content.data.responses || [];
+
+            responses.forEach( ( response ) => {
+                let request = channel_requests[ response.id ];
+                if ( _.isUndefined( request ) ) return;
+
+                delete channel_requests[ response.id ];
+                clearTimeout( request.timeout );
+
+                request.resolve( response );
+            } );
+        } );
+        channel.on_close( () => close_channel() );
+
+        return channel;
+    };
+
+    let flush_channel = function () {
+        const messages = channel_batch;
+        channel_batch = [];
+
+        if ( messages.length <= 0 ) return;
+
+        log.debug( "Sending events to kernel: ", messages.length );
+
+        open_channel().send( { events: messages } );
+    };
+
+    events.on( 'kernel_restarting.Kernel kernel_dead.Kernel', () => close_channel( "Kernel restarted." ) );
+
     /**
      * Communicate events to Jupyter Require kernel
      *
+     * @param evt {Object} - event to be communicated
+     * @param data {Object} - event data
+     * @param reply {boolean} - whether to wait for the kernel response,
+     *                          fire-and-forget events resolve immediately
+     * @returns {Promise<Object>} - kernel response
      */
-    let communicate = function ( evt, data ) {
+    let communicate = function ( evt, data, { reply = true } = {} ) {
         log.debug( "Communication requested by event: ", evt );
 
-        if ( _.isUndefined( comm ) ) {
+        if ( _.isUndefined( comm_manager ) ) {
             log.warn(
                 "Communication comm has not been initialized yet. " +
                 "Is the kernel ready? Interrupting..." );
-            return;
+            return Promise.resolve();
         }
 
         const event = _.pick( evt, 'data', 'namespace', 'timeStamp', 'type' );
+        let message = { event: event, event_data: data };
+
+        let p = Promise.resolve();
+        if ( reply ) {
+            const id = ++channel_request_id;
+            message.id = id;
 
-        comm.open( { 'event_type': evt.type } );
-        let p = new Promise( ( resolve, reject ) => {
-            log.debug( "Sending event to kernel.", event, data );
+            p = new Promise( ( resolve, reject ) => {
+                const timeout = setTimeout( () => {
+                    delete channel_requests[ id ];
+                    reject( new Error( "Communication timeout." ) );
+                }, 5000 );
 
-            comm.send( { event: event, event_data: data } );
-            comm.on_msg( ( r ) => {
-                log.debug( "Kernel response received: ", r );
-                resolve();
+                channel_requests[ id ] = { resolve: resolve, reject: reject, timeout: timeout };
             } );
+        }
 
-            setTimeout( reject, 5000, new Error( "Script execution timeout." ) );
-        } );
+        if ( channel_batch.length <= 0 ) request_frame( flush_channel );
+        channel_batch.push( message );
 
-        return p.then( comm.close ).catch( ( err ) => {
-            comm.close();
-            throw err instanceof Error ? err : new Error( err );
-        } );
+        return p;
     };
 
 
@@ -494,6 +1260,7 @@ define( [
         AsyncFunction: AsyncFunction,
 
         communicate: communicate,
+        comm_info: comm_info,
 
         get_cell_requirements: get_cell_requirements,
         set_cell_requirements: set_cell_requirements,
@@ -501,14 +1268,28 @@ define( [
         get_notebook_config: get_notebook_config,
         set_notebook_config: set_notebook_config,
 
+        get_notebook_options: get_notebook_options,
+        set_notebook_options: set_notebook_options,
+
         check_requirements: check_requirements,
 
         execute_script: execute_script,
+        restore_execute: restore_execute,
         execute_with_requirements: execute_with_requirements,
         safe_execute: safe_execute,
 
         load_required_libraries: load_required_libraries,
+        config_hash: config_hash,
+        loaded_libraries: () => _.clone( loaded_libraries ),
+        render_cache: render_cache,
+
+        get_notebook_modules: get_notebook_modules,
+        define_module: define_module,
+        get_dependents: get_dependents,
+        hot_reload: hot_reload,
 
+        decode_message: decode_message,
+        scheduler: message_scheduler,
         register_targets: register_targets,
     };
 
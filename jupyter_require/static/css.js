@@ -0,0 +1,48 @@
+/**
+ * CSS.
+ *
+ * RequireJS loader plugin for stylesheets.
+ *
+ * Stylesheets are required as `css!<url>` and loaded concurrently with scripts,
+ * the module is resolved once the stylesheet has been applied. Libraries configured
+ * with a path ending with `.css` are mapped to the plugin as well.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements the css! loader plugin.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [ 'module', './assets' ], function ( module, assets ) {
+    'use strict';
+
+    // make the plugin available as `css!`
+    requirejs.config( { map: { '*': { css: module.id } } } );
+
+    const CSS_EXTENSION = /\.css(\?.*)?$/;
+
+    return {
+        /**
+         * Load the stylesheet
+         *
+         * Stylesheets are deduplicated by their URL by the asset registry.
+         */
+        load: function ( name, req, onload, config ) {
+            if ( config.isBuild ) return onload();
+
+            const url = req.toUrl( CSS_EXTENSION.test( name ) ? name : `${ name }.css` );
+
+            assets.link( { type: 'css', url: url } )
+                .then( () => onload( url ) )
+                .catch( ( err ) => onload.error( err ) );
+        },
+
+        /**
+         * Check whether the path refers to a stylesheet
+         *
+         * @param path {String}
+         * @returns {boolean}
+         */
+        is_stylesheet: ( path ) => CSS_EXTENSION.test( path ),
+    };
+} );
@@ -0,0 +1,218 @@
+/**
+ * Data.
+ *
+ * Assemble data streamed from the kernel in chunks.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements assembling of chunked data transfers.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [ 'underscore', './logger' ], function ( _, Logger ) {
+    'use strict';
+
+    const log = Logger()
+
+    let transfers = {};  // name -> Transfer, released once their output is cleared
+
+    /**
+     * Data transfer assembled from chunks
+     *
+     * @param name {String} - name of the data
+     */
+    function Transfer( name ) {
+        this.name = name;
+        this.output_area = undefined;  // output area the transfer belongs to
+        this._listeners = [];  // resolved on every change
+
+        this.reset();
+    }
+
+    Transfer.prototype.reset = function () {
+        this.chunks = [];         // seq -> items
+        this.received = 0;        // number of contiguously received chunks
+        this.count = undefined;   // total number of chunks, known once all have been sent
+        this.total = undefined;   // total number of items, if known
+        this.chunk_size = undefined;
+        this.complete = false;
+        this._items = undefined;  // assembled once complete
+    };
+
+    /**
+     * Get all items, the chunks are assembled only once
+     *
+     * @returns {Array}
+     */
+    Transfer.prototype.items = function () {
+        if ( _.isUndefined( this._items ) ) this._items = _.flatten( this.chunks, true );
+
+        return this._items;
+    };
+
+    Transfer.prototype.push = function ( seq, items ) {
+        this.chunks[ seq ] = items;
+        this._items = undefined;
+
+        while ( !_.isUndefined( this.chunks[ this.received ] ) ) this.received++;
+
+        this.complete = !_.isUndefined( this.count ) && this.received >= this.count;
+        this.notify();
+    };
+
+    Transfer.prototype.finish = function ( count ) {
+        this.count = count;
+
+        this.complete = this.received >= this.count;
+        this.notify();
+    };
+
+    Transfer.prototype.progress = function () {
+        if ( this.complete ) return 1;
+        if ( !this.total ) return undefined;
+
+        return Math.min( this.received * this.chunk_size / this.total, 1 );
+    };
+
+    Transfer.prototype.notify = function () {
+        const listeners = this._listeners;
+        this._listeners = [];
+
+        listeners.forEach( ( resolve ) => resolve( this ) );
+    };
+
+    Transfer.prototype.changed = function () {
+        return new Promise( ( resolve ) => this._listeners.push( resolve ) );
+    };
+
+    function get_transfer( name ) {
+        if ( _.isUndefined( transfers[ name ] ) ) transfers[ name ] = new Transfer( name );
+
+        return transfers[ name ];
+    }
+
+    /**
+     * Get the data once the transfer is complete
+     *
+     * @param name {String} - name of the data
+     * @returns {Promise<Array>} - all items
+     */
+    async function get( name ) {
+        let transfer = get_transfer( name );
+
+        while ( !transfer.complete ) await transfer.changed();
+
+        return transfer.items();
+    }
+
+    /**
+     * Iterate over the data chunks as they arrive
+     *
+     * @param name {String} - name of the data
+     * @returns {AsyncIterator<Array>} - chunks of items
+     */
+    async function* stream( name ) {
+        let transfer = get_transfer( name );
+        let seq = 0;
+
+        while ( true ) {
+            while ( seq < transfer.received ) yield transfer.chunks[ seq++ ];
+
+            if ( transfer.complete ) return;
+
+            await transfer.changed();
+        }
+    }
+
+    /**
+     * Release the data
+     *
+     * @param name {String} - name of the data
+     */
+    function release( name ) {
+        delete transfers[ name ];
+    }
+
+    /**
+     * Release the data transferred to the output area, i.e. once its outputs are cleared
+     *
+     * @param output_area {OutputArea}
+     */
+    function clear( output_area ) {
+        _.each( transfers, ( transfer, name ) => {
+            if ( transfer.output_area === output_area ) release( name );
+        } );
+    }
+
+    /**
+     * Handle data comm opened by the kernel
+     *
+     * Every chunk is acknowledged to the kernel, which uses the acknowledgements
+     * for flow control. The progress is displayed in the output area, if provided.
+     *
+     * @param comm {Comm} - data comm
+     * @param msg {Object} - comm open message
+     * @param output_area {OutputArea} - output area to display the progress in [optional]
+     */
+    function open( comm, msg, output_area ) {
+        const d = msg.content.data;
+
+        let transfer = get_transfer( d.name );
+
+        // new transfer of the same data, otherwise resumed from the offset
+        if ( !d.offset ) transfer.reset();
+
+        transfer.total = d.total;
+        transfer.chunk_size = d.chunk_size;
+        transfer.output_area = output_area;
+
+        log.debug( `Receiving data '${ d.name }' from chunk ${ d.offset }.` );
+
+        let progress;
+        if ( output_area ) {
+            progress = $( '<progress/>' )
+                .addClass( 'jupyter-require-progress' )
+                .attr( { max: 1, value: transfer.progress() || 0, title: d.name } );
+
+            output_area.element.append( progress );
+        }
+
+        comm.on_msg( ( msg ) => {
+            const data = msg.content.data;
+
+            if ( data.done ) {
+                transfer.finish( data.count );
+            } else {
+                transfer.push( data.seq, data.items );
+                comm.send( { ack: data.seq, received: transfer.received } );
+            }
+
+            if ( progress ) {
+                progress.attr( 'value', transfer.progress() || 0 );
+                progress.trigger( 'progress.JupyterRequire', {
+                    name: transfer.name, received: transfer.received, progress: transfer.progress()
+                } );
+            }
+
+            if ( transfer.complete ) {
+                log.debug( `Data '${ transfer.name }' received.` );
+
+                if ( progress ) progress.remove();
+                comm.close();
+            }
+        } );
+    }
+
+
+    return {
+        Transfer : Transfer,
+
+        get      : get,
+        stream   : stream,
+        open     : open,
+        release  : release,
+        clear    : clear,
+
+        transfers: () => _.keys( transfers ),
+    };
+} );
@@ -68,6 +68,27 @@ define(['underscore'], function(_) {
         }
     }
 
+    /**
+     * Serialize the display data
+     *
+     * The output element is not serialized and the execution function
+     * is serialized as the source of its script, if any, so that the output
+     * can be re-executed once the notebook is loaded again.
+     */
+    DisplayData.prototype.toJSON = function() {
+        let metadata = _.omit(this.metadata, 'display', 'execute');
+
+        let execute = this.metadata.execute;
+        if (execute !== undefined && _.isString(execute.source))
+            metadata.execute = execute.source;
+
+        return {
+            output_type: this.output_type,
+            data: this.data,
+            metadata: metadata,
+        };
+    };
+
     /**
      * Freeze the output and store it in the data
      *
@@ -120,6 +141,65 @@ define(['underscore'], function(_) {
     };
 
 
+    /**
+     * Width of output subareas
+     *
+     * The width is measured once per notebook and its changes are tracked
+     * by `ResizeObserver` observing the notebook container, so that no layout
+     * is forced on the execution hot path. Output subareas are sized
+     * by a CSS variable set on the notebook container.
+     */
+    const OUTPUT_WIDTH_VAR = '--jupyter-require-output-width';
+    const OUTPUT_CLASS = 'jupyter-require-output';
+
+    let output_width;     // cached width of output subareas
+    let container_width;  // width of the notebook container the output width corresponds to
+    let resize_observer;
+
+    let get_container = function(output_area) {
+        return output_area.element.closest('#notebook-container').get(0) || document.body;
+    };
+
+    let set_output_width = function(width, container) {
+        output_width = width;
+        container.style.setProperty(OUTPUT_WIDTH_VAR, `${width}px`);
+    };
+
+    let observe_container = function(container) {
+        if (resize_observer !== undefined) return;
+
+        let style = document.createElement('style');
+        style.textContent = `.${OUTPUT_CLASS} { width: var(${OUTPUT_WIDTH_VAR}, auto); }`;
+        document.head.appendChild(style);
+
+        resize_observer = new ResizeObserver((entries) => {
+            const width = entries[entries.length - 1].contentRect.width;
+
+            // the output subarea width follows changes of the container width
+            if (output_width !== undefined && container_width !== undefined && width !== container_width)
+                set_output_width(output_width + width - container_width, container);
+
+            container_width = width;
+        });
+        resize_observer.observe(container);
+    };
+
+    let measure_output_width = function(output_area, toinsert) {
+        // dry-run append to get the current output-area width
+        let output = output_area.create_output_area();
+
+        output.append(toinsert);
+        output_area.element.append(output);
+
+        const width = toinsert.width();
+
+        // clean up
+        toinsert.detach();
+        output.remove();
+
+        return width;
+    };
+
     let create_output_subarea = function(output_area, toinsert) {
         if (toinsert === undefined) {
             toinsert = output_area.create_output_subarea(
@@ -129,27 +209,78 @@ define(['underscore'], function(_) {
         output_area.keyboard_manager.register_events(toinsert);
 
         // preset width for user's comfort
-        // dry-run append to get the current output-area width
-        let output = output_area.create_output_area();
+        if (window.ResizeObserver === undefined) {
+            toinsert.css('width', measure_output_width(output_area, toinsert));
 
-        output.append(toinsert);
-        output_area.element.append(output);
+            return toinsert;
+        }
 
-        toinsert.css('width', toinsert.width());
+        if (output_width === undefined) {
+            const container = get_container(output_area);
 
-        // clean up
-        output_area.element.empty();
+            // the container width is reported by the initial observer callback
+            container_width = undefined;
 
-        return toinsert;
+            set_output_width(measure_output_width(output_area, toinsert), container);
+            observe_container(container);
+        }
+
+        return toinsert.addClass(OUTPUT_CLASS);
     };
 
-    let append_javascript = async function(js, output_area, context) {
-        let toinsert = await js(output_area, context);
+    /**
+     * Append frozen output of the display data as a placeholder
+     *
+     * The placeholder is displayed until the output is re-executed.
+     *
+     * @param display_data {Object} - display data with frozen output
+     * @param output_area {OutputArea} - current code cell's output area
+     * @returns {jQuery|undefined} - placeholder output element, if any
+     */
+    let append_placeholder = function(display_data, output_area) {
+        let frozen_output = display_data.metadata.frozen_output || {};
+        let html = frozen_output[MIME_HTML];
+
+        if (_.isEmpty(html)) return;
+
+        let toinsert = output_area.create_output_subarea(
+            {}, "output_javascript rendered_html output_frozen", MIME_HTML);
+        toinsert.html(html);
+
+        let output = output_area.create_output_area();
+        output.append(toinsert);
+
+        output_area.element.append(output);
+
+        return output;
+    };
+
+    let append_javascript = async function(js, output_area, context, html) {
+        // cached output is displayed without executing the script,
+        // the script is kept for re-rendering
+        let toinsert = html === undefined ? await js(output_area) : create_output_subarea(output_area).html(html);
         let display_data = append_display_data(js, toinsert, output_area);
 
         return append_output(MIME_JAVASCRIPT, display_data, toinsert, output_area);
     };
 
+    /**
+     * Re-execute the display data in place of its current output element
+     *
+     * @param display_data {DisplayData} - live display data
+     * @param output_area {OutputArea} - current code cell's output area
+     * @returns {Promise<jQuery>} - the output element
+     */
+    let rerender_output = async function(display_data, output_area) {
+        let element = display_data.metadata.display.element;
+        let toinsert = await display_data.metadata.execute(output_area, element);
+
+        display_data.metadata.display.element = toinsert;
+        display_data.metadata.frozen = false;
+
+        return toinsert;
+    };
+
     let append_output = function(type, display_data, toinsert, output_area) {
         return new Promise((resolve) => {
             let md = display_data.md;
@@ -202,6 +333,13 @@ define(['underscore'], function(_) {
                 if (output instanceof DisplayData) {
                     output.freeze_output();
                     output.finalize_output();
+                } else if (output.metadata !== undefined && output.metadata.finalized === false) {
+                    // loaded from the notebook and not rendered yet, finalized to its frozen form
+                    output.data = output.metadata.frozen_output || {};
+                    output.metadata = {
+                        frozen: true,
+                        finalized: true,
+                    };
                 }
             });
 
@@ -223,6 +361,9 @@ define(['underscore'], function(_) {
         append_display_data   : append_display_data,
         append_javascript     : append_javascript,
         append_output         : append_output,
+        append_placeholder    : append_placeholder,
+
+        rerender_output       : rerender_output,
 
         freeze_cell_outputs   : freeze_cell_outputs,
         finalize_cell_outputs : finalize_cell_outputs,
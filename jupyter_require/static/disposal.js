@@ -0,0 +1,152 @@
+/**
+ * Disposal.
+ *
+ * Dispose hooks of rendered outputs.
+ *
+ * User scripts register hooks releasing their resources (charts, timers,
+ * listeners, ...) by `context.on_dispose( fn )` or listen to `context.signal`
+ * which is aborted once the output is cleared, replaced or its cell is deleted.
+ *
+ * The output element is detached while its script renders, only scopes of outputs
+ * which have been attached to the document (live scopes) are disposed by the sweep.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements disposal of rendered outputs.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [ 'underscore', './logger' ], function ( _, Logger ) {
+    'use strict';
+
+    const log = Logger()
+
+    const SCOPE_KEY = 'jupyter-require-scope';
+
+    /**
+     * Scopes which registered a hook or handed out their signal
+     *
+     * Scopes of outputs which do not make use of disposal are not tracked at all.
+     */
+    let scopes = new Set();
+
+    /**
+     * Disposal scope of a single render of the output
+     *
+     * @param element {jQuery} - output element
+     */
+    function Scope( element ) {
+        this.element = element;
+        this.hooks = [];
+        this.controller = undefined;
+        this.disposed = false;
+        this.live = false;
+    }
+
+    /**
+     * Register the hook to be called when the output is disposed
+     *
+     * The hook is called immediately if the output has already been disposed.
+     *
+     * @param fn {Function}
+     */
+    Scope.prototype.on_dispose = function ( fn ) {
+        if ( this.disposed ) return call_hook( fn );
+
+        this.hooks.push( fn );
+        scopes.add( this );
+    };
+
+    Object.defineProperty( Scope.prototype, 'signal', {
+        get: function () {
+            if ( _.isUndefined( this.controller ) ) {
+                this.controller = new AbortController();
+
+                if ( this.disposed ) this.controller.abort();
+                else scopes.add( this );
+            }
+
+            return this.controller.signal;
+        }
+    } );
+
+    /**
+     * Dispose the scope, hooks are called in the reverse order of their registration
+     */
+    Scope.prototype.dispose = function () {
+        if ( this.disposed ) return;
+
+        this.disposed = true;
+        scopes.delete( this );
+
+        if ( !_.isUndefined( this.controller ) ) this.controller.abort();
+
+        this.hooks.reverse().forEach( call_hook );
+        this.hooks = [];
+    };
+
+    function call_hook( fn ) {
+        try {
+            Promise.resolve( fn() ).catch( ( err ) => log.error( "Dispose hook failed:", err ) );
+        } catch ( err ) {
+            log.error( "Dispose hook failed:", err );
+        }
+    }
+
+    /**
+     * Create disposal scope of the output element
+     *
+     * @param element {jQuery} - output element
+     * @returns {Scope}
+     */
+    function create( element ) {
+        let scope = new Scope( element );
+
+        element.data( SCOPE_KEY, scope );
+
+        return scope;
+    }
+
+    /**
+     * Dispose scope of the output element, if any
+     *
+     * @param element {jQuery} - output element
+     */
+    function dispose( element ) {
+        const scope = element.data( SCOPE_KEY );
+
+        if ( !_.isUndefined( scope ) ) scope.dispose();
+    }
+
+    /**
+     * Mark scope of the output element live once the element has been attached to the document
+     *
+     * @param element {jQuery} - output element
+     */
+    function attach( element ) {
+        const scope = element.data( SCOPE_KEY );
+
+        if ( !_.isUndefined( scope ) && document.body.contains( element.get( 0 ) ) ) scope.live = true;
+    }
+
+    /**
+     * Dispose live scopes of the outputs which are no longer displayed
+     *
+     * Scopes of outputs which are still rendering (not attached yet) are kept.
+     */
+    function sweep() {
+        scopes.forEach( ( scope ) => {
+            if ( scope.live && !document.body.contains( scope.element.get( 0 ) ) ) scope.dispose();
+        } );
+    }
+
+
+    return {
+        attach  : attach,
+        create  : create,
+        dispose : dispose,
+        sweep   : sweep,
+
+        info    : () => ( { scopes: scopes.size } ),
+    };
+} );
@@ -0,0 +1,131 @@
+/**
+ * ESM.
+ *
+ * Native ES module loading.
+ *
+ * ES modules are loaded by their URLs with dynamic `import()` in parallel with AMD modules.
+ * They are also registered by their names into the page-level import map, so that bare
+ * specifiers imported by the modules themselves are resolved as well, if the browser
+ * applies import maps added at runtime.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements loading of native ES modules.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [ 'underscore', './logger' ], function ( _, Logger ) {
+    'use strict';
+
+    const log = Logger()
+
+    const supports_import_maps = !_.isUndefined( window.HTMLScriptElement ) &&
+        _.isFunction( HTMLScriptElement.supports ) && HTMLScriptElement.supports( 'importmap' );
+
+    let import_maps_applied = supports_import_maps;  // whether import maps added at runtime are applied
+
+    let modules = {};  // name -> url
+    let mapped = {};   // name -> url present in the import map
+    let integrity = {};  // url -> subresource integrity hash
+
+    /**
+     * Check whether the bare specifier is resolved to the URL by the page import map
+     *
+     * @param name {String} - bare specifier
+     * @param url {String} - expected URL
+     * @returns {Promise<boolean>}
+     */
+    async function resolves( name, url ) {
+        try {
+            const m = await import(
+                `data:text/javascript,export default import.meta.resolve(${ encodeURIComponent( JSON.stringify( name ) ) })` );
+
+            return m.default === new URL( url, document.baseURI ).href;
+        } catch ( err ) {
+            return false;
+        }
+    }
+
+    /**
+     * Add the modules to the page-level import map
+     *
+     * Browsers which support multiple import maps merge them. Browsers which do not
+     * ignore import maps added after the first module has been loaded, this is detected
+     * by a resolution check and no more import maps are added. Modules are always imported
+     * by their URLs regardless, only bare specifiers imported by the modules fail to resolve.
+     */
+    function update_import_map() {
+        const imports = _.pick( modules, ( url, name ) => mapped[ name ] !== url );
+
+        if ( !import_maps_applied || _.isEmpty( imports ) ) return;
+
+        let script = document.createElement( 'script' );
+
+        script.type = 'importmap';
+        script.textContent = JSON.stringify( {
+            imports: imports,
+            integrity: _.pick( integrity, ( hash, url ) => _.contains( _.values( imports ), url ) )
+        } );
+
+        document.head.appendChild( script );
+
+        Object.assign( mapped, imports );
+
+        const [ name, url ] = _.pairs( imports )[ 0 ];
+
+        resolves( name, url ).then( ( applied ) => {
+            if ( applied ) return;
+
+            import_maps_applied = false;
+
+            log.warn( "Import map has not been applied by the browser, bare specifiers of ES modules " +
+                `are not resolved: ${ _.keys( imports ).join( ', ' ) }. Use modules importing by full URLs.` );
+        } );
+    }
+
+    /**
+     * Register ES modules
+     *
+     * @param esm {Object} - ES module URLs by their names
+     * @param hashes {Object} - subresource integrity hashes by library names [optional]
+     */
+    function register( esm, hashes ) {
+        if ( _.isEmpty( esm ) ) return;
+
+        log.debug( "Registering ES modules:", esm );
+
+        Object.assign( modules, esm );
+
+        _.each( _.pick( hashes || {}, _.keys( esm ) ), ( hash, name ) => integrity[ esm[ name ] ] = hash );
+
+        update_import_map();
+    }
+
+    /**
+     * Check whether the library is a registered ES module
+     *
+     * @param name {String} - library name
+     * @returns {boolean}
+     */
+    function is_module( name ) { return _.has( modules, name ); }
+
+    /**
+     * Import the ES module
+     *
+     * Modules are cached by the browser, importing a module again is cheap.
+     *
+     * @param name {String} - module name
+     * @returns {Promise<Object>} - module namespace object
+     */
+    function load( name ) { return import( modules[ name ] ); }
+
+
+    return {
+        register  : register,
+        is_module : is_module,
+        load      : load,
+
+        url       : ( name ) => modules[ name ],
+        modules   : () => _.clone( modules ),
+    };
+} );
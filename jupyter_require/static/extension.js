@@ -89,9 +89,15 @@ define( function ( require ) {
 
                 // When the kernel is restarted
                 events.on( 'kernel_ready.Kernel', () => {
-                    // autoload
+                    // fast path: the comm targets are registered and the loaded libraries
+                    // are kept, so the kernel does not have to wait for the frontend,
+                    // the extension is loaded by the extension manager so that it is loaded only once
+                    const load_kernel_extension =
+                        `__import__('${ __extension__ }').wait_for_frontend = False\n` +
+                        `get_ipython().extension_manager.load_extension('${ __extension__ }')`
+
                     load_extension( { reload: true } )
-                        .then( () => kernel.execute( "%reload_ext " + __extension__, {}, opts ) )
+                        .then( () => kernel.execute( load_kernel_extension, {}, opts ) )
                         .then( () => {
                             events.trigger( 'extension_loaded.JupyterRequire', { timestamp: _.now() } );
                         } )
@@ -0,0 +1,255 @@
+/**
+ * Inflate.
+ *
+ * Minimal zlib (RFC 1950) / DEFLATE (RFC 1951) decompressor.
+ *
+ * Used as a fallback for browsers which do not support `DecompressionStream`.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements decompression of deflate-compressed comm payloads.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [], function () {
+    'use strict';
+
+    const MAX_BITS = 15;
+
+    const LENGTH_BASE = [
+        3, 4, 5, 6, 7, 8, 9, 10, 11, 13, 15, 17, 19, 23, 27, 31,
+        35, 43, 51, 59, 67, 83, 99, 115, 131, 163, 195, 227, 258 ];
+    const LENGTH_EXTRA = [
+        0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2,
+        3, 3, 3, 3, 4, 4, 4, 4, 5, 5, 5, 5, 0 ];
+    const DIST_BASE = [
+        1, 2, 3, 4, 5, 7, 9, 13, 17, 25, 33, 49, 65, 97, 129, 193,
+        257, 385, 513, 769, 1025, 1537, 2049, 3073, 4097, 6145, 8193, 12289, 16385, 24577 ];
+    const DIST_EXTRA = [
+        0, 0, 0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6,
+        7, 7, 8, 8, 9, 9, 10, 10, 11, 11, 12, 12, 13, 13 ];
+    const CODE_LENGTH_ORDER = [ 16, 17, 18, 0, 8, 7, 9, 6, 10, 5, 11, 4, 12, 3, 13, 2, 14, 1, 15 ];
+
+    /**
+     * Canonical Huffman code
+     *
+     * @param lengths {Array} - code length of each symbol
+     */
+    function Huffman( lengths ) {
+        this.counts = new Uint16Array( MAX_BITS + 1 );
+        this.symbols = new Uint16Array( lengths.length );
+
+        let offsets = new Uint16Array( MAX_BITS + 2 );
+
+        for ( let i = 0; i < lengths.length; i++ ) this.counts[ lengths[ i ] ]++;
+        this.counts[ 0 ] = 0;
+
+        for ( let len = 1; len <= MAX_BITS; len++ ) offsets[ len + 1 ] = offsets[ len ] + this.counts[ len ];
+        for ( let i = 0; i < lengths.length; i++ ) {
+            if ( lengths[ i ] !== 0 ) this.symbols[ offsets[ lengths[ i ] ]++ ] = i;
+        }
+    }
+
+    function State( input ) {
+        this.input = input;
+        this.pos = 0;
+        this.bitbuf = 0;
+        this.bitcnt = 0;
+
+        this.output = new Uint8Array( Math.max( 1024, input.length * 4 ) );
+        this.length = 0;
+    }
+
+    State.prototype.bits = function ( n ) {
+        let val = this.bitbuf;
+
+        while ( this.bitcnt < n ) {
+            if ( this.pos >= this.input.length ) throw new Error( "Unexpected end of compressed data." );
+
+            val |= this.input[ this.pos++ ] << this.bitcnt;
+            this.bitcnt += 8;
+        }
+
+        this.bitbuf = val >>> n;
+        this.bitcnt -= n;
+
+        return val & ( ( 1 << n ) - 1 );
+    };
+
+    State.prototype.reserve = function ( n ) {
+        if ( this.length + n <= this.output.length ) return;
+
+        let output = new Uint8Array( Math.max( this.output.length * 2, this.length + n ) );
+        output.set( this.output.subarray( 0, this.length ) );
+
+        this.output = output;
+    };
+
+    State.prototype.decode = function ( huffman ) {
+        let code = 0, first = 0, index = 0;
+
+        for ( let len = 1; len <= MAX_BITS; len++ ) {
+            code |= this.bits( 1 );
+
+            const count = huffman.counts[ len ];
+            if ( code - count < first ) return huffman.symbols[ index + ( code - first ) ];
+
+            index += count;
+            first = ( first + count ) << 1;
+            code <<= 1;
+        }
+
+        throw new Error( "Invalid Huffman code." );
+    };
+
+    function stored( s ) {
+        // discard remaining bits of the current byte
+        s.bitbuf = 0;
+        s.bitcnt = 0;
+
+        if ( s.pos + 4 > s.input.length ) throw new Error( "Unexpected end of compressed data." );
+
+        const len = s.input[ s.pos ] | ( s.input[ s.pos + 1 ] << 8 );
+        const nlen = s.input[ s.pos + 2 ] | ( s.input[ s.pos + 3 ] << 8 );
+        s.pos += 4;
+
+        if ( len !== ( ~nlen & 0xffff ) ) throw new Error( "Invalid stored block length." );
+        if ( s.pos + len > s.input.length ) throw new Error( "Unexpected end of compressed data." );
+
+        s.reserve( len );
+        s.output.set( s.input.subarray( s.pos, s.pos + len ), s.length );
+
+        s.pos += len;
+        s.length += len;
+    }
+
+    function codes( s, lencode, distcode ) {
+        let symbol;
+
+        while ( ( symbol = s.decode( lencode ) ) !== 256 ) {
+            if ( symbol < 256 ) {
+                s.reserve( 1 );
+                s.output[ s.length++ ] = symbol;
+
+                continue;
+            }
+
+            symbol -= 257;
+            if ( symbol >= 29 ) throw new Error( "Invalid literal/length symbol." );
+
+            const len = LENGTH_BASE[ symbol ] + s.bits( LENGTH_EXTRA[ symbol ] );
+
+            symbol = s.decode( distcode );
+            if ( symbol >= 30 ) throw new Error( "Invalid distance symbol." );
+
+            const dist = DIST_BASE[ symbol ] + s.bits( DIST_EXTRA[ symbol ] );
+            if ( dist > s.length ) throw new Error( "Distance too far back." );
+
+            s.reserve( len );
+            for ( let i = 0; i < len; i++, s.length++ ) s.output[ s.length ] = s.output[ s.length - dist ];
+        }
+    }
+
+    let fixed_codes;
+
+    function fixed( s ) {
+        if ( !fixed_codes ) {
+            let lengths = new Uint8Array( 288 + 30 );
+
+            lengths.fill( 8, 0, 144 );
+            lengths.fill( 9, 144, 256 );
+            lengths.fill( 7, 256, 280 );
+            lengths.fill( 8, 280, 288 );
+            lengths.fill( 5, 288 );
+
+            fixed_codes = [ new Huffman( lengths.subarray( 0, 288 ) ), new Huffman( lengths.subarray( 288 ) ) ];
+        }
+
+        codes( s, ...fixed_codes );
+    }
+
+    function dynamic( s ) {
+        const nlen = s.bits( 5 ) + 257;
+        const ndist = s.bits( 5 ) + 1;
+        const ncode = s.bits( 4 ) + 4;
+
+        let lengths = new Uint8Array( nlen + ndist );
+        let code_lengths = new Uint8Array( 19 );
+
+        for ( let i = 0; i < ncode; i++ ) code_lengths[ CODE_LENGTH_ORDER[ i ] ] = s.bits( 3 );
+
+        const lencode = new Huffman( code_lengths );
+
+        let index = 0;
+        while ( index < nlen + ndist ) {
+            let symbol = s.decode( lencode );
+
+            if ( symbol < 16 ) {
+                lengths[ index++ ] = symbol;
+
+                continue;
+            }
+
+            let len = 0, repeat;
+            if ( symbol === 16 ) {
+                if ( index === 0 ) throw new Error( "Repeat with no previous length." );
+
+                len = lengths[ index - 1 ];
+                repeat = 3 + s.bits( 2 );
+            } else if ( symbol === 17 ) {
+                repeat = 3 + s.bits( 3 );
+            } else {
+                repeat = 11 + s.bits( 7 );
+            }
+
+            if ( index + repeat > nlen + ndist ) throw new Error( "Too many code lengths." );
+            while ( repeat-- ) lengths[ index++ ] = len;
+        }
+
+        codes( s, new Huffman( lengths.subarray( 0, nlen ) ), new Huffman( lengths.subarray( nlen ) ) );
+    }
+
+    /**
+     * Inflate raw DEFLATE data
+     *
+     * @param input {Uint8Array} - compressed data
+     * @returns {Uint8Array} - decompressed data
+     */
+    function inflate_raw( input ) {
+        let s = new State( input );
+        let last;
+
+        do {
+            last = s.bits( 1 );
+
+            const type = s.bits( 2 );
+            if ( type === 0 ) stored( s );
+            else if ( type === 1 ) fixed( s );
+            else if ( type === 2 ) dynamic( s );
+            else throw new Error( "Invalid block type." );
+        } while ( !last );
+
+        return s.output.subarray( 0, s.length );
+    }
+
+    /**
+     * Inflate zlib-wrapped DEFLATE data
+     *
+     * @param input {Uint8Array} - compressed data
+     * @returns {Uint8Array} - decompressed data
+     */
+    function inflate( input ) {
+        const cmf = input[ 0 ], flg = input[ 1 ];
+
+        if ( ( cmf & 0x0f ) !== 8 || ( ( cmf << 8 ) | flg ) % 31 !== 0 ) throw new Error( "Invalid zlib header." );
+        if ( flg & 0x20 ) throw new Error( "Preset dictionary is not supported." );
+
+        return inflate_raw( input.subarray( 2 ) );
+    }
+
+
+    return {
+        inflate     : inflate,
+        inflate_raw : inflate_raw,
+    };
+} );
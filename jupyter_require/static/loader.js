@@ -10,10 +10,16 @@
  */
 
 define( [
+    './assets',
     './core',
+    './data',
     './display',
-    './logger'
-], function ( core, display, Logger ) {
+    './disposal',
+    './logger',
+    './retention',
+    './scripts',
+    './viewport'
+], function ( assets, core, data, display, disposal, Logger, retention, scripts, viewport ) {
 
     let _ = require( 'underscore' );
     let events = require( 'base/js/events' );
@@ -64,6 +70,10 @@ define( [
 
         events.trigger( 'before_finalize.JupyterRequire' )
 
+        // outputs which are still waiting for the viewport are finalized
+        // in their frozen form instead of being rendered all at once
+        viewport.cancel();
+
         return Promise.all( cells.map( ( cell ) => display.finalize_cell_outputs( cell ) ) )
             .then( () => {
                 Jupyter.notebook.metadata.finalized = {
@@ -115,6 +125,12 @@ define( [
             .after( btn_group );
     }
 
+    /**
+     * Report retention statistics of live outputs to the kernel
+     */
+    let report_retention_info = _.throttle( () => core.communicate(
+        { type: 'retention_info', namespace: 'JupyterRequire' }, retention.info(), { reply: false } ), 1000 );
+
     /**
      * Register event handlers
      *
@@ -133,20 +149,71 @@ define( [
             },
         } );
 
-        events.on( 'execute.CodeCell', ( e, d ) => d.cell.running = true );
+        events.on( 'execute.CodeCell', ( e, d ) => {
+            d.cell.running = true;
+
+            // outputs have been cleared
+            retention.sweep();
+            disposal.sweep();
+        } );
+        events.on( 'delete.Cell', ( e, d ) => {
+            retention.sweep();
+            disposal.sweep();
+
+            if ( d.cell.output_area ) data.clear( d.cell.output_area );
+        } );
         events.on( 'finished_execute.CodeCell', ( e, d ) => d.cell.running = false );
 
+        // disposal scope of the output is swept only once its element has been attached
+        events.on( 'output_appended.OutputArea', ( e, type, display_data, md, toinsert ) => disposal.attach( toinsert ) );
+
         events.on( 'output_added.OutputArea', ( e, d ) => {
             let display_data = d.output;
             if ( display_data.output_type !== 'display_data' ) return;
 
             if ( display_data instanceof display.DisplayData || display_data.metadata.frozen === false ) {
                 display_data.freeze_output();
+
+                if ( display_data instanceof display.DisplayData ) {
+                    const options = core.get_notebook_options();
+
+                    retention.retain( display_data, d.output_area, options.retention_max_outputs );
+                    report_retention_info();
+                }
             } else {
-                if ( _.isFunction( display_data.metadata.execute ) )
-                    display.append_javascript( display_data.metadata.execute, d.output_area ).then(
-                        ( r ) => log.debug( 'Output appended: ', r )
-                    );
+                const output_area = d.output_area;
+
+                let execute = display_data.metadata.execute;
+                if ( _.isString( execute ) ) {
+                    // loaded from the notebook, scripts of untrusted notebooks are not executed
+                    const cell = Jupyter.notebook.get_cells().find( ( c ) => c.output_area === output_area );
+
+                    execute = output_area.trusted && cell ? core.restore_execute( execute, cell ) : undefined;
+
+                    if ( _.isUndefined( execute ) ) return display.append_placeholder( display_data, output_area );
+                }
+                if ( !_.isFunction( execute ) ) return;
+
+                const options = core.get_notebook_options();
+
+                // keep the frozen output until the output area is scrolled near the viewport
+                let placeholder = options.lazy_render ?
+                    display.append_placeholder( display_data, output_area ) : undefined;
+
+                viewport.when_visible( output_area.element, {
+                    lazy: options.lazy_render,
+                    root_margin: options.lazy_render_margin,
+                    render: () => {
+                        if ( placeholder ) placeholder.remove();
+
+                        // replaced by the re-executed output
+                        output_area.outputs = _.without( output_area.outputs, display_data );
+
+                        return display.append_javascript( execute, output_area );
+                    }
+                } )
+                    .then( ( r ) => log.debug( 'Output appended: ', r ) )
+                    .catch( log.error );
             }
 
 
@@ -185,6 +252,8 @@ define( [
     function init_existing_cells() {
         let cells = get_display_cells();
 
+        const options = core.get_notebook_options();
+
         cells.forEach( async ( cell ) => {
             // mark frozen outputs
             let outputs = cell.output_area.outputs;
@@ -204,6 +273,12 @@ define( [
             let required = core.get_cell_requirements( cell );
 
             if ( required.length > 0 ) {
+                // cells far below the fold are resolved once scrolled near the viewport
+                await viewport.when_visible( cell.element, {
+                    lazy: options.lazy_render,
+                    root_margin: options.lazy_render_margin
+                } );
+
                 Promise.all( core.check_requirements( required ) )
                     .then( ( libs ) => {
                         log.debug( "Success:", libs );
@@ -242,6 +317,10 @@ define( [
 
             const config = core.get_notebook_config();
 
+            // safe scripts collected while the notebook was being loaded
+            // are evaluated before the outputs are initialized
+            scripts.flush();
+
             if ( !reload ) {
                 register_events();
 
@@ -257,8 +336,16 @@ define( [
             core.register_targets()
                 .then( log.debug );
 
+            // linked stylesheets and scripts are loaded at once, in parallel
+            assets.load_manifest()
+                .then( ( loaded ) => log.debug( "Assets linked:", loaded ) );
+
             if ( config !== undefined ) {
-                core.load_required_libraries( config )
+                // with other than the eager policy, cells are initialized without waiting
+                // for the libraries, they are loaded once required by a cell
+                const policy = core.get_notebook_options().load_policy;
+
+                core.load_required_libraries( config, { policy: policy } )
                     .then( () => init_existing_cells() )
                     .then( () => {
                         resolve();
@@ -3,17 +3,50 @@
  *
  * Logging functionality.
  *
+ * Logging methods of disabled levels are replaced by no-ops, so that logging
+ * in hot paths costs nothing unless the level is enabled. The level defaults
+ * to WARN and can be changed by `Logger.set_level( 'DEBUG' )`, the level is
+ * persisted in the browser local storage.
+ *
  * @link   https://github.com/CermakM/jupyter-require#readme
  * @file   This file implements logging functionality.
  * @author Marek Cermak <macermak@redhat.com>
  * @since  0.3.2
  */
 
-define( [ "js-logger" ], function ( Logger ) {
+define( [ "underscore", "js-logger" ], function ( _, Logger ) {
     'use strict';
 
+    const STORAGE_KEY = 'jupyter-require.log_level'
+
+    const METHOD_LEVELS = {
+        debug: Logger.DEBUG,
+        log: Logger.INFO,
+        info: Logger.INFO,
+        time: Logger.TIME,
+        timeEnd: Logger.TIME,
+        warn: Logger.WARN,
+        error: Logger.ERROR,
+    }
+
+    const noop = function () { }
+
+    let loggers = []  // [ [ logger, gated ] ]
+
+    function load_level() {
+        let name
+
+        try {
+            name = window.localStorage.getItem( STORAGE_KEY )
+        } catch ( err ) { }  // local storage may be disabled
+
+        return Logger[ ( name || 'WARN' ).toUpperCase() ] || Logger.WARN
+    }
+
+    let level = load_level()
+
     Logger.useDefaults( {
-        defaultLevel: Logger.DEBUG,
+        defaultLevel: level,
         formatter: function ( messages, context ) {
             const name = context.name || "requirejs"
             const date = new Date().toUTCString()
@@ -22,5 +55,45 @@ define( [ "js-logger" ], function ( Logger ) {
         }
     } )
 
-    return ( name ) => _.isUndefined( name ) ? Logger : Logger.get( name )
-} )
\ No newline at end of file
+    /**
+     * Bind enabled logging methods and replace disabled ones by no-ops
+     */
+    function gate( logger, gated ) {
+        _.each( METHOD_LEVELS, ( l, method ) => {
+            gated[ method ] = l.value >= level.value ? logger[ method ].bind( logger ) : noop
+        } )
+
+        return gated
+    }
+
+    /**
+     * Set log level of all JupyterRequire loggers
+     *
+     * @param name {String} - level name, i.e. 'DEBUG', 'INFO', 'WARN', 'ERROR' or 'OFF'
+     */
+    function set_level( name ) {
+        level = Logger[ String( name ).toUpperCase() ] || level
+
+        try {
+            window.localStorage.setItem( STORAGE_KEY, level.name )
+        } catch ( err ) { }
+
+        Logger.setLevel( level )
+
+        loggers.forEach( ( [ logger, gated ] ) => gate( logger, gated ) )
+    }
+
+    function get_logger( name ) {
+        const logger = _.isUndefined( name ) ? Logger : Logger.get( name )
+        const gated = gate( logger, {} )
+
+        loggers.push( [ logger, gated ] )
+
+        return gated
+    }
+
+    get_logger.set_level = set_level
+    get_logger.get_level = () => level.name
+
+    return get_logger
+} )
@@ -0,0 +1,114 @@
+/**
+ * Retention.
+ *
+ * Bounded retention of live outputs.
+ *
+ * Live outputs keep their DOM element and the compiled script for re-rendering.
+ * Only the most recently used outputs are kept live, the others are finalized
+ * into their frozen HTML. Outputs which have been cleared release their references.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements the retention policy of live outputs.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [ 'underscore', './logger' ], function ( _, Logger ) {
+    'use strict';
+
+    const log = Logger()
+
+    let retained = new Map();  // display data -> output area, in order of use
+
+    /**
+     * Estimate size of the retained output in bytes
+     *
+     * @param display_data {DisplayData}
+     * @returns {Number}
+     */
+    function estimate_bytes( display_data ) {
+        const frozen_output = display_data.metadata.frozen_output || {};
+
+        // UTF-16 serialized output and its DOM counterpart
+        return _.reduce( frozen_output, ( size, value ) => size + value.length * 2 * 2, 0 );
+    }
+
+    /**
+     * Release references of the cleared output
+     *
+     * @param display_data {DisplayData}
+     */
+    function release( display_data ) {
+        display_data.metadata.display = undefined;
+        display_data.metadata.execute = undefined;
+    }
+
+    /**
+     * Drop outputs which are no longer displayed from the registry
+     *
+     * Outputs which have been cleared release their references, outputs
+     * of deleted cells are only forgotten as they may be pasted back.
+     */
+    function sweep() {
+        retained.forEach( ( output_area, display_data ) => {
+            if ( !document.body.contains( output_area.element.get( 0 ) ) ) {
+                retained.delete( display_data );
+            } else if ( !output_area.outputs.includes( display_data ) ) {
+                retained.delete( display_data );
+
+                release( display_data );
+            }
+        } );
+    }
+
+    /**
+     * Retain the live output as the most recently used one
+     *
+     * The least recently used outputs exceeding the limit are finalized.
+     *
+     * @param display_data {DisplayData} - live display data
+     * @param output_area {OutputArea} - output area the output is displayed in
+     * @param max_outputs {Number} - maximum number of live outputs
+     */
+    function retain( display_data, output_area, max_outputs ) {
+        if ( display_data.metadata.finalized ) return;
+
+        sweep();
+
+        retained.delete( display_data );
+        retained.set( display_data, output_area );
+
+        for ( const d of retained.keys() ) {
+            if ( retained.size <= max_outputs || d === display_data ) break;
+
+            log.debug( "Finalizing least recently used output:", d );
+
+            retained.delete( d );
+
+            // the output has been frozen when appended, its current state has to be frozen
+            d.freeze_output();
+            d.finalize_output();
+        }
+    }
+
+    /**
+     * Get number and estimated size of the retained live outputs
+     *
+     * @returns {Object}
+     */
+    function info() {
+        let bytes = 0;
+        retained.forEach( ( output_area, display_data ) => bytes += estimate_bytes( display_data ) );
+
+        return { outputs: retained.size, bytes: bytes };
+    }
+
+
+    return {
+        retain  : retain,
+        release : release,
+        sweep   : sweep,
+
+        info    : info,
+    };
+} );
@@ -0,0 +1,131 @@
+/**
+ * Scheduler.
+ *
+ * Apply messages sent by the kernel over multiple comms in sequence order.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements ordering of the messages received from the kernel.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [ 'underscore', './logger' ], function ( _, Logger ) {
+    'use strict';
+
+    const log = Logger()
+
+    const GAP_TIMEOUT = 5000;  // ms to wait for a missing message before skipping it
+
+    /**
+     * Message scheduler
+     *
+     * Every message is numbered by the kernel by a sequence number shared
+     * by all the channels within the kernel session. Messages are prepared
+     * (i.e. their requirements are resolved) in parallel, but applied strictly
+     * in the sequence order.
+     *
+     * Barrier messages (like configuration) are applied only after all
+     * the preceding messages have been applied and the following messages
+     * are not prepared until the barrier has been applied.
+     *
+     * Only gaps in the sequence numbers time out (see `GAP_TIMEOUT`), messages
+     * and barriers hold the following messages back until they are applied or fail,
+     * however long it takes (i.e. a slow library load).
+     */
+    function Scheduler() {
+        this.reset();
+    }
+
+    Scheduler.prototype.reset = function ( session ) {
+        this.session = session;
+
+        this.expected = 0;     // sequence number of the next message to be scheduled
+        this.pending = {};     // seq -> task, received out of order
+
+        this.barrier = Promise.resolve();  // resolved once the last barrier has been applied
+        this.applied = Promise.resolve();  // resolved once the last scheduled message has been applied
+
+        clearTimeout( this._gap_timeout );
+    };
+
+    /**
+     * Schedule the message
+     *
+     * @param message {Object} - message data containing `seq` and `session`
+     * @param prepare {Function} - prepare the message, may run in parallel with other messages [optional]
+     * @param apply {Function} - apply the message, called with the prepared value
+     * @param barrier {boolean} - whether the message is a barrier
+     * @returns {Promise} - resolved once the message has been applied
+     */
+    Scheduler.prototype.schedule = function ( message, { prepare = _.noop, apply, barrier = false } ) {
+        return new Promise( ( resolve, reject ) => {
+            const task = { prepare, apply, barrier, resolve, reject };
+
+            // messages which are not numbered are scheduled right away
+            if ( _.isUndefined( message.seq ) || _.isNull( message.seq ) ) return this._chain( task );
+
+            if ( message.session !== this.session ) {
+                log.debug( `New kernel session: ${ message.session }.` );
+
+                this.reset( message.session );
+            }
+
+            if ( message.seq < this.expected ) {
+                log.warn( `Message ${ message.seq } received after it was skipped, applying it right away.` );
+
+                return this._chain( task );
+            }
+
+            this.pending[ message.seq ] = task;
+            this._drain();
+        } );
+    };
+
+    Scheduler.prototype._drain = function () {
+        clearTimeout( this._gap_timeout );
+
+        while ( !_.isUndefined( this.pending[ this.expected ] ) ) {
+            const task = this.pending[ this.expected ];
+            delete this.pending[ this.expected++ ];
+
+            this._chain( task );
+        }
+
+        if ( _.isEmpty( this.pending ) ) return;
+
+        // the missing message is not going to arrive (i.e. it has been lost), skip it
+        this._gap_timeout = setTimeout( () => {
+            const next = _.min( _.keys( this.pending ).map( Number ) );
+
+            log.warn( `Messages ${ this.expected }..${ next - 1 } have not been received, skipping.` );
+
+            this.expected = next;
+            this._drain();
+        }, GAP_TIMEOUT );
+    };
+
+    Scheduler.prototype._chain = function ( task ) {
+        const preceding = this.applied;
+
+        // barriers wait for all the preceding messages, others for the last barrier only
+        const prepared = ( task.barrier ? preceding : this.barrier )
+            .then( () => task.prepare() );
+
+        prepared.catch( _.noop );  // failure is reported in order, once the preceding messages are applied
+
+        const applied = preceding
+            .then( () => prepared )
+            .then( ( value ) => task.apply( value ) );
+
+        applied.then( task.resolve, task.reject );
+
+        // do not break the chain on failure
+        this.applied = applied.catch( ( err ) => log.error( err ) );
+        if ( task.barrier ) this.barrier = this.applied;
+    };
+
+
+    return {
+        Scheduler : Scheduler,
+    };
+} );
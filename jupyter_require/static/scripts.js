@@ -0,0 +1,157 @@
+/**
+ * Scripts.
+ *
+ * Batched evaluation of persisted safe scripts.
+ *
+ * Safe scripts are persisted as `application/javascript` outputs which the notebook
+ * evaluates one by one as it renders the outputs. While the notebook is being loaded,
+ * the safe scripts are collected instead and evaluated at once, in order,
+ * once the notebook has been loaded. A script which duplicates the previous output
+ * of the same output area (i.e. the same stylesheet loaded repeatedly by a cell)
+ * is evaluated only once, scripts repeated in other cells or after other outputs
+ * are evaluated again since their order and their output elements matter.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements batched evaluation of safe scripts on notebook load.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [
+    'underscore',
+    'base/js/namespace',
+    'base/js/events',
+    'notebook/js/outputarea',
+    './display',
+    './logger'
+], function ( _, Jupyter, events, outputarea, display, Logger ) {
+    'use strict';
+
+    const log = Logger()
+
+    const MIME_JAVASCRIPT = display.mime_types.MIME_JAVASCRIPT;
+    const MIME_TEXT = display.mime_types.MIME_TEXT;
+
+    const SAFE_SCRIPT = "<JupyterRequire.display.SafeScript object>";
+
+    const append_mime_type = outputarea.OutputArea.prototype.append_mime_type;
+
+    // scripts are collected only if the notebook has not been loaded yet
+    let collecting = !Jupyter.notebook || !Jupyter.notebook._fully_loaded;
+
+    let pending = [];  // [ { script, element, output_area, duplicate } ]
+
+    let stats = { scripts: 0, duplicates: 0, errors: 0, duration: 0 };
+
+    /**
+     * Check whether the output is a persisted JupyterRequire safe script
+     *
+     * @param json {Object} - output JSON
+     * @returns {boolean}
+     */
+    function is_safe_script( json ) {
+        const data = json.data || {};
+
+        return _.isString( data[ MIME_JAVASCRIPT ] ) && data[ MIME_TEXT ] === SAFE_SCRIPT;
+    }
+
+    /**
+     * Get source of the safe script output, if it is one
+     */
+    function script_source( json ) {
+        if ( _.isUndefined( json ) || !is_safe_script( json ) ) return undefined;
+
+        const script = json.data[ MIME_JAVASCRIPT ];
+
+        return _.isArray( script ) ? script.join( '' ) : script;
+    }
+
+    outputarea.OutputArea.prototype.append_mime_type = function ( json, element, handle_inserted ) {
+        if ( !collecting || !this.trusted || !is_safe_script( json ) ) {
+            return append_mime_type.apply( this, arguments );
+        }
+
+        // the output is recorded once appended, the last one is the previous output of the area
+        const previous = script_source( _.last( this.outputs ) );
+
+        // the same output subarea the notebook creates for scripts
+        let toinsert = this.create_output_subarea(
+            json.metadata || {}, "output_javascript rendered_html", MIME_JAVASCRIPT );
+
+        this.keyboard_manager.register_events( toinsert );
+        element.append( toinsert );
+
+        pending.push( {
+            script: json.data[ MIME_JAVASCRIPT ],
+            element: toinsert,
+            output_area: this,
+            duplicate: previous === script_source( json ),
+        } );
+
+        return true;
+    };
+
+    /**
+     * Evaluate the script as the notebook does, with the output area as `this`
+     * and its output subarea as `element`
+     */
+    function evaluate( { script, element, output_area } ) {
+        try {
+            new Function( 'element', script ).call( output_area, element );
+        } catch ( err ) {
+            stats.errors++;
+
+            log.error( "Safe script failed:", err );
+
+            if ( _.isFunction( output_area._append_javascript_error ) ) {
+                output_area._append_javascript_error( err, element );
+            }
+        }
+    }
+
+    /**
+     * Stop collecting and evaluate the collected safe scripts
+     *
+     * Scripts are evaluated in the order of the outputs, duplicates of the previous output
+     * of the same output area are skipped, an error of a script does not prevent
+     * the others from being evaluated.
+     */
+    function flush() {
+        collecting = false;
+
+        if ( pending.length <= 0 ) return;
+
+        const batch = pending;
+        pending = [];
+
+        const start = performance.now();
+
+        let evaluated = 0;
+        batch.forEach( ( s ) => {
+            if ( s.duplicate ) return stats.duplicates++;
+
+            evaluated++;
+            evaluate( s );
+        } );
+
+        const duration = performance.now() - start;
+
+        stats.scripts += evaluated;
+        stats.duration += duration;
+
+        log.info( `Evaluated ${ evaluated } safe scripts ` +
+            `(${ batch.length - evaluated } duplicates skipped) in ${ duration.toFixed( 1 ) } ms.` );
+    }
+
+    if ( collecting ) {
+        events.one( 'notebook_loaded.Notebook', flush );
+        events.one( 'notebook_load_failed.Notebook', flush );
+    }
+
+
+    return {
+        flush : flush,
+
+        info  : () => _.clone( stats ),
+    };
+} );
@@ -0,0 +1,124 @@
+/**
+ * Viewport.
+ *
+ * Defer work on notebook elements until they are scrolled near the viewport.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements viewport-lazy callbacks based on IntersectionObserver.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [ 'underscore' ], function ( _ ) {
+    'use strict';
+
+    const supported = 'IntersectionObserver' in window;
+
+    let observers = {};  // IntersectionObserver per root margin
+    let pending = new Map();  // element -> [callbacks]
+
+    /**
+     * Get (or create) shared observer for the given root margin
+     *
+     * @param root_margin {String} - margin around the viewport, i.e. '200px'
+     * @returns {IntersectionObserver}
+     */
+    function get_observer( root_margin ) {
+        if ( observers[ root_margin ] ) return observers[ root_margin ];
+
+        let observer = new IntersectionObserver( ( entries ) => {
+            entries.forEach( ( entry ) => {
+                if ( !entry.isIntersecting ) return;
+
+                let element = entry.target;
+                let callbacks = pending.get( element ) || [];
+
+                observer.unobserve( element );
+                pending.delete( element );
+
+                callbacks.forEach( ( callback ) => callback() );
+            } );
+        }, { rootMargin: root_margin } );
+
+        observers[ root_margin ] = observer;
+
+        return observer;
+    }
+
+    /**
+     * Resolve once the element is scrolled near the viewport
+     *
+     * Resolves immediately if lazy mode is disabled or IntersectionObserver
+     * is not supported by the browser.
+     *
+     * @param element {Element|jQuery} - observed element
+     * @param lazy {boolean} - whether to wait for the element to become visible
+     * @param root_margin {String} - margin around the viewport
+     * @param render {Function} - render the element once visible, `flush()` waits for it [optional]
+     * @returns {Promise<any>} - the element or the result of the render
+     */
+    function when_visible( element, { lazy = true, root_margin = '200px', render = _.identity } = {} ) {
+        let elt = element && element.jquery ? element.get( 0 ) : element;
+
+        if ( !lazy || !supported || !_.isElement( elt ) ) return Promise.resolve( elt ).then( render );
+
+        return new Promise( ( resolve ) => {
+            let callbacks = pending.get( elt );
+
+            if ( _.isUndefined( callbacks ) ) {
+                callbacks = [];
+                pending.set( elt, callbacks );
+
+                get_observer( root_margin ).observe( elt );
+            }
+
+            callbacks.push( () => {
+                const rendered = Promise.resolve( elt ).then( render );
+                resolve( rendered );
+
+                return rendered;
+            } );
+        } );
+    }
+
+    /**
+     * Stop observing all elements and run their pending callbacks
+     *
+     * @returns {Promise} - resolved once all the pending renders have completed (or failed)
+     */
+    function flush() {
+        let entries = Array.from( pending.entries() );
+
+        Object.values( observers ).forEach( ( observer ) => observer.disconnect() );
+        pending.clear();
+
+        let rendered = [];
+        entries.forEach( ( [ , callbacks ] ) => callbacks.forEach(
+            // failures are reported to the callers of `when_visible()`
+            ( callback ) => rendered.push( callback().catch( _.noop ) ) ) );
+
+        return Promise.all( rendered );
+    }
+
+    /**
+     * Stop observing all elements without running their pending callbacks
+     *
+     * Useful before notebook finalization, deferred outputs are finalized in their
+     * frozen form instead of being rendered at once.
+     */
+    function cancel() {
+        Object.values( observers ).forEach( ( observer ) => observer.disconnect() );
+        pending.clear();
+    }
+
+
+    return {
+        supported    : supported,
+
+        when_visible : when_visible,
+        flush        : flush,
+        cancel       : cancel,
+
+        pending      : () => pending.size,
+    };
+} );
@@ -0,0 +1,157 @@
+/**
+ * Worker.
+ *
+ * Pool of Web Workers executing compute-heavy parts of scripts off the main thread.
+ *
+ * @link   https://github.com/CermakM/jupyter-require#readme
+ * @file   This file implements execution of scripts in pooled Web Workers.
+ * @author Marek Cermak <macermak@redhat.com>
+ * @since  0.7.0
+ */
+
+define( [ 'underscore', './logger' ], function ( _, Logger ) {
+    'use strict';
+
+    const log = Logger()
+
+    const POOL_SIZE = Math.max( 1, Math.min( 4, ( navigator.hardwareConcurrency || 2 ) - 1 ) );
+
+    /**
+     * Collect transferable buffers of typed arrays contained in the value
+     *
+     * The function is executed in the workers as well.
+     *
+     * @param value {any}
+     * @returns {Array<ArrayBuffer>}
+     */
+    function collect_transferables( value ) {
+        let buffers = new Set();
+        let seen = new Set();
+
+        const collect = ( v ) => {
+            if ( v === null || typeof v !== 'object' || seen.has( v ) ) return;
+            seen.add( v );
+
+            if ( v instanceof ArrayBuffer ) return buffers.add( v );
+            if ( ArrayBuffer.isView( v ) ) return buffers.add( v.buffer );
+
+            Object.values( v ).forEach( collect );
+        };
+        collect( value );
+
+        return Array.from( buffers );
+    }
+
+    const BOOTSTRAP = `
+        'use strict';
+
+        const AsyncFunction = Object.getPrototypeOf( async function () {} ).constructor;
+        const collect_transferables = ${ collect_transferables.toString() };
+
+        self.onmessage = async ( e ) => {
+            const { id, source, args } = e.data;
+
+            try {
+                const result = await new AsyncFunction( ...Object.keys( args ), source )( ...Object.values( args ) );
+
+                self.postMessage( { id: id, result: result }, collect_transferables( result ) );
+            } catch ( err ) {
+                self.postMessage( { id: id, error: { message: err.message, stack: err.stack } } );
+            }
+        };
+    `;
+
+    let bootstrap_url;
+
+    let workers = [];  // idle workers
+    let size = 0;      // number of created workers
+    let queue = [];    // tasks waiting for a worker
+    let task_id = 0;
+
+    function create_worker() {
+        if ( _.isUndefined( bootstrap_url ) ) {
+            bootstrap_url = URL.createObjectURL( new Blob( [ BOOTSTRAP ], { type: 'text/javascript' } ) );
+        }
+
+        size++;
+        log.debug( `Creating worker ${ size }/${ POOL_SIZE }.` );
+
+        return new Worker( bootstrap_url );
+    }
+
+    function release( worker ) {
+        const task = queue.shift();
+
+        if ( _.isUndefined( task ) ) workers.push( worker );
+        else dispatch( worker, task );
+    }
+
+    function dispatch( worker, task ) {
+        worker.onmessage = ( e ) => {
+            release( worker );
+
+            if ( e.data.error ) {
+                let err = new Error( e.data.error.message );
+                err.stack = e.data.error.stack;
+
+                return task.reject( err );
+            }
+
+            task.resolve( e.data.result );
+        };
+        worker.onerror = ( e ) => {
+            e.preventDefault();
+            release( worker );
+
+            task.reject( new Error( e.message ) );
+        };
+
+        worker.postMessage( { id: task.id, source: task.source, args: task.args }, collect_transferables( task.args ) );
+    }
+
+    /**
+     * Run the script in a pooled worker
+     *
+     * The script has no access to the DOM or the notebook, its result (returned value)
+     * must be structured-cloneable, typed arrays are transferred without copying.
+     * The script is executed on the main thread if Web Workers are not supported.
+     *
+     * @param source {String} - body of an async function
+     * @param args {Object} - arguments passed to the script by their names, typed arrays are transferred
+     * @returns {Promise<any>} - result of the script
+     */
+    function run( source, args = {} ) {
+        if ( _.isUndefined( window.Worker ) ) {
+            const AsyncFunction = Object.getPrototypeOf( async function () {} ).constructor;
+
+            return new AsyncFunction( ..._.keys( args ), source )( ..._.values( args ) );
+        }
+
+        return new Promise( ( resolve, reject ) => {
+            const task = { id: ++task_id, source: source, args: args, resolve: resolve, reject: reject };
+
+            if ( workers.length > 0 ) return dispatch( workers.pop(), task );
+            if ( size < POOL_SIZE ) return dispatch( create_worker(), task );
+
+            queue.push( task );
+        } );
+    }
+
+    /**
+     * Terminate idle workers
+     */
+    function terminate() {
+        workers.forEach( ( worker ) => worker.terminate() );
+
+        size -= workers.length;
+        workers = [];
+    }
+
+
+    return {
+        run       : run,
+        terminate : terminate,
+
+        info      : () => ( { size: size, idle: workers.length, queued: queue.length, max: POOL_SIZE } ),
+    };
+} );
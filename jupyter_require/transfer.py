@@ -0,0 +1,241 @@
+# jupyter-require
+# Copyright 2019 Marek Cermak <macermak@redhat.com>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Chunked streaming of data to Jupyter frontend."""
+
+import itertools
+import threading
+
+import daiquiri
+
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from typing import Callable, Iterable, Iterator, List
+
+logger = daiquiri.getLogger()
+
+
+class DataTransfer(object):
+    """Stream data to the frontend in chunks over a dedicated comm.
+
+    Chunks are numbered by sequence numbers and sent from a background thread.
+    At most `window` chunks are sent before they are acknowledged by the frontend,
+    unacknowledged chunks are kept so that an interrupted transfer can be resumed.
+
+    Note that the kernel processes the acknowledgements only when it is idle,
+    hence the first `window` chunks are sent right away and the rest follows
+    once the current cell has finished.
+    """
+
+    def __init__(self,
+                 name: str,
+                 data: Iterable,
+                 comm_factory: Callable,
+                 chunk_size: int = 1000,
+                 window: int = 8):
+        self.name = name
+        self.chunk_size = chunk_size
+        self.window = window
+
+        self.total = len(data) if hasattr(data, '__len__') else None
+
+        self._chunks: Iterator[list] = self._iter_chunks(data, chunk_size)
+        self._unacked = OrderedDict()  # seq -> chunk
+        self._next_seq = 0
+        self._acked = 0  # number of contiguously acknowledged chunks
+        self._exhausted = False
+
+        self._comm_factory = comm_factory
+        self._comm = None
+
+        self._cond = threading.Condition()
+        self._thread: threading.Thread = None
+
+        self.interrupted = False
+        self.complete = False
+
+        self.resume()
+
+    @property
+    def progress(self) -> float:
+        """Get fraction of the acknowledged data, if the total size is known."""
+        if self.complete:
+            return 1.0
+        if not self.total:
+            return None
+
+        return min(self._acked * self.chunk_size / self.total, 1.0)
+
+    def resume(self):
+        """Start or resume the transfer.
+
+        The frontend is told the offset to continue from and all
+        unacknowledged chunks are sent again.
+        """
+        with self._cond:
+            if self.complete:
+                return
+
+            self.interrupted = False
+            self._next_seq = self._acked
+
+            self._comm = self._comm_factory(
+                target='data',
+                data={
+                    'name': self.name,
+                    'total': self.total,
+                    'chunk_size': self.chunk_size,
+                    'offset': self._acked,
+                },
+                callback=self._handle_msg,
+            )
+            self._comm.on_close(self._handle_close)
+
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name=f'JupyterRequireTransfer[{self.name}]', daemon=True)
+            self._thread.start()
+
+    def cancel(self):
+        """Cancel the transfer."""
+        with self._cond:
+            self.interrupted = True
+            self._cond.notify_all()
+
+            if self._comm is not None:
+                self._comm.close()
+
+    def _next_chunk(self) -> List:
+        """Get next chunk to be sent, either unacknowledged or a new one."""
+        if self._next_seq in self._unacked:
+            return self._unacked[self._next_seq]
+
+        if self._exhausted:
+            return None
+
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+        else:
+            self._unacked[self._next_seq] = chunk
+
+        return chunk
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # flow control, wait for acknowledgements
+                self._cond.wait_for(
+                    lambda: self.interrupted or self._next_seq - self._acked < self.window)
+
+                if self.interrupted:
+                    return
+
+                seq = self._next_seq
+                chunk = self._next_chunk()
+
+                if chunk is None:
+                    break
+
+                self._next_seq += 1
+
+                # the comm is replaced by `resume()` under the lock
+                self._comm.send(data={'seq': seq, 'items': chunk})
+
+        with self._cond:
+            self._comm.send(data={'done': True, 'count': self._next_seq})
+
+        logger.debug("Transfer of '%s' sent: %d chunks.", self.name, self._next_seq)
+
+    def _handle_msg(self, msg):
+        """Handle acknowledgement of received chunks."""
+        data = msg['content']['data']
+
+        with self._cond:
+            received = data.get('received', self._acked)
+
+            for seq in range(self._acked, received):
+                self._unacked.pop(seq, None)
+
+            self._acked = max(self._acked, received)
+
+            if self._exhausted and not self._unacked:
+                self.complete = True
+
+            self._cond.notify_all()
+
+        if self.complete:
+            logger.debug("Transfer of '%s' completed.", self.name)
+
+    def _handle_close(self, msg):
+        """Handle comm closed by the frontend.
+
+        The frontend closes the comm once all the chunks have been received,
+        otherwise the transfer is paused and can be resumed later.
+        """
+        _ = msg  # ignored
+
+        with self._cond:
+            self.complete = self.complete or (self._exhausted and not self._unacked)
+
+            if not self.complete:
+                logger.warning("Transfer of '%s' interrupted.", self.name)
+                self.interrupted = True
+
+            self._cond.notify_all()
+
+    @staticmethod
+    def _iter_chunks(data: Iterable, chunk_size: int) -> Iterator[list]:
+        if hasattr(data, 'iloc') and hasattr(data, 'columns'):  # pandas DataFrame
+            for i in range(0, len(data), chunk_size):
+                yield data.iloc[i:i + chunk_size].to_dict('records')
+
+            return
+
+        if hasattr(data, 'iloc'):  # pandas Series, sliced by position
+            for i in range(0, len(data), chunk_size):
+                yield data.iloc[i:i + chunk_size].tolist()
+
+            return
+
+        if isinstance(data, Sequence) or hasattr(data, 'tolist'):  # lists, tuples, numpy arrays
+            for i in range(0, len(data), chunk_size):
+                chunk = data[i:i + chunk_size]
+
+                yield chunk.tolist() if hasattr(chunk, 'tolist') else list(chunk)
+
+            return
+
+        iterator = iter(data)
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if not chunk:
+                return
+
+            yield chunk
+
+    def __repr__(self):
+        state = 'complete' if self.complete else 'interrupted' if self.interrupted else 'in progress'
+
+        return f"<DataTransfer name={self.name!r} chunks_acked={self._acked} state={state}>"
@@ -0,0 +1,139 @@
+# jupyter-require
+# Copyright 2019 Marek Cermak <macermak@redhat.com>
+#
+# MIT License
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Watch local JavaScript files for changes."""
+
+import threading
+
+import daiquiri
+
+from pathlib import Path
+
+from typing import Callable, Dict, List, Tuple
+
+logger = daiquiri.getLogger()
+
+
+class FileWatcher(object):
+    """Poll watched files and report the changed ones to the callback.
+
+    The files are polled from a daemon thread by their modification time,
+    changes made within the same polling interval are reported at once.
+    """
+
+    def __init__(self, callback: Callable[[List[str]], None], interval: float = 1.0):
+        self.callback = callback
+        self.interval = interval
+
+        self._files: Dict[str, Tuple[Path, int]] = dict()
+        self._lock = threading.Lock()
+
+        self._thread: threading.Thread = None
+        self._stop = threading.Event()
+
+    @property
+    def files(self) -> dict:
+        """Get watched files."""
+        with self._lock:
+            return {name: path for name, (path, _) in self._files.items()}
+
+    @property
+    def is_running(self) -> bool:
+        """Return whether the watcher thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def watch(self, name: str, path: str):
+        """Watch the file and report its changes by the given name."""
+        path = Path(path).resolve()
+
+        if not path.is_file():
+            raise FileNotFoundError(f"File '{path}' does not exist.")
+
+        with self._lock:
+            self._files[name] = (path, path.stat().st_mtime_ns)
+
+        logger.debug("Watching '%s' for changes of '%s'.", path, name)
+
+        self.start()
+
+    def unwatch(self, name: str):
+        """Stop watching the file registered by the given name."""
+        with self._lock:
+            self._files.pop(name, None)
+
+            stop = not self._files
+
+        # outside of the lock, the watcher thread takes it when polling
+        if stop:
+            self.stop()
+
+    def poll(self) -> List[str]:
+        """Return names of files which changed since the last poll."""
+        changed = []
+
+        with self._lock:
+            for name, (path, mtime) in self._files.items():
+                try:
+                    current = path.stat().st_mtime_ns
+                except FileNotFoundError:  # the file is being replaced
+                    continue
+
+                if current != mtime:
+                    self._files[name] = (path, current)
+                    changed.append(name)
+
+        return changed
+
+    def start(self):
+        """Start the watcher thread, if not running already."""
+        if self.is_running:
+            return
+
+        # each thread has its own stop event, so that a stopping thread is never restarted
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._stop,), name='JupyterRequireWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread and wait for it to exit."""
+        thread, self._thread = self._thread, None
+
+        self._stop.set()
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self, stop: threading.Event):
+        while not stop.wait(self.interval):
+            changed = self.poll()
+
+            if not changed:
+                continue
+
+            logger.info("Files changed: %s", changed)
+
+            try:
+                self.callback(changed)
+            except Exception as exc:
+                logger.error("Hot reload of %s failed: %s", changed, exc)
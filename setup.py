@@ -53,11 +53,23 @@ cmdclass['js'] = combine_commands(
     #     build_cmd='build:all'
     # ),
     ensure_targets([
+        NAME + '/static/assets.js',  # FIXME when migrated to nodes.js
+        NAME + '/static/cache.js',  # FIXME when migrated to nodes.js
         NAME + '/static/core.js',  # FIXME when migrated to nodes.js
+        NAME + '/static/css.js',  # FIXME when migrated to nodes.js
+        NAME + '/static/data.js',  # FIXME when migrated to nodes.js
         NAME + '/static/display.js',  # FIXME when migrated to nodes.js
+        NAME + '/static/disposal.js',  # FIXME when migrated to nodes.js
+        NAME + '/static/esm.js',  # FIXME when migrated to nodes.js
         NAME + '/static/extension.js',
+        NAME + '/static/inflate.js',  # FIXME when migrated to nodes.js
         NAME + '/static/loader.js',  # FIXME when migrated to nodes.js
         NAME + '/static/logger.js',  # FIXME when migrated to nodes.js
+        NAME + '/static/retention.js',  # FIXME when migrated to nodes.js
+        NAME + '/static/scheduler.js',  # FIXME when migrated to nodes.js
+        NAME + '/static/scripts.js',  # FIXME when migrated to nodes.js
+        NAME + '/static/viewport.js',  # FIXME when migrated to nodes.js
+        NAME + '/static/worker.js',  # FIXME when migrated to nodes.js
         # NAME + '/static/index.js',  # FIXME when migrated to nodes.js
     ]),
 )
@@ -94,6 +106,12 @@ setup(
 
     install_requires=REQUIREMENTS,
 
+    entry_points={
+        'console_scripts': [
+            'jupyter-require = jupyter_require.cli:main',
+        ],
+    },
+
     cmdclass=cmdclass,
 
     packages=find_packages(),
@@ -0,0 +1,46 @@
+"""Tests of the notebook compaction."""
+
+from jupyter_require.compact import compact, MIME_JAVASCRIPT, MIME_TEXT, SAFE_SCRIPT_REPR
+
+
+def _safe_script(script: str) -> dict:
+    return {
+        'output_type': 'display_data',
+        'data': {MIME_JAVASCRIPT: script, MIME_TEXT: SAFE_SCRIPT_REPR},
+        'metadata': {},
+    }
+
+
+def _stream(text: str) -> dict:
+    return {'output_type': 'stream', 'name': 'stdout', 'text': text}
+
+
+def _notebook(*outputs) -> dict:
+    return {'cells': [{'cell_type': 'code', 'metadata': {}, 'outputs': list(o)} for o in outputs], 'metadata': {}}
+
+
+def test_compact_consecutive_duplicates():
+    nb = _notebook([_safe_script('a'), _safe_script('a'), _safe_script('b'), _safe_script('a')])
+
+    stats = compact(nb)
+
+    assert stats['deduplicated'] == 1
+    assert [o['data'][MIME_JAVASCRIPT] for o in nb['cells'][0]['outputs']] == ['a', 'b', 'a']
+
+
+def test_compact_keeps_same_script_in_other_cells():
+    nb = _notebook([_safe_script('a')], [_safe_script('a')])
+
+    stats = compact(nb)
+
+    assert stats['deduplicated'] == 0
+    assert all(len(cell['outputs']) == 1 for cell in nb['cells'])
+
+
+def test_compact_keeps_duplicates_separated_by_other_outputs():
+    nb = _notebook([_safe_script('a'), _stream('text'), _safe_script('a')])
+
+    stats = compact(nb)
+
+    assert stats['deduplicated'] == 0
+    assert len(nb['cells'][0]['outputs']) == 3
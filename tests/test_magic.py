@@ -0,0 +1,64 @@
+"""Tests of the serialization of namespace variables."""
+
+import pytest
+
+from jupyter_require import magic
+
+
+class Point:
+    """Mutable object with the default identity-based hash."""
+
+    def __init__(self, x):
+        self.x = x
+
+
+@pytest.fixture
+def sanitized(monkeypatch):
+    """Record the serialized namespaces."""
+    calls = []
+
+    def sanitize_namespace(ns, options=None):
+        calls.append(ns)
+
+        return {name: repr(vars(obj)) if isinstance(obj, Point) else repr(obj) for name, obj in ns.items()}
+
+    monkeypatch.setattr(magic, 'sanitize_namespace', sanitize_namespace)
+    monkeypatch.setattr(magic, '_SERIALIZED', dict())
+
+    return calls
+
+
+def test_serialize_namespace_caches_immutable_values(sanitized):
+    ns = {'name': 'value'}
+
+    assert magic.serialize_namespace(ns, ['name']) == magic.serialize_namespace(ns, ['name'])
+    assert len(sanitized) == 1
+
+
+def test_serialize_namespace_mutated_object(sanitized):
+    point = Point(1)
+    ns = {'point': point}
+
+    before = magic.serialize_namespace(ns, ['point'])
+    point.x = 2
+    after = magic.serialize_namespace(ns, ['point'])
+
+    assert before != after
+    assert after['point'] == repr({'x': 2})
+
+
+def test_serialize_namespace_mutated_container(sanitized):
+    items = [1, 2]
+    ns = {'items': items}
+
+    magic.serialize_namespace(ns, ['items'])
+    items.append(3)
+
+    assert magic.serialize_namespace(ns, ['items'])['items'] == repr([1, 2, 3])
+
+
+def test_version_token():
+    assert magic._version_token((1, 'a')) is not None
+    assert magic._version_token((1, [])) is None
+    assert magic._version_token(Point(1)) is None
+    assert magic._version_token({'a': 1}) is None